@@ -0,0 +1,30 @@
+"""
+Load test of the command server over localhost TCP, with a simulated robot behind it: commands per second
+and frame latency for one frame per command (with and without pipelining) and for batch frames.
+
+Run from the repository root: python -m benchmarks.command_server_load
+"""
+import asyncio
+
+from src.command_client import CommandClient, run_load
+from src.command_server import CommandServer
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+ROUTE = "ffrfflffrffl" * 1000
+
+
+async def load_test() -> None:
+    robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+    robot.initialize_robot()
+    async with CommandServer(robot, offload=False) as server:
+        host, port = await server.start_tcp()
+        for label, options in (("no pipelining", {"depth": 1}),
+                               ("pipelined x32", {"depth": 32}),
+                               ("batches of 64", {"depth": 4, "batch_size": 64})):
+            stats = await run_load(lambda: CommandClient.connect_tcp(host, port), ROUTE, **options)
+            print(f"{label}: {stats['commands_per_second']:.0f} commands/s, "
+                  f"p50 {stats['p50_latency'] * 1e6:.0f} us, p99 {stats['p99_latency'] * 1e6:.0f} us")
+
+
+if __name__ == "__main__":
+    asyncio.run(load_test())
@@ -0,0 +1,30 @@
+"""
+Throughput of the multi-robot coordinator: cells cleaned per second of wall time as robots are added
+to the same room, with the command streams executed on a process pool.
+
+Run from the repository root: python -m benchmarks.coordinator_scaling
+"""
+import os
+
+from src.coordinator import Coordinator
+from src.fleet_simulator import BatteryDrainModel
+
+
+def cells_per_second(robot_count: int, width: int = 240, height: int = 120, pool: str = "process") -> float:
+    coordinator = Coordinator(robot_count, width, height,
+                              drain_model=BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+    return coordinator.run(pool=pool)["cells_per_second"]
+
+
+def main() -> None:
+    baseline = None
+    robot_count = 1
+    while robot_count <= (os.cpu_count() or 1):
+        throughput = cells_per_second(robot_count)
+        baseline = baseline or throughput
+        print(f"{robot_count} robots: {throughput:.0f} cells/s (x{throughput / baseline:.2f})")
+        robot_count *= 2
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+"""
+Counts the GPIO calls made by each command of CleaningRobot.
+Before the motor pins were written in groups, every pin write was a separate GPIO.output call,
+so the "pin writes" column is the number of calls the same command used to make.
+
+Run from the repository root: python -m benchmarks.gpio_calls
+"""
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedGPIO, SimulatedRobot
+
+
+class CountingGPIO(SimulatedGPIO):
+
+    def __init__(self):
+        super().__init__()
+        self.output_calls = 0
+        self.pin_writes = 0
+        self.input_calls = 0
+
+    def output(self, channel, value) -> None:
+        self.output_calls += 1
+        self.pin_writes += len(channel) if isinstance(channel, (list, tuple)) else 1
+        super().output(channel, value)
+
+    def input(self, channel):
+        self.input_calls += 1
+        return super().input(channel)
+
+
+def count_gpio_calls(command: str) -> dict:
+    robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel())
+    robot.gpio = gpio = CountingGPIO()
+    robot.wheel_motor_pins.gpio = robot.rotation_motor_pins.gpio = gpio
+    gpio.input_sources[robot.INFRARED_PIN] = lambda: False
+    robot.initialize_robot()
+    robot.execute_command(command)
+    return {"output_calls": gpio.output_calls, "pin_writes": gpio.pin_writes, "input_calls": gpio.input_calls}
+
+
+def main() -> None:
+    print(f"{'command':<8}{'output calls':>14}{'pin writes':>12}{'input calls':>13}")
+    for command in "flr":
+        counts = count_gpio_calls(command)
+        print(f"{command:<8}{counts['output_calls']:>14}{counts['pin_writes']:>12}{counts['input_calls']:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+"""
+Micro-benchmark of the robot state: time per command (with the mock hardware and the UV exposure
+elided) and memory per robot instance.
+
+Run from the repository root: python -m benchmarks.robot_state
+"""
+import timeit
+import tracemalloc
+
+from src.cleaning_robot import CleaningRobot
+from src.uv_scheduler import NoOpUVScheduler
+
+
+def command_cost(command: str, number: int = 20000) -> float:
+    """
+    :return: microseconds per execution of the command
+    """
+    robot = CleaningRobot()
+    robot.uv_scheduler = NoOpUVScheduler()
+    robot.initialize_robot()
+    return timeit.timeit(lambda: robot.execute_command(command), number=number) / number * 1e6
+
+
+def instance_memory(count: int = 1000) -> float:
+    """
+    :return: bytes allocated per robot instance
+    """
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    robots = [CleaningRobot() for _ in range(count)]
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    allocated = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del robots
+    return allocated / count
+
+
+def main() -> None:
+    for command in "flr":
+        print(f"execute_command({command!r}): {command_cost(command):.2f} us")
+    print(f"memory per instance: {instance_memory():.0f} bytes")
+
+
+if __name__ == "__main__":
+    main()
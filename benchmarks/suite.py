@@ -0,0 +1,190 @@
+"""
+Benchmark suite of the robot control loop, runnable with the mock hardware: single-command latency,
+route throughput (plain, obstacle-heavy and low-battery), instance construction and import time.
+The sleeps of the robot (UV exposure) are virtualized, so each benchmark measures only the control logic.
+Every figure is the best of several repeats, which is the most reproducible statistic on a shared machine.
+
+Run from the repository root:
+    python -m benchmarks.suite --output results.json
+    python -m benchmarks.suite --compare results.json  # exit status 1 on regressions
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import timeit
+from pathlib import Path
+
+from mock import GPIO
+from mock import ibs as mock_ibs
+from src import backends
+from src.cleaning_robot import CleaningRobot
+
+ROOT = Path(__file__).resolve().parent.parent
+
+ROUTE = "ffffrffffrffffrffffr" * 50
+REPEAT = 5
+
+
+class VirtualSleepRobot(CleaningRobot):
+    """
+    CleaningRobot whose sleeps only add up the time they would have taken
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.slept = 0.0
+
+    def _sleep(self, seconds: float) -> None:
+        self.slept += seconds
+
+
+def _fresh_robot() -> VirtualSleepRobot:
+    GPIO.reset()
+    mock_ibs.reset()
+    robot = VirtualSleepRobot()
+    robot.initialize_robot()
+    return robot
+
+
+def _best(function, number: int) -> float:
+    """
+    :return: the best time per call, in microseconds
+    """
+    return min(timeit.repeat(function, number=number, repeat=REPEAT)) / number * 1e6
+
+
+def command_latency(command: str, number: int = 5000) -> float:
+    robot = _fresh_robot()
+    return _best(lambda: robot.execute_command(command), number)
+
+
+def route_throughput(route: str = ROUTE) -> float:
+    """
+    :return: microseconds per command of a whole route executed through execute_commands
+    """
+    def run():
+        robot = _fresh_robot()
+        for _ in robot.execute_commands(route):
+            pass
+    return _best(run, 1) / len(route)
+
+
+def obstacle_route(route: str = ROUTE) -> float:
+    """
+    :return: microseconds per command when every other infrared reading reports an obstacle,
+    with the RMS sending one command at a time
+    """
+    def run():
+        robot = _fresh_robot()
+        GPIO.set_input_sequence(CleaningRobot.INFRARED_PIN, [1, 0] * len(route))
+        for command in route:
+            robot.execute_command(command)
+            robot.room_map = type(robot.room_map)()  # Do not let the map skip the infrared readings
+    return _best(run, 1) / len(route)
+
+
+def low_battery_route(route: str = ROUTE) -> float:
+    """
+    :return: microseconds per command when the charge is too low to execute anything
+    """
+    def run():
+        robot = _fresh_robot()
+        mock_ibs.set_charge_curve(lambda reading: 5)
+        for command in route:
+            robot.execute_command(command)
+    return _best(run, 1) / len(route)
+
+
+def construction(number: int = 2000) -> float:
+    GPIO.reset()
+    return _best(CleaningRobot, number)
+
+
+def import_time() -> float:
+    """
+    :return: microseconds of a cold import of src.cleaning_robot, in a fresh interpreter
+    """
+    code = ("import time\n"
+            "start = time.perf_counter()\n"
+            "import src.cleaning_robot\n"
+            "print(time.perf_counter() - start)")
+    timings = [float(subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True,
+                                    check=True).stdout) for _ in range(REPEAT)]
+    return min(timings) * 1e6
+
+
+BENCHMARKS = {
+    "command_f": lambda: command_latency("f"),
+    "command_l": lambda: command_latency("l"),
+    "command_r": lambda: command_latency("r"),
+    "route": route_throughput,
+    "route_obstacles": obstacle_route,
+    "route_low_battery": low_battery_route,
+    "construction": construction,
+    "import": import_time,
+}
+
+
+def run_benchmarks(names=None) -> dict:
+    """
+    :return: the results (microseconds, lower is better) with the environment they were measured in
+    """
+    if backends.get_backend().name != "mock":
+        raise RuntimeError("the benchmarks must run with the mock backend")
+    results = {name: BENCHMARKS[name]() for name in (names or BENCHMARKS)}
+    GPIO.reset()
+    mock_ibs.reset()
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "unit": "us",
+        "results": results,
+    }
+
+
+def compare(baseline: dict, current: dict, tolerance: float = 0.10) -> list[tuple[str, float, float, float]]:
+    """
+    :return: (name, baseline, current, ratio) of the benchmarks slower than the baseline by more than the tolerance
+    """
+    regressions = []
+    for name, value in current["results"].items():
+        previous = baseline["results"].get(name)
+        if previous:
+            ratio = value / previous
+            if ratio > 1 + tolerance:
+                regressions.append((name, previous, value, ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("benchmarks", nargs="*", help=f"benchmarks to run among {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file of a previous run to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="slowdown ratio reported as a regression")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    current = run_benchmarks(args.benchmarks)
+    baseline = json.loads(Path(args.compare).read_text()) if args.compare else None
+    for name, value in current["results"].items():
+        line = f"{name:<20}{value:>12.2f} us"
+        if baseline is not None and baseline["results"].get(name):
+            line += f"{value / baseline['results'][name]:>10.2f}x"
+        print(line)
+    if args.output:
+        Path(args.output).write_text(json.dumps(current, indent=2) + "\n")
+    if baseline is None:
+        return 0
+    regressions = compare(baseline, current, args.tolerance)
+    for name, previous, value, ratio in regressions:
+        print(f"regression: {name} {previous:.2f} us -> {value:.2f} us ({ratio:.2f}x)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
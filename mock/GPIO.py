@@ -4,6 +4,9 @@ Mock Library for RPi.GPIO
 
 import logging
 import os
+import time
+from array import array
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
@@ -56,6 +59,35 @@ channel_config = {}
 #flags
 setModeDone = False
 
+# Ring buffer of the pin writes, allocated by enable_trace
+_trace = None
+
+# Current level of each channel written or set so far (any channel number is accepted, the others are LOW),
+# and the scripted readings of the input channels
+_levels = {}
+_input_scripts = {}
+
+# Edge detection of each channel: the detected edge, its callbacks, and whether an edge occurred
+_event_edges = {}
+_event_callbacks = {}
+_events_detected = set()
+
+
+class _Trace:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.pins = array('i', bytes(4 * capacity))
+        self.values = array('i', bytes(4 * capacity))
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.count = 0
+
+    def record(self, channel, value):
+        index = self.count % self.capacity
+        self.pins[index] = channel
+        self.values[index] = int(value)
+        self.timestamps[index] = time.perf_counter()
+        self.count += 1
+
 class Channel:
     def __init__(self,channel, direction, initial=0,pull_up_down=PUD_OFF):
         self.channel = channel
@@ -92,7 +124,7 @@ def setwarnings(flag):
     """
     Enable or disable warning messages
     """
-    logger.info("Set warnings as {}".format(flag))
+    logger.info("Set warnings as %s", flag)
 
 def setup(channel, direction, initial=0,pull_up_down=PUD_OFF):
     """
@@ -103,25 +135,107 @@ def setup(channel, direction, initial=0,pull_up_down=PUD_OFF):
     [initial]      - Initial value for an output channel
 
     """
-    logger.info("Setup channel : {} as {} with initial :{} and pull_up_down {}".format(channel,direction,initial,pull_up_down))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Setup channel : %s as %s with initial :%s and pull_up_down %s", channel,direction,initial,pull_up_down)
     global channel_config
     channel_config[channel] = Channel(channel, direction, initial, pull_up_down)
+    if direction == OUT:
+        _levels[channel] = int(initial)
 
 def output(channel, value):
     """
     Output to a GPIO channel or list of channels
-    channel - either board pin number or BCM number depending on which mode is set.
-    value   - 0/1 or False/True or LOW/HIGH
+    channel - either board pin number or BCM number depending on which mode is set, or a list/tuple of them
+    value   - 0/1 or False/True or LOW/HIGH, or a list/tuple with one value per channel
 
     """
-    logger.info("Output channel : {} with value : {}".format(channel, value))
+    if isinstance(channel, (list, tuple)):
+        values = value if isinstance(value, (list, tuple)) else [value] * len(channel)
+        for pin, pin_value in zip(channel, values):
+            _levels[pin] = int(pin_value)
+            if _trace is not None:
+                _trace.record(pin, pin_value)
+    else:
+        _levels[channel] = int(value)
+        if _trace is not None:
+            _trace.record(channel, value)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Output channel : %s with value : %s", channel, value)
 
 def input(channel):
     """
     Input from a GPIO channel.  Returns HIGH=1=True or LOW=0=False
     channel - either board pin number or BCM number depending on which mode is set.
     """
-    logger.info("Reading from channel {}".format(channel))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("Reading from channel %s", channel)
+    script = _input_scripts.get(channel)
+    if script:
+        _levels[channel] = int(script.popleft())
+    return _levels.get(channel, LOW)
+
+def set_input(channel, value):
+    """
+    Set the level read from a channel, firing the edge detection callbacks if the level changes (mock only)
+    """
+    _input_scripts.pop(channel, None)
+    previous = _levels.get(channel, LOW)
+    _levels[channel] = int(value)
+    edge = _event_edges.get(channel)
+    if edge is not None and previous != _levels[channel]:
+        rising = _levels[channel] == HIGH
+        if edge == BOTH or (edge == RISING) == rising:
+            _events_detected.add(channel)
+            for callback in list(_event_callbacks.get(channel, ())):
+                callback(channel)
+
+def set_input_sequence(channel, values):
+    """
+    Script the levels returned by the next input() calls on a channel; once the sequence is over,
+    the last level keeps being returned (mock only)
+    """
+    _input_scripts[channel] = deque(values)
+
+def get_level(channel):
+    """
+    Returns the current level of a channel (mock only)
+    """
+    return _levels.get(channel, LOW)
+
+def reset():
+    """
+    Set every channel back to LOW and forget the channel configuration and the input scripts (mock only)
+    """
+    _levels.clear()
+    _input_scripts.clear()
+    channel_config.clear()
+    _event_edges.clear()
+    _event_callbacks.clear()
+    _events_detected.clear()
+
+def enable_trace(capacity=4096):
+    """
+    Record the pin writes into a preallocated ring buffer, keeping the last capacity of them
+    """
+    global _trace
+    _trace = _Trace(capacity)
+
+def disable_trace():
+    """
+    Stop recording the pin writes and drop the recorded ones
+    """
+    global _trace
+    _trace = None
+
+def dump_trace():
+    """
+    Returns the recorded pin writes, oldest first, as a list of (channel, value, timestamp) tuples
+    """
+    if _trace is None:
+        return []
+    start = max(0, _trace.count - _trace.capacity)
+    return [(_trace.pins[i % _trace.capacity], _trace.values[i % _trace.capacity], _trace.timestamps[i % _trace.capacity])
+            for i in range(start, _trace.count)]
 
 def wait_for_edge(channel,edge,bouncetime,timeout):
     """
@@ -131,10 +245,10 @@ def wait_for_edge(channel,edge,bouncetime,timeout):
     [bouncetime] - time allowed between calls to allow for switchbounce
     [timeout]    - timeout in ms
     """
-    logger.info("Waiting for edge : {} on channel : {} with bounce time : {} and Timeout :{}".format(edge,channel,bouncetime,timeout))
+    logger.info("Waiting for edge : %s on channel : %s with bounce time : %s and Timeout :%s", edge,channel,bouncetime,timeout)
 
 
-def add_event_detect(channel,edge,callback,bouncetime):
+def add_event_detect(channel,edge,callback=None,bouncetime=None):
     """
     Enable edge detection events for a particular GPIO channel.
     channel      - either board pin number or BCM number depending on which mode is set.
@@ -142,14 +256,19 @@ def add_event_detect(channel,edge,callback,bouncetime):
     [callback]   - A callback function for the event (optional)
     [bouncetime] - Switch bounce timeout in ms for callback
     """
-    logger.info("Event detect added for edge : {} on channel : {} with bounce time : {} and callback {}".format(edge,channel,bouncetime,callback))
+    logger.info("Event detect added for edge : %s on channel : %s with bounce time : %s and callback %s", edge,channel,bouncetime,callback)
+    _event_edges[channel] = edge
+    _event_callbacks[channel] = [callback] if callback is not None else []
 
 def event_detected(channel):
     """
     Returns True if an edge has occurred on a given GPIO.  You need to enable edge detection using add_event_detect() first.
     channel - either board pin number or BCM number depending on which mode is set.
     """
-    logger.info("Waiting for even detection on channel :{}".format(channel))
+    logger.info("Waiting for even detection on channel :%s", channel)
+    detected = channel in _events_detected
+    _events_detected.discard(channel)
+    return detected
 
 def add_event_callback(channel,callback):
     """
@@ -157,21 +276,25 @@ def add_event_callback(channel,callback):
     channel      - either board pin number or BCM number depending on which mode is set.
     callback     - a callback function
     """
-    logger.info("Event callback : {} added for channel : {}".format(callback,channel))
+    logger.info("Event callback : %s added for channel : %s", callback,channel)
+    _event_callbacks.setdefault(channel, []).append(callback)
 
 def remove_event_detect(channel):
     """
     Remove edge detection for a particular GPIO channel
     channel - either board pin number or BCM number depending on which mode is set.
     """
-    logger.info("Event detect removed for channel : {}".format(channel))
+    logger.info("Event detect removed for channel : %s", channel)
+    _event_edges.pop(channel, None)
+    _event_callbacks.pop(channel, None)
+    _events_detected.discard(channel)
 
 def gpio_function(channel):
     """
     Return the current GPIO function (IN, OUT, PWM, SERIAL, I2C, SPI)
     channel - either board pin number or BCM number depending on which mode is set.
     """
-    logger.info("GPIO function of channel : {} is {}".format(channel,channel_config[channel].direction))
+    logger.info("GPIO function of channel : %s is %s", channel,channel_config[channel].direction)
 
 
 class PWM:
@@ -185,7 +308,7 @@ class PWM:
         self.dutycycle = 0
         global channel_config
         channel_config[channel] = Channel(channel,PWM,)
-        logger.info("Initialized PWM for channel : {} at frequency : {}".format(channel,frequency))
+        logger.info("Initialized PWM for channel : %s at frequency : %s", channel,frequency)
 
     # where dc is the duty cycle (0.0 <= dc <= 100.0)
     def start(self, dutycycle):
@@ -194,7 +317,7 @@ class PWM:
         dutycycle - the duty cycle (0.0 to 100.0)
         """
         self.dutycycle = dutycycle
-        logger.info("Start pwm on channel : {} with duty cycle : {}".format(self.channel,dutycycle))
+        logger.info("Start pwm on channel : %s with duty cycle : %s", self.channel,dutycycle)
 
     # where freq is the new frequency in Hz
     def ChangeFrequency(self, frequency):
@@ -202,7 +325,7 @@ class PWM:
         Change the frequency
         frequency - frequency in Hz (freq > 1.0)
         """
-        logger.info("Freqency changed for channel : {} from : {} -> to : {}".format(self.channel,self.frequency,frequency))
+        logger.info("Freqency changed for channel : %s from : %s -> to : %s", self.channel,self.frequency,frequency)
         self.frequency = frequency
 
     # where 0.0 <= dc <= 100.0
@@ -212,11 +335,11 @@ class PWM:
         dutycycle - between 0.0 and 100.0
         """
         self.dutycycle = dutycycle
-        logger.info("Dutycycle changed for channel : {} from : {} -> to : {}".format(self.channel,self.dutycycle,dutycycle))
+        logger.info("Dutycycle changed for channel : %s from : %s -> to : %s", self.channel,self.dutycycle,dutycycle)
 
     # stop PWM generation
     def stop(self):
-        logger.info("Stop PWM on channel : {} with duty cycle : {}".format(self.channel,self.dutycycle))
+        logger.info("Stop PWM on channel : %s with duty cycle : %s", self.channel,self.dutycycle)
 
 
 def cleanup(channel=None):
@@ -225,6 +348,6 @@ def cleanup(channel=None):
     [channel] - individual channel or list/tuple of channels to clean up.  Default - clean every channel that has been used.
     """
     if channel is not None:
-        logger.info("Cleaning up channel : {}".format(channel))
+        logger.info("Cleaning up channel : %s", channel)
     else:
         logger.info("Cleaning up all channels")
\ No newline at end of file
@@ -1,5 +1,34 @@
+from typing import Callable, Iterable
+
 from mock.board import I2C
 
+# Scripted charge readings shared by the IBS instances, see set_charge_curve
+_charge_curve = None
+_readings = 0
+_last_charge = 100
+
+
+def set_charge_curve(curve: Iterable[int] | Callable[[int], int]) -> None:
+    """
+    Script the readings of get_charge_left (mock only)
+    :param curve: either the sequence of readings (the last one keeps being returned once it is over)
+    or a function mapping the reading number (starting from 0) to the charge left
+    """
+    global _charge_curve, _readings
+    _charge_curve = curve if callable(curve) else iter(curve)
+    _readings = 0
+
+
+def reset() -> None:
+    """
+    Go back to a full battery which never drains (mock only)
+    """
+    global _charge_curve, _readings, _last_charge
+    _charge_curve = None
+    _readings = 0
+    _last_charge = 100
+
+
 class IBS:
 
     def __init__(self, i2c: I2C, address: int = 0x77):
@@ -10,4 +39,10 @@ class IBS:
         Returns the charge left.
         :return: the charge left (i.e., a percentage value from 0 to 100)
         """
-        pass
+        global _readings, _last_charge
+        if callable(_charge_curve):
+            _last_charge = _charge_curve(_readings)
+        elif _charge_curve is not None:
+            _last_charge = next(_charge_curve, _last_charge)
+        _readings += 1
+        return _last_charge
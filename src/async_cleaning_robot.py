@@ -0,0 +1,121 @@
+import asyncio
+from typing import AsyncIterator, Iterable, Iterator
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+
+class AsyncCleaningRobot(CleaningRobot):
+    """
+    Asyncio front end of CleaningRobot: motor runs, UV exposure and IBS readings are awaitable,
+    so a single event loop can drive many robots and still answer status queries while their motors run.
+    The awaitable operations are the *_async counterparts of the CleaningRobot methods: they run the same
+    command logic and pin sequences (including PWM, see enable_pwm), so the synchronous methods keep working
+    on this class too.
+    """
+
+    async def get_charge_left(self) -> int:
+        """
+        Read the IBS without blocking the event loop (the reading is an I2C transaction)
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, self._read_charge)
+
+    async def manage_cleaning_system_async(self) -> None:
+        await self._manage_charge_async()
+
+    async def _manage_charge_async(self) -> int:
+        charge_left = await self.get_charge_left()
+        self._apply_charge_level(charge_left)
+        return charge_left
+
+    async def execute_command_async(self, command: str) -> str:
+        charge_left = await self._manage_charge_async()
+        if charge_left <= 10:
+            self.last_obstacle = None
+            self._record_telemetry(charge_left)
+            return f"!{self.robot_status()}"
+        status = await self._execute_step_async(command)
+        self._record_telemetry(charge_left)
+        return status
+
+    async def execute_commands_async(self, route: str | Iterable[str],
+                                     battery_check_interval: int = 10) -> AsyncIterator[str]:
+        """
+        Awaitable counterpart of CleaningRobot.execute_commands
+        """
+        if battery_check_interval < 1:
+            raise CleaningRobotError
+        self.last_route_steps = 0
+        fuse_moves = self.fuses_forward_moves
+        commands = iter(route)
+        # Read ahead only to fuse forward moves, as execute_commands does
+        following = None
+        index = 0
+        try:
+            while True:
+                command, following = following, None
+                if command is None:
+                    command = next(commands, None)
+                    if command is None:
+                        return
+                if index % battery_check_interval == 0:
+                    charge_left = await self._manage_charge_async()
+                    if charge_left <= 10:
+                        self.last_obstacle = None
+                        self._record_telemetry(charge_left)
+                        yield f"!{self.robot_status()}"
+                        return
+                if fuse_moves and command == self.FORWARD:
+                    following = next(commands, None)
+                self._state.keep_wheel_running = following == self.FORWARD
+                status = await self._execute_step_async(command)
+                self._record_telemetry(charge_left)
+                self.last_route_steps += 1
+                yield status
+                if status != self.robot_status():
+                    return
+                index += 1
+        finally:
+            self._state.keep_wheel_running = False
+            if self._state.wheel_running:
+                await self._stop_wheel_motor_async()
+
+    async def _execute_step_async(self, command: str) -> str:
+        step = self._step(command)
+        try:
+            while True:
+                action, args = next(step)
+                await getattr(self, f"{action}_async")(*args)
+        except StopIteration as done:
+            return done.value
+
+    async def activate_uv_light_async(self) -> None:
+        for seconds in self._uv_light_waits():
+            await self._sleep_async(seconds)
+
+    async def activate_wheel_motor_async(self) -> None:
+        """
+        Let the robot move forward by activating its wheel motor, yielding to the event loop while it runs
+        """
+        await self._wait_through_async(self._wheel_motor_waits())
+
+    async def activate_rotation_motor_async(self, direction) -> None:
+        """
+        Let the robot rotate towards a given direction, yielding to the event loop while it runs
+        :param direction: "l" to turn left, "r" to turn right
+        """
+        await self._wait_through_async(self._rotation_motor_waits(direction))
+
+    async def _stop_wheel_motor_async(self) -> None:
+        await self._wait_through_async(self._wheel_stop_waits())
+
+    async def _wait_through_async(self, waits: Iterator[float]) -> None:
+        for seconds in waits:
+            if self.deployment:  # Wait only if you are deploying on the actual hardware
+                await self._sleep_async(seconds)
+
+    async def _sleep_async(self, seconds: float) -> None:
+        if self._sleep_function is None:
+            await asyncio.sleep(seconds)
+        else:
+            # The sleep of the backend (e.g., a recording or replaying one) is synchronous
+            await asyncio.get_running_loop().run_in_executor(None, self._sleep_function, seconds)
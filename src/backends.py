@@ -0,0 +1,92 @@
+import importlib
+import logging
+import os
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# Environment variable which forces the backend to use (e.g., "mock" on a development machine)
+BACKEND_ENV_VAR = "CLEANING_ROBOT_BACKEND"
+
+
+class Backend:
+    """
+    Hardware modules used by CleaningRobot: the GPIO library, the board (for the I2C bus) and the IBS library.
+    A backend may also provide the sleep function of the robots (e.g., to elide the sleeps when replaying a trace);
+    by default they use time.sleep.
+    """
+
+    def __init__(self, name: str, gpio, board, ibs, deployment: bool, sleep: Callable[[float], None] | None = None):
+        self.name = name
+        self.gpio = gpio
+        self.board = board
+        self.ibs = ibs
+        self.deployment = deployment
+        self.sleep = sleep
+
+
+def _load_rpi() -> Backend:
+    return Backend("rpi", importlib.import_module("RPi.GPIO"), importlib.import_module("board"),
+                   importlib.import_module("IBS"), deployment=True)
+
+
+def _load_mock() -> Backend:
+    return Backend("mock", importlib.import_module("mock.GPIO"), importlib.import_module("mock.board"),
+                   importlib.import_module("mock.ibs"), deployment=False)
+
+
+_loaders = {"rpi": _load_rpi, "mock": _load_mock}
+# Backends tried in order when none is forced
+_default_order = ["rpi", "mock"]
+_backend = None
+
+
+def register_backend(name: str, loader: Callable[[], Backend]) -> None:
+    """
+    Register a backend which can then be selected by name
+    :param loader: function importing the backend modules; it raises an exception (e.g., ImportError)
+    if they are not available
+    """
+    _loaders[name] = loader
+
+
+def select_backend(name: str) -> Backend:
+    """
+    Load the given backend and use it for the robots created from now on
+    """
+    global _backend
+    loader = _loaders.get(name)
+    if loader is None:
+        from src.cleaning_robot import CleaningRobotError  # Not at module level, cleaning_robot imports this module
+        raise CleaningRobotError(f"Unknown backend: {name}")
+    _backend = loader()
+    logger.info("Using %s backend", name)
+    return _backend
+
+
+def get_backend() -> Backend:
+    """
+    Return the current backend, loading it on first use: the one named by CLEANING_ROBOT_BACKEND if set,
+    otherwise the first backend of the default order whose modules can be loaded. Off a Raspberry Pi, the rpi
+    modules may fail with other errors than ImportError (e.g., RuntimeError from RPi.GPIO or NotImplementedError
+    from Blinka's board), which also make the next backend be tried; a forced backend is never skipped.
+    """
+    if _backend is not None:
+        return _backend
+    forced = os.getenv(BACKEND_ENV_VAR)
+    if forced:
+        return select_backend(forced)
+    for name in _default_order:
+        try:
+            return select_backend(name)
+        except Exception:
+            logger.debug("Backend %s is not available", name, exc_info=True)
+    raise ImportError("No hardware backend available")
+
+
+def reset_backend() -> None:
+    """
+    Forget the current backend, so that the next get_backend call selects it again
+    """
+    global _backend
+    _backend = None
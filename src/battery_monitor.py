@@ -0,0 +1,76 @@
+import time
+from collections import deque
+from typing import Callable
+
+
+class BatteryMonitor:
+    """
+    Caching layer in front of the IBS: a reading is reused for ttl seconds instead of doing another
+    I2C transaction, and the recent readings are used to fit a linear drain-rate model, so that it is
+    possible to predict when the charge will cross a threshold.
+    """
+
+    def __init__(self, ibs, ttl: float = 5.0, window: int = 20, clock: Callable[[], float] = time.monotonic):
+        """
+        :param ibs: the IBS to read
+        :param ttl: seconds during which a reading is reused
+        :param window: number of readings used to fit the drain rate
+        :param clock: function returning the current time in seconds
+        """
+        self.ibs = ibs
+        self.ttl = ttl
+        self.clock = clock
+        self.samples = deque(maxlen=window)
+        self.readings = 0
+
+    def charge_left(self) -> int:
+        now = self.clock()
+        if self.samples and now - self.samples[-1][0] < self.ttl:
+            return self.samples[-1][1]
+        charge = self.ibs.get_charge_left()
+        self.readings += 1
+        self.samples.append((now, charge))
+        return charge
+
+    def invalidate(self) -> None:
+        """
+        Force the next charge_left call to read the IBS (e.g., after the robot has been recharged)
+        """
+        self.samples.clear()
+
+    def drain_rate(self) -> float | None:
+        """
+        :return: charge percentage consumed per second (least squares over the recent readings),
+        or None if there are not enough readings yet
+        """
+        if len(self.samples) < 2:
+            return None
+        count = len(self.samples)
+        mean_time = sum(sample[0] for sample in self.samples) / count
+        mean_charge = sum(sample[1] for sample in self.samples) / count
+        variance = sum((sample[0] - mean_time) ** 2 for sample in self.samples)
+        if variance == 0:
+            return None
+        covariance = sum((sample[0] - mean_time) * (sample[1] - mean_charge) for sample in self.samples)
+        return -covariance / variance
+
+    def predict_charge(self, seconds: float) -> float | None:
+        """
+        :return: the charge expected in the given number of seconds from now
+        """
+        rate = self.drain_rate()
+        if rate is None:
+            return None
+        last_time, last_charge = self.samples[-1]
+        return last_charge - rate * (self.clock() - last_time + seconds)
+
+    def time_to_threshold(self, threshold: float = 10) -> float | None:
+        """
+        :return: seconds from now until the charge reaches the threshold (0 if already reached),
+        or None if the charge is not draining
+        """
+        rate = self.drain_rate()
+        if rate is None or rate <= 0:
+            return None
+        last_time, last_charge = self.samples[-1]
+        return max(0.0, (last_charge - threshold) / rate - (self.clock() - last_time))
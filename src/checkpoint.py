@@ -0,0 +1,217 @@
+import json
+import os
+from typing import Iterator
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+
+class Checkpoint:
+    """
+    State needed to resume a route: position and heading of the robot, the route with the number of commands
+    already executed, and the obstacles known so far.
+    pending is the index of a command the robot started but whose outcome was never saved (i.e., the process
+    stopped while executing it), None if there is none.
+    """
+
+    __slots__ = ("x", "y", "heading", "route", "cursor", "obstacles", "pending")
+
+    def __init__(self, x: int, y: int, heading: str, route: str, cursor: int, obstacles: set[tuple[int, int]],
+                 pending: int | None = None):
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.route = route
+        self.cursor = cursor
+        self.obstacles = obstacles
+        self.pending = pending
+
+    def to_json(self) -> str:
+        return json.dumps({"x": self.x, "y": self.y, "heading": self.heading, "route": self.route,
+                           "cursor": self.cursor, "obstacles": sorted(self.obstacles)}, separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, text: str) -> "Checkpoint":
+        data = json.loads(text)
+        return cls(data["x"], data["y"], data["heading"], data["route"], data["cursor"],
+                   {(x, y) for x, y in data["obstacles"]})
+
+    def apply(self, record: dict) -> None:
+        """
+        Update the checkpoint with a record appended to its file
+        """
+        if "intent" in record:
+            self.pending = record["intent"]
+            return
+        self.x, self.y, self.heading, self.cursor = record["x"], record["y"], record["heading"], record["cursor"]
+        if "obstacle" in record:
+            self.obstacles.add(tuple(record["obstacle"]))
+        self.pending = None
+
+
+def load_checkpoint(path: str) -> Checkpoint | None:
+    """
+    The file holds a snapshot of the checkpoint on its first line, followed by the records appended since
+    (see RouteCheckpointer). A last line without its newline is a record whose write was interrupted: it is ignored.
+    :return: the checkpoint saved at the given path, or None if there is none
+    :raise CleaningRobotError: if the file is not a valid checkpoint
+    """
+    try:
+        with open(path, encoding="utf-8") as file:
+            lines = file.read().split("\n")
+    except FileNotFoundError:
+        return None
+    try:
+        checkpoint = Checkpoint.from_json(lines[0])
+        for line in lines[1:-1]:
+            checkpoint.apply(json.loads(line))
+    except (ValueError, KeyError, TypeError) as error:
+        raise CleaningRobotError(f"invalid checkpoint {path}") from error
+    return checkpoint
+
+
+def save_checkpoint(path: str, checkpoint: Checkpoint, fsync: bool = True) -> None:
+    """
+    Replace the checkpoint atomically: the new content is written to a temporary file which is then renamed,
+    so that a crash leaves either the previous checkpoint or the new one, never a partial file
+    :param fsync: flush the file (and the directory entry) to the disk before returning
+    """
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(checkpoint.to_json() + "\n")
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+    os.replace(temporary, path)
+    if fsync and hasattr(os, "O_DIRECTORY"):
+        directory = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(directory)
+        finally:
+            os.close(directory)
+
+
+def append_checkpoint_record(path: str, record: dict, fsync: bool = True) -> None:
+    """
+    Append a record (see Checkpoint.apply) to a checkpoint saved by save_checkpoint
+    :param fsync: flush the file to the disk before returning
+    """
+    with open(path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(record, separators=(",", ":")) + "\n")
+        if fsync:
+            file.flush()
+            os.fsync(file.fileno())
+
+
+def _position_after(x: int, y: int, heading: str, command: str) -> tuple[int, int, str]:
+    index = CleaningRobot.HEADINGS.index(heading)
+    if command == CleaningRobot.FORWARD:
+        return x + CleaningRobot._DX[index], y + CleaningRobot._DY[index], heading
+    return x, y, CleaningRobot.HEADINGS[CleaningRobot._ROTATIONS[command][index]]
+
+
+class RouteCheckpointer:
+    """
+    Executes a route on a robot checkpointing every command, so that a restarted robot process
+    can resume the route exactly where it stopped (e.g., after a low-charge stop and a recharge)
+    instead of starting again from (0,0,N).
+    The route and the robot state are saved once when the route starts; then, for every command, its index is
+    appended before the motors are activated and the new state (with the obstacle found, if any) once it is done,
+    so that saving a command does not depend on the length of the route.
+    """
+
+    def __init__(self, robot: CleaningRobot, path: str, fsync: bool = True, battery_check_interval: int = 10):
+        self.robot = robot
+        self.path = path
+        self.fsync = fsync
+        self.battery_check_interval = battery_check_interval
+        self.route = ""
+        self.cursor = 0
+        self._obstacles = set()
+
+    @property
+    def done(self) -> bool:
+        return self.cursor >= len(self.route)
+
+    def run(self, route: str) -> Iterator[str]:
+        """
+        Start a new route from the current state of the robot
+        :return: the statuses, as execute_commands yields them
+        """
+        if any(command not in (CleaningRobot.FORWARD, CleaningRobot.LEFT, CleaningRobot.RIGHT) for command in route):
+            raise CleaningRobotError
+        self.route = route
+        self.cursor = 0
+        self._obstacles = set(self.robot.room_map.blocked_cells())
+        self.save()
+        return self._execute()
+
+    def resume(self, position: tuple[int, int, str] | None = None) -> Iterator[str]:
+        """
+        Restore the robot state from the checkpoint and continue its route with the next command to execute.
+        As with execute_commands, the statuses stop at the first obstacle or low-charge status;
+        calling resume again continues from there.
+        If the process stopped while the robot was executing a command, the saved state does not tell whether
+        the command moved the robot: its actual position must be given, and it must be either the one before
+        the command (which is executed again) or the one after it (which is skipped).
+        :param position: the (x, y, heading) of the robot, e.g., as located by the operator
+        :raise CleaningRobotError: if there is no checkpoint to resume from, or if the robot position is needed
+        and not given or not consistent with the checkpoint
+        """
+        checkpoint = load_checkpoint(self.path)
+        if checkpoint is None:
+            raise CleaningRobotError(f"no checkpoint at {self.path}")
+        if checkpoint.pending is not None:
+            self._settle_pending(checkpoint, position)
+        robot = self.robot
+        robot.pos_x, robot.pos_y, robot.heading = checkpoint.x, checkpoint.y, checkpoint.heading
+        for cell in checkpoint.obstacles:
+            robot.room_map.mark_blocked(cell)
+        self.route = checkpoint.route
+        self.cursor = checkpoint.cursor
+        self._obstacles = checkpoint.obstacles
+        # Compact the records appended so far into a new snapshot
+        self.save()
+        return self._execute()
+
+    @staticmethod
+    def _settle_pending(checkpoint: Checkpoint, position: tuple[int, int, str] | None) -> None:
+        if position is None:
+            raise CleaningRobotError(f"interrupted during command {checkpoint.pending}, the robot position is needed")
+        position = tuple(position)
+        if position == (checkpoint.x, checkpoint.y, checkpoint.heading):
+            return
+        after = _position_after(checkpoint.x, checkpoint.y, checkpoint.heading, checkpoint.route[checkpoint.pending])
+        if position != after:
+            raise CleaningRobotError(f"position {position} does not follow the checkpoint")
+        checkpoint.x, checkpoint.y, checkpoint.heading = after
+        checkpoint.cursor = checkpoint.pending + 1
+
+    def save(self) -> None:
+        """
+        Save a snapshot of the route and of the robot state
+        """
+        robot = self.robot
+        save_checkpoint(self.path, Checkpoint(robot.pos_x, robot.pos_y, robot.heading, self.route, self.cursor,
+                                              self._obstacles), self.fsync)
+
+    def _execute(self) -> Iterator[str]:
+        robot = self.robot
+        statuses = robot.execute_commands(self.route[self.cursor:], self.battery_check_interval)
+        try:
+            while not self.done:
+                # Each command runs when the next status is requested: record it is about to move the robot
+                append_checkpoint_record(self.path, {"intent": self.cursor}, self.fsync)
+                status = next(statuses)
+                record = {"cursor": self.cursor, "x": robot.pos_x, "y": robot.pos_y, "heading": robot.heading}
+                if status[0] != "!":
+                    self.cursor += 1
+                    record["cursor"] = self.cursor
+                    if robot.last_obstacle is not None and robot.last_obstacle not in self._obstacles:
+                        self._obstacles.add(robot.last_obstacle)
+                        record["obstacle"] = robot.last_obstacle
+                append_checkpoint_record(self.path, record, self.fsync)
+                yield status
+                if status != robot.robot_status():
+                    return
+        finally:
+            statuses.close()
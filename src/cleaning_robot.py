@@ -1,18 +1,93 @@
+import threading
 import time
+from typing import Callable, Generator, Iterable, Iterator
 
-from sympy.physics.units import charge
+from src import backends
+from src.instrumentation import Instrumentation, InstrumentedGPIO, InstrumentedIBS, instrumented_class
+from src.room_map import RoomMap
 
-DEPLOYMENT = False  # This variable is to understand whether you are deploying on the actual hardware
 
-try:
-    import RPi.GPIO as GPIO
-    import board
-    import IBS
-    DEPLOYMENT = True
-except:
-    import mock.GPIO as GPIO
-    import mock.board as board
-    import mock.ibs as IBS
+def __getattr__(name: str):
+    """
+    Resolve the hardware modules (GPIO, board, IBS) and DEPLOYMENT lazily, from the selected backend
+    """
+    if name == "DEPLOYMENT":  # This variable is to understand whether you are deploying on the actual hardware
+        return backends.get_backend().deployment
+    if name in ("GPIO", "board", "IBS"):
+        return getattr(backends.get_backend(), name.lower())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+class PinGroup:
+    """
+    Pins written together: each named state (e.g., "forward", "stop") is applied with a single
+    GPIO.output call on the whole list of pins
+    """
+
+    __slots__ = ("gpio", "channels", "states")
+
+    def __init__(self, gpio, channels: list[int], states: dict[str, list[int]]):
+        self.gpio = gpio
+        self.channels = channels
+        self.states = states
+
+    def apply(self, state: str) -> None:
+        self.gpio.output(self.channels, self.states[state])
+
+
+class MotorProfile:
+    """
+    PWM speed and acceleration profile of the motors: the duty cycle is ramped up to the cruise value
+    in ramp_steps steps over ramp_time seconds, and ramped down the same way before stopping
+    """
+
+    def __init__(self, duty_cycle: float = 100, ramp_steps: int = 4, ramp_time: float = 0.2,
+                 cell_time: float = 0.5, rotation_time: float = 0.6, frequency: float = 1000):
+        """
+        :param duty_cycle: cruise duty cycle (0.0 to 100.0)
+        :param cell_time: seconds needed to cross a cell at full duty cycle
+        :param rotation_time: seconds needed to rotate by 90 degrees at full duty cycle
+        :param frequency: PWM frequency in Hz
+        """
+        if not 0 < duty_cycle <= 100 or ramp_steps < 1:
+            raise CleaningRobotError
+        self.duty_cycle = duty_cycle
+        self.ramp_steps = ramp_steps
+        self.ramp_time = ramp_time
+        self.cell_time = cell_time
+        self.rotation_time = rotation_time
+        self.frequency = frequency
+
+    def ramp_up(self) -> list[float]:
+        return [self.duty_cycle * step / self.ramp_steps for step in range(1, self.ramp_steps + 1)]
+
+    def ramp_down(self) -> list[float]:
+        return [self.duty_cycle * step / self.ramp_steps for step in range(self.ramp_steps - 1, -1, -1)]
+
+    def cruise_time(self, full_speed_time: float) -> float:
+        return full_speed_time * 100 / self.duty_cycle
+
+
+class RobotState:
+    """
+    State of a robot which changes with its commands: position, heading (as an index in CleaningRobot.HEADINGS)
+    and wheel motor flags. It is slotted, so that a fleet of robots stays small in memory.
+    """
+
+    __slots__ = ("x", "y", "heading", "wheel_running", "keep_wheel_running", "wheel_moving", "motor_interrupted",
+                 "obstacle_latched")
+
+    def __init__(self):
+        self.x = None
+        self.y = None
+        self.heading = None
+        # The wheel motor was left running (PWM only) and whether the next forward move reuses the run
+        self.wheel_running = False
+        self.keep_wheel_running = False
+        # The wheel motor is being started or driven, an obstacle edge interrupted it, an obstacle edge is latched
+        self.wheel_moving = False
+        self.motor_interrupted = False
+        self.obstacle_latched = False
 
 
 class CleaningRobot:
@@ -42,158 +117,545 @@ class CleaningRobot:
     RIGHT = 'r'
     FORWARD = 'f'
 
+    # Headings are stored as integers, clockwise from N, so that a rotation is a table lookup
+    HEADINGS = (N, E, S, W)
+    _HEADING_CODES = {N: 0, E: 1, S: 2, W: 3}
+    _DX = (0, 1, 0, -1)
+    _DY = (1, 0, -1, 0)
+    _ROTATIONS = {RIGHT: (1, 2, 3, 0), LEFT: (3, 0, 1, 2)}
+
+    # Motor pin groups and their states (1 is HIGH, 0 is LOW), shared by all the instances
+    _WHEEL_MOTOR_PINS = [AIN1, AIN2, PWMA, STBY]
+    _WHEEL_MOTOR_STATES = {
+        # Drive the motor clockwise, set its speed and disable STBY
+        "forward": [1, 0, 1, 1],
+        "stop": [0, 0, 0, 0]
+    }
+    _ROTATION_MOTOR_PINS = [BIN1, BIN2, PWMB, STBY]
+    _ROTATION_MOTOR_STATES = {
+        LEFT: [1, 0, 1, 1],
+        RIGHT: [0, 1, 1, 1],
+        "stop": [0, 0, 0, 0]
+    }
+
     def __init__(self):
-        GPIO.setmode(GPIO.BOARD)
-        GPIO.setwarnings(False)
-        GPIO.setup(self.INFRARED_PIN, GPIO.IN)
-        GPIO.setup(self.RECHARGE_LED_PIN, GPIO.OUT)
-        GPIO.setup(self.CLEANING_SYSTEM_PIN, GPIO.OUT)
-        GPIO.setup(self.UV_LIGHT_PIN, GPIO.OUT)
-
-        GPIO.setup(self.PWMA, GPIO.OUT)
-        GPIO.setup(self.AIN2, GPIO.OUT)
-        GPIO.setup(self.AIN1, GPIO.OUT)
-        GPIO.setup(self.PWMB, GPIO.OUT)
-        GPIO.setup(self.BIN2, GPIO.OUT)
-        GPIO.setup(self.BIN1, GPIO.OUT)
-        GPIO.setup(self.STBY, GPIO.OUT)
-
-        ic2 = board.I2C()
-        self.ibs = IBS.IBS(ic2)
-
-        self.pos_x = None
-        self.pos_y = None
-        self.heading = None
+        backend = backends.get_backend()
+        # The GPIO backend may have been set already by a simulator, with a per-instance stand-in
+        if getattr(self, "gpio", None) is None:
+            self.gpio = backend.gpio
+        self.deployment = backend.deployment
+        self._sleep_function = backend.sleep
+        self.gpio.setmode(self.gpio.BOARD)
+        self.gpio.setwarnings(False)
+        self.gpio.setup(self.INFRARED_PIN, self.gpio.IN)
+        self.gpio.setup(self.RECHARGE_LED_PIN, self.gpio.OUT)
+        self.gpio.setup(self.CLEANING_SYSTEM_PIN, self.gpio.OUT)
+        self.gpio.setup(self.UV_LIGHT_PIN, self.gpio.OUT)
+
+        self.gpio.setup(self.PWMA, self.gpio.OUT)
+        self.gpio.setup(self.AIN2, self.gpio.OUT)
+        self.gpio.setup(self.AIN1, self.gpio.OUT)
+        self.gpio.setup(self.PWMB, self.gpio.OUT)
+        self.gpio.setup(self.BIN2, self.gpio.OUT)
+        self.gpio.setup(self.BIN1, self.gpio.OUT)
+        self.gpio.setup(self.STBY, self.gpio.OUT)
+
+        self.wheel_motor_pins = PinGroup(self.gpio, self._WHEEL_MOTOR_PINS, self._WHEEL_MOTOR_STATES)
+        self.rotation_motor_pins = PinGroup(self.gpio, self._ROTATION_MOTOR_PINS, self._ROTATION_MOTOR_STATES)
+
+        ic2 = backend.board.I2C()
+        self.ibs = backend.ibs.IBS(ic2)
+
+        self._state = RobotState()
 
         self.recharge_led_on = False
         self.cleaning_system_on = False
+        # Seconds the UV light stays on over each cell reached, when it is not delegated to a UV scheduler
+        self.uv_exposure_time = 30
+
+        self.last_route_steps = 0
+        # Obstacle reported by the last command, if any
+        self.last_obstacle = None
+        # When set (e.g., to a TelemetryWriter), every state transition is recorded through it
+        self.telemetry = None
+
+        self.room_map = RoomMap()
+
+        # When set (e.g., to a UVScheduler), the UV exposure runs in the background instead of blocking
+        self._uv_scheduler = None
+
+        # When set (e.g., to a BatteryMonitor), the charge is read through it instead of directly from the IBS
+        self.battery_monitor = None
+        # Last level written to the cleaning system and recharge LED pins, to skip redundant writes
+        self._output_levels = {}
 
+        # PWM speed control, see enable_pwm
+        self.motor_profile = None
+        self.wheel_pwm = None
+        self.rotation_pwm = None
+        self.wheel_direction_pins = None
+        self.rotation_direction_pins = None
+
+        # Edge-triggered obstacle detection, see enable_obstacle_interrupts
+        self.obstacle_interrupts = False
+        # The edge callback runs in a thread of the GPIO library: this lock serializes it with the starts and stops
+        # of the wheel motor, so that an edge cannot be lost between a check of the obstacle state and a pin write
+        self._motor_lock = threading.Lock()
+
+        # Per-stage timings and hardware call counters, see enable_instrumentation
+        self.instrumentation = None
+
+        # When set (e.g., to a CoverageHeatmap), every cell reached by a forward move is recorded in it
+        self.coverage = None
 
     def initialize_robot(self) -> None:
         self.pos_x = 0
         self.pos_y = 0
         self.heading = "N"
+        self.room_map.mark_visited((self.pos_x, self.pos_y))
+
+    @property
+    def pos_x(self) -> int | None:
+        return self._state.x
+
+    @pos_x.setter
+    def pos_x(self, x: int | None) -> None:
+        self._state.x = x
+
+    @property
+    def pos_y(self) -> int | None:
+        return self._state.y
+
+    @pos_y.setter
+    def pos_y(self, y: int | None) -> None:
+        self._state.y = y
+
+    @property
+    def heading(self) -> str | None:
+        return None if self._state.heading is None else self.HEADINGS[self._state.heading]
+
+    @heading.setter
+    def heading(self, heading: str | None) -> None:
+        self._state.heading = None if heading is None else self._HEADING_CODES[heading]
+
+    @property
+    def fuses_forward_moves(self) -> bool:
+        """
+        With PWM and background UV exposure, consecutive forward moves are fused in a single motor run
+        """
+        return self.motor_profile is not None and self.uv_scheduler is not None
+
+    @property
+    def uv_scheduler(self):
+        return self._uv_scheduler
+
+    @uv_scheduler.setter
+    def uv_scheduler(self, scheduler) -> None:
+        """
+        A scheduler with a bind method (e.g., a UVScheduler) is bound to the robot, so that it drives the UV light
+        through the robot's GPIO and waits with the robot's sleep
+        """
+        if scheduler is not None and hasattr(scheduler, "bind"):
+            scheduler.bind(self)
+        self._uv_scheduler = scheduler
 
     def robot_status(self) -> str:
-        pos_x_string = str(self.pos_x)
-        pos_y_string = str(self.pos_y)
-        status = "(" + pos_x_string + "," + pos_y_string + "," + self.heading + ")"
-        return status
+        state = self._state
+        return "(" + str(state.x) + "," + str(state.y) + "," + self.HEADINGS[state.heading] + ")"
 
     def execute_command(self, command: str) -> str:
-        self.manage_cleaning_system()
-        charge_left = self.ibs.get_charge_left()
+        charge_left = self._manage_charge()
         if charge_left <= 10:
+            self.last_obstacle = None
+            self._record_telemetry(charge_left)
             return f"!{self.robot_status()}"
+        status = self._execute_step(command)
+        self._record_telemetry(charge_left)
+        return status
 
+    def execute_commands(self, route: str | Iterable[str], battery_check_interval: int = 10) -> Iterator[str]:
+        """
+        Execute a whole route, yielding the status string of each step.
+        The IBS is sampled only every battery_check_interval steps; the route stops at the first
+        low-charge or obstacle status. The number of executed steps is stored in last_route_steps.
+        :param route: a command string (e.g., "ffrfl"), an iterable of single commands or a RoutePlan
+        (see route_compiler.compile_route, which validates the whole route before anything moves)
+        :param battery_check_interval: number of steps between two battery readings
+        """
+        if battery_check_interval < 1:
+            raise CleaningRobotError
+        self.last_route_steps = 0
+        fuse_moves = self.fuses_forward_moves
+        commands = iter(route)
+        # The command after a forward move is read ahead only to know whether the move can be fused with it,
+        # so that a lazy route (e.g., streamed from the RMS) does not wait for the next command otherwise
+        following = None
+        index = 0
+        try:
+            while True:
+                command, following = following, None
+                if command is None:
+                    command = next(commands, None)
+                    if command is None:
+                        return
+                if index % battery_check_interval == 0:
+                    charge_left = self._manage_charge()
+                    if charge_left <= 10:
+                        self.last_obstacle = None
+                        self._record_telemetry(charge_left)
+                        yield f"!{self.robot_status()}"
+                        return
+                if fuse_moves and command == self.FORWARD:
+                    following = next(commands, None)
+                self._state.keep_wheel_running = following == self.FORWARD
+                status = self._execute_step(command)
+                self._record_telemetry(charge_left)
+                self.last_route_steps += 1
+                yield status
+                if status != self.robot_status():
+                    return
+                index += 1
+        finally:
+            self._state.keep_wheel_running = False
+            if self._state.wheel_running:
+                self._stop_wheel_motor()
+
+    def _execute_step(self, command: str) -> str:
+        step = self._step(command)
+        try:
+            while True:
+                action, args = next(step)
+                getattr(self, action)(*args)
+        except StopIteration as done:
+            return done.value
+
+    def _step(self, command: str) -> Generator[tuple[str, tuple], None, str]:
+        """
+        Logic of a single command, shared by the synchronous and the asynchronous robots: it yields the name
+        and the arguments of each actuation to perform (e.g., "activate_wheel_motor", which AsyncCleaningRobot
+        performs as activate_wheel_motor_async), and returns the status of the command
+        """
+        self.last_obstacle = None
         if command == "f":
-            if self.obstacle_found():
-                if self.heading == "N":
-                    obstacle_pos = (self.pos_x, self.pos_y + 1)
-                elif self.heading == "S":
-                    obstacle_pos = (self.pos_x, self.pos_y - 1)
-                elif self.heading == "E":
-                    obstacle_pos = (self.pos_x + 1, self.pos_y)
-                elif self.heading == "W":
-                    obstacle_pos = (self.pos_x - 1, self.pos_y)
-                return f"{self.robot_status()}({obstacle_pos[0]},{obstacle_pos[1]})"
-            if self.heading == "N":
-                self.pos_y += 1
-            elif self.heading == "S":
-                self.pos_y -= 1
-            elif self.heading == "E":
-                self.pos_x += 1
-            elif self.heading == "W":
-                self.pos_x -= 1
-            self.activate_wheel_motor()
-            self.activate_uv_light()
+            target = self._cell_ahead()
+            # A cell already known to be blocked does not need another infrared reading
+            if self.room_map.is_blocked(target) or self.obstacle_found():
+                self.room_map.mark_blocked(target)
+                self.last_obstacle = target
+                if self._state.wheel_running:
+                    yield "_stop_wheel_motor", ()
+                return f"{self.robot_status()}({target[0]},{target[1]})"
+            self._state.motor_interrupted = False
+            yield "activate_wheel_motor", ()
+            if self._state.motor_interrupted:  # An obstacle showed up while the robot was moving
+                self.room_map.mark_blocked(target)
+                self.last_obstacle = target
+                return f"{self.robot_status()}({target[0]},{target[1]})"
+            self._state.x, self._state.y = target
+            self.room_map.mark_visited(target)
+            if self.coverage is not None:
+                # The exposure is counted once it is done (by the UV scheduler, if any)
+                self.coverage.record_move(target, self.cleaning_system_on, uv=False)
+            if self.uv_scheduler is None:
+                yield "activate_uv_light", ()
+                if self.coverage is not None:
+                    self.coverage.record_uv(target)
+            else:
+                self.uv_scheduler.schedule(target)
             return self.robot_status()
-        if command == "r":
-            self.activate_rotation_motor("r")
-            self.heading = {
-                "N": "E",
-                "E": "S",
-                "S": "W",
-                "W": "N"
-            }[self.heading]
-            return self.robot_status()
-        if command == "l":
-            self.activate_rotation_motor("l")
-            self.heading = {
-                "N": "W",
-                "E": "N",
-                "S": "E",
-                "W": "S"
-            }[self.heading]
+        if command == "r" or command == "l":
+            if self._state.heading is None:
+                raise CleaningRobotError
+            yield "activate_rotation_motor", (command,)
+            self._state.heading = self._ROTATIONS[command][self._state.heading]
             return self.robot_status()
 
         raise CleaningRobotError
 
+    def _cell_ahead(self) -> tuple[int, int]:
+        """
+        :return: the cell in front of the robot, given its current position and heading
+        """
+        state = self._state
+        if state.heading is None:
+            raise CleaningRobotError
+        return state.x + self._DX[state.heading], state.y + self._DY[state.heading]
+
     def obstacle_found(self) -> bool:
-        return GPIO.input(self.INFRARED_PIN)
+        if self.obstacle_interrupts:
+            return self._state.obstacle_latched
+        return self.gpio.input(self.INFRARED_PIN)
+
+    def enable_obstacle_interrupts(self, bouncetime: int = 20) -> None:
+        """
+        Detect obstacles through the edges of the infrared pin instead of polling it: the obstacle state
+        is latched by the edge callback, and a rising edge stops the wheel motor immediately
+        :param bouncetime: switch bounce timeout in ms
+        """
+        with self._motor_lock:
+            self._state.obstacle_latched = bool(self.gpio.input(self.INFRARED_PIN))
+        self.gpio.add_event_detect(self.INFRARED_PIN, self.gpio.BOTH, callback=self._on_infrared_edge, bouncetime=bouncetime)
+        self.obstacle_interrupts = True
+
+    def disable_obstacle_interrupts(self) -> None:
+        self.gpio.remove_event_detect(self.INFRARED_PIN)
+        self.obstacle_interrupts = False
+
+    def _on_infrared_edge(self, channel) -> None:
+        with self._motor_lock:
+            self._state.obstacle_latched = bool(self.gpio.input(channel))
+            if self._state.obstacle_latched and (self._state.wheel_moving or self._state.wheel_running):
+                self._state.motor_interrupted = True
+                if self._state.wheel_running:
+                    self.wheel_pwm.stop()
+                    self.wheel_direction_pins.apply("stop")
+                    self._state.wheel_running = False
+                else:
+                    self.wheel_motor_pins.apply("stop")
 
     def manage_cleaning_system(self) -> None:
-        charge_left = int(self.ibs.get_charge_left())
-        if charge_left <= 10:
-            GPIO.output(self.CLEANING_SYSTEM_PIN, False)
+        self._manage_charge()
+
+    def _manage_charge(self) -> int:
+        """
+        Read the charge and switch the cleaning system and the recharge LED accordingly
+        :return: the charge left
+        """
+        charge_left = self._read_charge()
+        self._apply_charge_level(charge_left)
+        return charge_left
+
+    def _record_telemetry(self, charge_left: int) -> None:
+        if self.telemetry is not None:
+            self.telemetry.record(self, charge_left, self.last_obstacle)
+
+    def _read_charge(self) -> int:
+        if self.battery_monitor is not None:
+            return self.battery_monitor.charge_left()
+        return self.ibs.get_charge_left()
+
+    def _apply_charge_level(self, charge_left: int) -> None:
+        if int(charge_left) <= 10:
+            self._output_if_changed(self.CLEANING_SYSTEM_PIN, False)
             self.cleaning_system_on = False
-            GPIO.output(self.RECHARGE_LED_PIN, True)
+            self._output_if_changed(self.RECHARGE_LED_PIN, True)
             self.recharge_led_on = True
         else:
-            GPIO.output(self.CLEANING_SYSTEM_PIN, True)
+            self._output_if_changed(self.CLEANING_SYSTEM_PIN, True)
             self.cleaning_system_on = True
-            GPIO.output(self.RECHARGE_LED_PIN, False)
+            self._output_if_changed(self.RECHARGE_LED_PIN, False)
             self.recharge_led_on = False
 
+    def _output_if_changed(self, channel: int, value: bool) -> None:
+        if self._output_levels.get(channel) != value:
+            self.gpio.output(channel, value)
+            self._output_levels[channel] = value
+
+    def affordable_route(self, route: str, threshold: float = 10) -> str:
+        """
+        Shorten a route to the commands which can be executed before the charge is predicted to reach
+        the threshold, according to the drain rate fitted by the battery monitor
+        :return: the longest executable prefix of the route (the whole route if no prediction is available)
+        """
+        if self.battery_monitor is None:
+            return route
+        remaining = self.battery_monitor.time_to_threshold(threshold)
+        if remaining is None:
+            return route
+        elapsed = 0.0
+        for index, command in enumerate(route):
+            elapsed += self.command_duration(command)
+            if elapsed > remaining:
+                return route[:index]
+        return route
+
+    def command_duration(self, command: str) -> float:
+        """
+        :return: the expected seconds needed to execute a command on the actual hardware
+        """
+        profile = self.motor_profile
+        if command == self.FORWARD:
+            duration = 1 if profile is None else profile.cruise_time(profile.cell_time) + 2 * profile.ramp_time
+            if self.uv_scheduler is None:
+                duration += 30
+            return duration
+        if profile is not None:
+            return profile.cruise_time(profile.rotation_time) + 2 * profile.ramp_time
+        return 1
+
     def activate_uv_light(self) -> None:
-        GPIO.output(self.UV_LIGHT_PIN, True)
-        time.sleep(30)
-        GPIO.output(self.UV_LIGHT_PIN, False)
+        for seconds in self._uv_light_waits():
+            self._sleep(seconds)
 
     def activate_wheel_motor(self) -> None:
         """
         Let the robot move forward by activating its wheel motor
         """
-        # Drive the motor clockwise
-        GPIO.output(self.AIN1, GPIO.HIGH)
-        GPIO.output(self.AIN2, GPIO.LOW)
-        # Set the motor speed
-        GPIO.output(self.PWMA, GPIO.HIGH)
-        # Disable STBY
-        GPIO.output(self.STBY, GPIO.HIGH)
-
-        if DEPLOYMENT: # Sleep only if you are deploying on the actual hardware
-            time.sleep(1) # Wait for the motor to actually move
-
-        # Stop the motor
-        GPIO.output(self.AIN1, GPIO.LOW)
-        GPIO.output(self.AIN2, GPIO.LOW)
-        GPIO.output(self.PWMA, GPIO.LOW)
-        GPIO.output(self.STBY, GPIO.LOW)
+        self._wait_through(self._wheel_motor_waits())
 
     def activate_rotation_motor(self, direction) -> None:
         """
         Let the robot rotate towards a given direction
         :param direction: "l" to turn left, "r" to turn right
         """
-        if direction == self.LEFT:
-            GPIO.output(self.BIN1, GPIO.HIGH)
-            GPIO.output(self.BIN2, GPIO.LOW)
-        elif direction == self.RIGHT:
-            GPIO.output(self.BIN1, GPIO.LOW)
-            GPIO.output(self.BIN2, GPIO.HIGH)
+        self._wait_through(self._rotation_motor_waits(direction))
+
+    # The actuations are generators writing the pins and yielding the seconds to wait in between,
+    # so that the same pin sequences are run with blocking waits here and awaited by AsyncCleaningRobot
+
+    def _uv_light_waits(self) -> Iterator[float]:
+        self.gpio.output(self.UV_LIGHT_PIN, True)
+        yield self.uv_exposure_time
+        self.gpio.output(self.UV_LIGHT_PIN, False)
+
+    def _wheel_motor_waits(self) -> Iterator[float]:
+        if self.motor_profile is not None:
+            if not self._state.wheel_running:
+                yield from self._pwm_start_waits(self.wheel_direction_pins, "forward", self.wheel_pwm)
+            if not self._state.motor_interrupted:
+                yield self.motor_profile.cruise_time(self.motor_profile.cell_time)
+            if self._state.wheel_running and not self._state.keep_wheel_running:
+                yield from self._wheel_stop_waits()
+            return
+        with self._motor_lock:
+            if self._obstacle_edge_missed():
+                return
+            self._state.wheel_moving = True
+            self.wheel_motor_pins.apply("forward")
+        yield 1
+        with self._motor_lock:
+            self._state.wheel_moving = False
+            self.wheel_motor_pins.apply("stop")
+
+    def _rotation_motor_waits(self, direction) -> Iterator[float]:
+        if direction not in (self.LEFT, self.RIGHT):
+            raise CleaningRobotError
+        if self.motor_profile is not None:
+            yield from self._pwm_start_waits(self.rotation_direction_pins, direction, self.rotation_pwm)
+            yield self.motor_profile.cruise_time(self.motor_profile.rotation_time)
+            yield from self._pwm_stop_waits(self.rotation_direction_pins, self.rotation_pwm)
+            return
+        self.rotation_motor_pins.apply(direction)
+        yield 1
+        self.rotation_motor_pins.apply("stop")
+
+    def enable_instrumentation(self, instrumentation: Instrumentation | None = None) -> Instrumentation:
+        """
+        Time the stages of the command execution into histograms and count the GPIO calls and I2C transactions,
+        by routing the hardware access through counting proxies
+        :return: the attached instrumentation
+        """
+        if self.instrumentation is not None:
+            self.disable_instrumentation()
+        self.instrumentation = instrumentation if instrumentation is not None else Instrumentation()
+        self._set_hardware(InstrumentedGPIO(self.gpio, self.instrumentation),
+                           InstrumentedIBS(self.ibs, self.instrumentation))
+        # The stages are timed by the methods of a subclass, so that robots without instrumentation pay nothing
+        self.__class__ = instrumented_class(type(self))
+        return self.instrumentation
+
+    def disable_instrumentation(self) -> None:
+        if self.instrumentation is None:
+            return
+        self.__class__ = type(self).__bases__[0]
+        self._set_hardware(self.gpio.wrapped, self.ibs.wrapped)
+        self.instrumentation = None
+
+    def _set_hardware(self, gpio, ibs) -> None:
+        self.gpio = gpio
+        for pins in (self.wheel_motor_pins, self.rotation_motor_pins,
+                     self.wheel_direction_pins, self.rotation_direction_pins):
+            if pins is not None:
+                pins.gpio = gpio
+        self.ibs = ibs
+        if self.battery_monitor is not None:
+            self.battery_monitor.ibs = ibs
+
+    def enable_pwm(self, profile: MotorProfile) -> None:
+        """
+        Drive PWMA and PWMB with PWM according to the given profile, instead of keeping them fully HIGH
+        """
+        self.motor_profile = profile
+        self.wheel_pwm = self.gpio.PWM(self.PWMA, profile.frequency)
+        self.rotation_pwm = self.gpio.PWM(self.PWMB, profile.frequency)
+        high, low = self.gpio.HIGH, self.gpio.LOW
+        self.wheel_direction_pins = PinGroup(self.gpio, [self.AIN1, self.AIN2, self.STBY], {
+            "forward": [high, low, high],
+            "stop": [low, low, low]
+        })
+        self.rotation_direction_pins = PinGroup(self.gpio, [self.BIN1, self.BIN2, self.STBY], {
+            self.LEFT: [high, low, high],
+            self.RIGHT: [low, high, high],
+            "stop": [low, low, low]
+        })
+
+    def _pwm_start_waits(self, pins: PinGroup, state: str, pwm) -> Iterator[float]:
+        wheel = pwm is self.wheel_pwm
+        with self._motor_lock:
+            if wheel:
+                if self._obstacle_edge_missed():
+                    return
+                self._state.wheel_running = True
+            pins.apply(state)
+            pwm.start(0)
+        step_time = self.motor_profile.ramp_time / self.motor_profile.ramp_steps
+        for duty_cycle in self.motor_profile.ramp_up():
+            with self._motor_lock:
+                if wheel and not self._state.wheel_running:  # Stopped by an obstacle edge meanwhile
+                    return
+                pwm.ChangeDutyCycle(duty_cycle)
+            yield step_time
+
+    def _pwm_stop_waits(self, pins: PinGroup, pwm) -> Iterator[float]:
+        wheel = pwm is self.wheel_pwm
+        step_time = self.motor_profile.ramp_time / self.motor_profile.ramp_steps
+        for duty_cycle in self.motor_profile.ramp_down():
+            with self._motor_lock:
+                if wheel and not self._state.wheel_running:
+                    return
+                pwm.ChangeDutyCycle(duty_cycle)
+            yield step_time
+        with self._motor_lock:
+            pwm.stop()
+            pins.apply("stop")
+            if wheel:
+                self._state.wheel_running = False
+
+    def _wheel_stop_waits(self) -> Iterator[float]:
+        yield from self._pwm_stop_waits(self.wheel_direction_pins, self.wheel_pwm)
+
+    def _obstacle_edge_missed(self) -> bool:
+        """
+        Called with the motor lock held, right before the wheel motor starts: an obstacle latched since
+        the obstacle check interrupts the move instead of being driven into
+        """
+        if self.obstacle_interrupts and self._state.obstacle_latched:
+            self._state.motor_interrupted = True
+            return True
+        return False
+
+    def _stop_wheel_motor(self) -> None:
+        self._wait_through(self._wheel_stop_waits())
 
-        GPIO.output(self.PWMB, GPIO.HIGH)
-        GPIO.output(self.STBY, GPIO.HIGH)
+    def _wait_through(self, waits: Iterator[float]) -> None:
+        for seconds in waits:
+            self._wait_for_motor(seconds)
 
-        if DEPLOYMENT:  # Sleep only if you are deploying on the actual hardware
-            time.sleep(1)  # Wait for the motor to actually move
+    def _wait_for_motor(self, seconds: float = 1) -> None:
+        if self.deployment:  # Sleep only if you are deploying on the actual hardware
+            self._sleep(seconds)  # Wait for the motor to actually move
 
-        # Stop the motor
-        GPIO.output(self.BIN1, GPIO.LOW)
-        GPIO.output(self.BIN2, GPIO.LOW)
-        GPIO.output(self.PWMB, GPIO.LOW)
-        GPIO.output(self.STBY, GPIO.LOW)
+    def _sleep(self, seconds: float) -> None:
+        if self._sleep_function is not None:
+            self._sleep_function(seconds)
+        else:
+            time.sleep(seconds)
+
+    def _background_sleep(self) -> Callable[[float], None]:
+        """
+        :return: function waiting for a background job (e.g., a UV exposure) which is scheduled now
+        """
+        return self._sleep
 
 
 class CleaningRobotError(Exception):
@@ -0,0 +1,140 @@
+import asyncio
+import time
+from collections import deque
+from typing import Awaitable, Callable
+
+from src.cleaning_robot import CleaningRobotError
+from src.command_server import BATCH, COMMAND, ERROR, INITIALIZE, STATUS, decode_frame, encode_frame
+
+
+class CommandClient:
+    """
+    RMS side of a CommandServer connection. Besides the request/response helpers, send and receive can be
+    used separately to pipeline frames: the responses come back in the order the frames were sent.
+    """
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect_tcp(cls, host: str, port: int) -> "CommandClient":
+        return cls(*await asyncio.open_connection(host, port))
+
+    @classmethod
+    async def connect_unix(cls, path: str) -> "CommandClient":
+        return cls(*await asyncio.open_unix_connection(path))
+
+    async def send(self, frame_type: str, body: str = "") -> None:
+        self.writer.write(encode_frame(frame_type, body))
+        await self.writer.drain()
+
+    async def receive(self) -> tuple[str, str]:
+        """
+        :return: the type and the body of the next response frame
+        :raise CleaningRobotError: if the server answered with an error or closed the connection
+        """
+        line = await self.reader.readline()
+        if not line:
+            raise CleaningRobotError
+        frame_type, body = decode_frame(line)
+        if frame_type == ERROR:
+            raise CleaningRobotError(body)
+        return frame_type, body
+
+    async def command(self, command: str) -> str:
+        await self.send(COMMAND, command)
+        return (await self.receive())[1]
+
+    async def batch(self, route: str) -> list[str]:
+        """
+        :return: the statuses of the executed commands (the route stops at the first obstacle or low charge)
+        """
+        await self.send(BATCH, route)
+        return (await self.receive())[1].split(" ")[1:]
+
+    async def status(self) -> str:
+        await self.send(STATUS)
+        return (await self.receive())[1]
+
+    async def initialize(self) -> str:
+        await self.send(INITIALIZE)
+        return (await self.receive())[1]
+
+    async def close(self) -> None:
+        self.writer.close()
+        await self.writer.wait_closed()
+
+
+async def run_load(connect: Callable[[], Awaitable[CommandClient]], route: str, connections: int = 1,
+                   depth: int = 32, batch_size: int = 0, timer: Callable[[], float] = time.perf_counter) -> dict:
+    """
+    Load generator: every connection sends the route, keeping up to depth frames in flight.
+    :param connect: coroutine function opening a new client (e.g., lambda: CommandClient.connect_tcp(host, port))
+    :param batch_size: commands per batch frame, or 0 to send one command frame per command
+    :return: commands per second and p50/p99 frame latencies (in seconds)
+    :raise CleaningRobotError: if the server answered a frame with an error or closed a connection
+    """
+    if depth < 1 or batch_size < 0:
+        raise CleaningRobotError
+    if batch_size:
+        frames = [(BATCH, route[index:index + batch_size]) for index in range(0, len(route), batch_size)]
+    else:
+        frames = [(COMMAND, command) for command in route]
+    clients = [await connect() for _ in range(connections)]
+    latencies = []
+
+    async def drive(client: CommandClient) -> int:
+        in_flight = asyncio.Semaphore(depth)
+        sent = deque()
+        commands = 0
+
+        async def receive_all():
+            nonlocal commands
+            for _ in frames:
+                frame_type, body = await client.receive()
+                latencies.append(timer() - sent.popleft())
+                in_flight.release()
+                commands += int(body.split(" ", 1)[0]) if frame_type == BATCH else 1
+
+        async def send_all():
+            for frame in frames:
+                await in_flight.acquire()
+                sent.append(timer())
+                await client.send(*frame)
+
+        # If the receiver fails (e.g., on an ERROR frame), nothing releases the sender: it must not be awaited alone
+        tasks = [asyncio.create_task(send_all()), asyncio.create_task(receive_all())]
+        try:
+            done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+            for task in done:
+                task.result()
+        finally:
+            for task in tasks:
+                task.cancel()
+        return commands
+
+    start = timer()
+    try:
+        commands = sum(await asyncio.gather(*(drive(client) for client in clients)))
+    finally:
+        for client in clients:
+            await client.close()
+    wall_time = timer() - start
+
+    latencies.sort()
+    return {
+        "connections": connections,
+        "frames": len(latencies),
+        "commands": commands,
+        "wall_time": wall_time,
+        "commands_per_second": commands / wall_time if wall_time > 0 else float("inf"),
+        "p50_latency": _percentile(latencies, 0.50),
+        "p99_latency": _percentile(latencies, 0.99),
+    }
+
+
+def _percentile(values: list[float], fraction: float) -> float | None:
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(fraction * len(values)))]
@@ -0,0 +1,147 @@
+import asyncio
+import logging
+
+from src.async_cleaning_robot import AsyncCleaningRobot
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+# Frames are single lines: a one-letter type, a space and a body. The server answers every request frame
+# with one response frame of the same type (or an ERROR frame), in the order the requests were received.
+COMMAND = "C"  # C f -> C (0,1,N)
+BATCH = "B"  # B ffrf -> B 4 (0,1,N) (0,2,N) (0,2,E) (1,2,E)
+STATUS = "S"  # S -> S (1,2,E)
+INITIALIZE = "I"  # I -> I (0,0,N)
+ERROR = "E"  # E <reason>
+
+FRAME_LIMIT = 64 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+def encode_frame(frame_type: str, body: str = "") -> bytes:
+    return f"{frame_type} {body}\n".encode("ascii") if body else f"{frame_type}\n".encode("ascii")
+
+
+def decode_frame(line: bytes) -> tuple[str, str]:
+    """
+    :return: the type and the body of a frame
+    """
+    text = line.decode("ascii", errors="replace").rstrip("\r\n")
+    return text[:1], text[2:]
+
+
+class CommandServer:
+    """
+    Asyncio server exposing a robot to the RMS over TCP or a Unix socket. Connections are persistent and
+    requests can be pipelined: the client does not need to wait for a status before sending the next frame,
+    and a batch frame executes a whole route with a single round trip.
+    Backpressure comes from the stream itself: the next frame is read only once the previous response has been
+    handed to the transport and its buffer is below the high-water mark, so a client which does not read its
+    statuses is eventually throttled by TCP flow control instead of growing the server's memory.
+    """
+
+    def __init__(self, robot: CleaningRobot, max_batch: int = 4096, offload: bool = True):
+        """
+        :param robot: the robot to drive, either a CleaningRobot or an AsyncCleaningRobot
+        :param max_batch: maximum number of commands of a batch frame
+        :param offload: run the blocking calls of a synchronous robot in the default executor, so that
+        motor runs do not stall the other connections (not needed for simulated robots)
+        """
+        self.robot = robot
+        self.max_batch = max_batch
+        self.offload = offload
+        self.connections = 0
+        self.frames = 0
+        self._asynchronous = isinstance(robot, AsyncCleaningRobot)
+        self._lock = asyncio.Lock()
+        self._server = None
+
+    async def start_tcp(self, host: str = "127.0.0.1", port: int = 0) -> tuple[str, int]:
+        """
+        :return: the address the server is listening on (useful when port is 0)
+        """
+        self._server = await asyncio.start_server(self._serve, host, port, limit=FRAME_LIMIT)
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def start_unix(self, path: str) -> None:
+        self._server = await asyncio.start_unix_server(self._serve, path, limit=FRAME_LIMIT)
+
+    async def close(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def __aenter__(self) -> "CommandServer":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def handle_frame(self, frame_type: str, body: str) -> bytes:
+        """
+        :return: the encoded response to a request frame
+        """
+        self.frames += 1
+        try:
+            async with self._lock:
+                if frame_type in (COMMAND, BATCH, STATUS) and self.robot.heading is None:
+                    return encode_frame(ERROR, "robot not initialized")
+                if frame_type == COMMAND:
+                    if len(body) != 1:
+                        raise CleaningRobotError
+                    return encode_frame(COMMAND, await self._execute_command(body))
+                if frame_type == BATCH:
+                    if len(body) > self.max_batch:
+                        return encode_frame(ERROR, "batch too long")
+                    # Reject the whole batch before anything moves, the client would not get the partial statuses
+                    if any(command not in (CleaningRobot.FORWARD, CleaningRobot.LEFT, CleaningRobot.RIGHT)
+                           for command in body):
+                        raise CleaningRobotError
+                    statuses = await self._run_batch(body)
+                    return encode_frame(BATCH, " ".join([str(len(statuses))] + statuses))
+                if frame_type == STATUS:
+                    return encode_frame(STATUS, self.robot.robot_status())
+                if frame_type == INITIALIZE:
+                    self.robot.initialize_robot()
+                    return encode_frame(INITIALIZE, self.robot.robot_status())
+        except CleaningRobotError:
+            return encode_frame(ERROR, "invalid command")
+        except Exception:
+            # Any other failure of the robot is reported to the client instead of dropping the connection
+            logger.exception("Frame %r failed", frame_type)
+            return encode_frame(ERROR, "internal error")
+        return encode_frame(ERROR, "unknown frame")
+
+    async def _execute_command(self, command: str) -> str:
+        if self._asynchronous:
+            return await self.robot.execute_command_async(command)
+        return await self._call(self.robot.execute_command, command)
+
+    async def _run_batch(self, route: str) -> list[str]:
+        if self._asynchronous:
+            return [status async for status in self.robot.execute_commands_async(route)]
+        return await self._call(lambda: list(self.robot.execute_commands(route)))
+
+    async def _call(self, function, *args):
+        if self.offload:
+            return await asyncio.get_running_loop().run_in_executor(None, function, *args)
+        return function(*args)
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:  # Frame longer than FRAME_LIMIT, the stream cannot be resynchronized
+                    writer.write(encode_frame(ERROR, "frame too long"))
+                    break
+                if not line:
+                    break
+                writer.write(await self.handle_frame(*decode_frame(line)))
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
@@ -0,0 +1,301 @@
+import multiprocessing
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.coverage_planner import CoveragePlanner
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class ReservationTable:
+    """
+    Shared occupancy table of the room: a cell can be reserved by a single robot per tick
+    """
+
+    def __init__(self):
+        self._reservations = {}
+
+    def reserve(self, cell: tuple[int, int], tick: int, robot: int) -> bool:
+        """
+        :return: True if the cell is now reserved by the robot for the tick, False if another robot holds it
+        """
+        return self._reservations.setdefault((cell, tick), robot) == robot
+
+    def holder(self, cell: tuple[int, int], tick: int) -> int | None:
+        return self._reservations.get((cell, tick))
+
+    def release_before(self, tick: int) -> None:
+        """
+        Forget the reservations of the ticks which are over
+        """
+        for key in [key for key in self._reservations if key[1] < tick]:
+            del self._reservations[key]
+
+    def __len__(self) -> int:
+        return len(self._reservations)
+
+
+class Schedule:
+    """
+    Collision-free timing of the command streams of the robots: commands[i][k] is executed by robot i
+    during tick ticks[i][k]; on the other ticks the robot waits where it is
+    """
+
+    def __init__(self, starts: list[tuple[int, int, str]], commands: list[str], ticks: list[list[int]], waits: int):
+        self.starts = starts
+        self.commands = commands
+        self.ticks = ticks
+        self.waits = waits
+
+    @property
+    def length(self) -> int:
+        """
+        :return: number of ticks needed to complete every stream
+        """
+        return max((ticks[-1] + 1 for ticks in self.ticks if ticks), default=0)
+
+    def timeline(self, robot: int) -> list[tuple[int, int]]:
+        """
+        :return: the cell occupied by the robot at the end of each tick, starting with its initial cell at index 0
+        """
+        x, y, heading = self.starts[robot]
+        heading = CleaningRobot.HEADINGS.index(heading)
+        cells = [(x, y)]
+        for tick, command in zip(self.ticks[robot], self.commands[robot]):
+            cells.extend([cells[-1]] * (tick - len(cells) + 1))
+            if command == CleaningRobot.FORWARD:
+                x, y = x + CleaningRobot._DX[heading], y + CleaningRobot._DY[heading]
+            else:
+                heading = CleaningRobot._ROTATIONS[command][heading]
+            cells.append((x, y))
+        cells.extend([cells[-1]] * (self.length + 1 - len(cells)))
+        return cells
+
+
+def _run_stream(obstacle_map: ObstacleMap, drain_model: BatteryDrainModel, initial_charge: float,
+                start: tuple[int, int, str], commands: str, ticks: list[int], length: int, barrier) -> dict:
+    """
+    Execute a command stream on a fresh simulated robot (worker side of the process pool)
+    """
+    robot = SimulatedRobot(obstacle_map, drain_model, initial_charge)
+    robot.pos_x, robot.pos_y, robot.heading = start
+    return _execute_stream(robot, commands, ticks, length, barrier)
+
+
+def _execute_stream(robot: SimulatedRobot, commands: str, ticks: list[int], length: int, barrier) -> dict:
+    """
+    Execute the commands of a robot at their scheduled ticks: at the end of each tick the robot waits
+    at the barrier for the other robots, so that the fleet moves as the schedule was computed
+    """
+    robot.room_map.mark_visited((robot.pos_x, robot.pos_y))
+    executed = obstacles = cursor = 0
+    stranded = False
+    timeline = [(robot.pos_x, robot.pos_y)]
+    try:
+        for tick in range(length):
+            if not stranded and cursor < len(commands) and ticks[cursor] == tick:
+                status = robot.execute_command(commands[cursor])
+                cursor += 1
+                if status[0] == "!":
+                    stranded = True  # The robot stays where it is for the rest of the schedule
+                else:
+                    executed += 1
+                    if robot.last_obstacle is not None:
+                        obstacles += 1
+            timeline.append((robot.pos_x, robot.pos_y))
+            barrier.wait()
+    except BaseException:
+        barrier.abort()  # Do not leave the other robots waiting for this one
+        raise
+    return {
+        "state": (robot.pos_x, robot.pos_y, robot.heading),
+        "visited": list(robot.room_map.visited_cells()),
+        "charge": robot.ibs.charge,
+        "virtual_time": robot.clock.time(),
+        "commands": executed,
+        "obstacles": obstacles,
+        "stranded": stranded,
+        "timeline": timeline,
+    }
+
+
+class Coordinator:
+    """
+    Owns the robots cleaning the same room: the room is split into one strip per robot along its longer side,
+    each robot covers its strip with a CoveragePlanner plan, and the plans are timed against a shared
+    ReservationTable so that no two robots occupy (or move into) the same cell on the same tick.
+    The command streams run in parallel on a process pool (or on a thread pool, which keeps the robots' state
+    in this process), one worker per robot, in lockstep: a robot executes each command at its scheduled tick,
+    and no robot starts a tick before every robot has completed the previous one.
+    The free cells of a strip which its robot cannot reach without leaving the strip (but which the fleet could
+    reach through a neighbouring strip) are not covered: plan reports them in unreached_cells.
+    """
+
+    def __init__(self, robot_count: int, width: int, height: int, obstacles=(),
+                 drain_model: BatteryDrainModel | None = None, initial_charge: float = 100.0):
+        if robot_count < 1 or width < 1 or height < 1:
+            raise CleaningRobotError
+        self.width = width
+        self.height = height
+        self.obstacle_map = ObstacleMap(obstacles, width, height)
+        self.drain_model = drain_model if drain_model is not None else BatteryDrainModel()
+        self.initial_charge = initial_charge
+        self.regions = self.partition(robot_count)
+        self.robots = [SimulatedRobot(self.obstacle_map, self.drain_model, initial_charge)
+                       for _ in range(robot_count)]
+        self.reservations = ReservationTable()
+        self.unreached_cells = []
+
+    def partition(self, robot_count: int) -> list[tuple[int, int, int, int]]:
+        """
+        :return: one (min_x, min_y, max_x, max_y) strip per robot, splitting the longer side of the room
+        """
+        length = max(self.width, self.height)
+        if robot_count > length:
+            raise CleaningRobotError
+        size, extra = divmod(length, robot_count)
+        regions = []
+        low = 0
+        for index in range(robot_count):
+            high = low + size + (1 if index < extra else 0) - 1
+            if self.width >= self.height:
+                regions.append((low, 0, high, self.height - 1))
+            else:
+                regions.append((0, low, self.width - 1, high))
+            low = high + 1
+        return regions
+
+    def plan(self) -> list[tuple[tuple[int, int, str], str]]:
+        """
+        :return: the start state and the coverage commands of each robot, in its own strip
+        """
+        plans = []
+        covered = set()
+        for region in self.regions:
+            planner = CoveragePlanner(self.width, self.height, self.obstacle_map.obstacles, region)
+            min_x, min_y, max_x, max_y = region
+            start = next(((x, y) for y in range(min_y, max_y + 1) for x in range(min_x, max_x + 1)
+                          if not planner.is_blocked((x, y))), None)
+            if start is None:
+                raise CleaningRobotError
+            covered |= planner.reachable_cells(start)
+            start = (start[0], start[1], CleaningRobot.N)
+            plans.append((start, planner.plan(start)))
+        room = CoveragePlanner(self.width, self.height, self.obstacle_map.obstacles)
+        reachable = set()
+        for (x, y, _), _ in plans:
+            if (x, y) not in reachable:
+                reachable |= room.reachable_cells((x, y))
+        self.unreached_cells = sorted(reachable - covered)
+        return plans
+
+    def schedule(self, plans: list[tuple[tuple[int, int, str], str]], max_wait: int = 1000) -> Schedule:
+        """
+        Time the command streams tick by tick. Every robot holds its cell for the next tick unless it moves
+        forward; a move is granted only if the target cell is neither occupied now nor reserved for the next tick,
+        otherwise the robot waits.
+        :raise CleaningRobotError: if a robot has waited for more than max_wait consecutive ticks (deadlock)
+        """
+        table = self.reservations
+        count = len(plans)
+        states = [(start[0], start[1], CleaningRobot.HEADINGS.index(start[2])) for start, _ in plans]
+        cursors = [0] * count
+        ticks = [[] for _ in range(count)]
+        waiting = [0] * count
+        waits = 0
+        for robot, (x, y, _) in enumerate(states):
+            if not table.reserve((x, y), 0, robot):
+                raise CleaningRobotError
+
+        tick = 0
+        while any(cursors[robot] < len(plans[robot][1]) for robot in range(count)):
+            occupied = {(x, y) for x, y, _ in states}
+            movers = []
+            for robot in range(count):
+                x, y, heading = states[robot]
+                commands = plans[robot][1]
+                if cursors[robot] < len(commands) and commands[cursors[robot]] == CleaningRobot.FORWARD:
+                    movers.append(robot)
+                    continue
+                table.reserve((x, y), tick + 1, robot)
+                if cursors[robot] < len(commands):
+                    states[robot] = (x, y, CleaningRobot._ROTATIONS[commands[cursors[robot]]][heading])
+                    ticks[robot].append(tick)
+                    cursors[robot] += 1
+            for robot in movers:
+                x, y, heading = states[robot]
+                target = (x + CleaningRobot._DX[heading], y + CleaningRobot._DY[heading])
+                if target not in occupied and table.reserve(target, tick + 1, robot):
+                    states[robot] = (target[0], target[1], heading)
+                    ticks[robot].append(tick)
+                    cursors[robot] += 1
+                    waiting[robot] = 0
+                else:
+                    table.reserve((x, y), tick + 1, robot)
+                    waits += 1
+                    waiting[robot] += 1
+                    if waiting[robot] > max_wait:
+                        raise CleaningRobotError
+            table.release_before(tick + 1)
+            tick += 1
+        return Schedule([start for start, _ in plans], [commands for _, commands in plans], ticks, waits)
+
+    def run(self, workers: int | None = None, pool: str = "process",
+            timer: Callable[[], float] = time.perf_counter) -> dict:
+        """
+        Plan, schedule and execute the coverage of the room
+        :param workers: size of the pool (defaults to one worker per robot, the streams run in lockstep
+        so there cannot be fewer)
+        :param pool: "process" to run the streams on separate cores, "thread" to run them in this process
+        :return: throughput statistics, including the cells cleaned per second of wall time
+        """
+        if pool not in ("process", "thread"):
+            raise CleaningRobotError
+        workers = workers or len(self.robots)
+        if workers < len(self.robots):
+            raise CleaningRobotError
+        start = timer()
+        schedule = self.schedule(self.plan())
+        if pool == "process":
+            with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=workers) as executor:
+                results = self._execute(executor, schedule, pool, manager.Barrier(len(self.robots)))
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = self._execute(executor, schedule, pool, threading.Barrier(len(self.robots)))
+        wall_time = timer() - start
+
+        cleaned = set()
+        for robot, result in zip(self.robots, results):
+            cleaned.update(result["visited"])
+            if pool == "process":
+                robot.pos_x, robot.pos_y, robot.heading = result["state"]
+                for cell in result["visited"]:
+                    robot.room_map.mark_visited(cell)
+                robot.ibs.charge = result["charge"]
+                robot.clock.now = result["virtual_time"]
+        return {
+            "robots": len(self.robots),
+            "ticks": schedule.length,
+            "waits": schedule.waits,
+            "commands": sum(result["commands"] for result in results),
+            "obstacles": sum(result["obstacles"] for result in results),
+            "stranded": sum(result["stranded"] for result in results),
+            "cells_cleaned": len(cleaned),
+            "unreached_cells": len(self.unreached_cells),
+            "wall_time": wall_time,
+            "cells_per_second": len(cleaned) / wall_time if wall_time > 0 else float("inf"),
+        }
+
+    def _execute(self, executor: Executor, schedule: Schedule, pool: str, barrier) -> list[dict]:
+        futures = []
+        for index, (robot, start, commands) in enumerate(zip(self.robots, schedule.starts, schedule.commands)):
+            ticks = schedule.ticks[index]
+            if pool == "process":
+                futures.append(executor.submit(_run_stream, self.obstacle_map, self.drain_model, self.initial_charge,
+                                               start, commands, ticks, schedule.length, barrier))
+            else:
+                robot.pos_x, robot.pos_y, robot.heading = start
+                futures.append(executor.submit(_execute_stream, robot, commands, ticks, schedule.length, barrier))
+        return [future.result() for future in futures]
@@ -0,0 +1,169 @@
+import time
+from array import array
+from typing import Callable, Iterable
+
+FIELDS = ("visits", "cleaned", "uv", "last_cleaned")
+
+
+class _Tile:
+    """
+    Square block of cells, stored row by row: visits, moves with the cleaning system on, UV exposures
+    and the time the cell was last cleaned (0 if never)
+    """
+
+    __slots__ = FIELDS
+
+    def __init__(self, size: int):
+        self.visits = array("I", bytes(4 * size * size))
+        self.cleaned = array("I", bytes(4 * size * size))
+        self.uv = array("I", bytes(4 * size * size))
+        self.last_cleaned = array("d", bytes(8 * size * size))
+
+    def copy(self) -> "_Tile":
+        tile = _Tile.__new__(_Tile)
+        for field in FIELDS:
+            setattr(tile, field, array(getattr(self, field).typecode, getattr(self, field)))
+        return tile
+
+
+class CoverageHeatmap:
+    """
+    Per-cell coverage accumulated from the successful forward moves of a robot (see CleaningRobot.coverage).
+    Cells are stored in tiles allocated only where the robot has been, so the memory grows with the area
+    actually covered, not with the size of the building. The tiles are plain arrays, so recording a move
+    does not need NumPy; exporting and merging use NumPy views of the same buffers, without copies.
+    """
+
+    TILE_SIZE = 64
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.moves = 0
+        self.covered_cells = 0
+        self._tiles = {}
+
+    def record_move(self, cell: tuple[int, int], cleaned: bool = True, uv: bool = True,
+                    timestamp: float | None = None) -> None:
+        """
+        :param cleaned: whether the cleaning system was on during the move
+        :param uv: whether the cell reached was UV-treated (see also record_uv)
+        """
+        tile, offset = self._locate(cell)
+        if not tile.visits[offset]:
+            self.covered_cells += 1
+        tile.visits[offset] += 1
+        if cleaned:
+            tile.cleaned[offset] += 1
+            tile.last_cleaned[offset] = self.clock() if timestamp is None else timestamp
+        if uv:
+            tile.uv[offset] += 1
+        self.moves += 1
+
+    def record_uv(self, cell: tuple[int, int]) -> None:
+        """
+        Count a completed UV exposure of a cell, e.g., when a background exposure ends after the move was recorded
+        """
+        tile, offset = self._locate(cell)
+        tile.uv[offset] += 1
+
+    def _locate(self, cell: tuple[int, int]) -> tuple[_Tile, int]:
+        size = self.TILE_SIZE
+        tile_x, x = divmod(cell[0], size)
+        tile_y, y = divmod(cell[1], size)
+        tile = self._tiles.get((tile_x, tile_y))
+        if tile is None:
+            tile = self._tiles[(tile_x, tile_y)] = _Tile(size)
+        return tile, y * size + x
+
+    def visits(self, cell: tuple[int, int]) -> int:
+        return self._value(cell, "visits")
+
+    def cleaned(self, cell: tuple[int, int]) -> int:
+        return self._value(cell, "cleaned")
+
+    def uv_exposures(self, cell: tuple[int, int]) -> int:
+        return self._value(cell, "uv")
+
+    def last_cleaned(self, cell: tuple[int, int]) -> float | None:
+        """
+        :return: the time the cell was last cleaned, or None if it never was
+        """
+        return self._value(cell, "last_cleaned") if self._value(cell, "cleaned") else None
+
+    @property
+    def tile_count(self) -> int:
+        return len(self._tiles)
+
+    def bounds(self) -> tuple[int, int, int, int] | None:
+        """
+        :return: (min_x, min_y, max_x, max_y) of the allocated tiles, inclusive, or None if nothing was recorded
+        """
+        if not self._tiles:
+            return None
+        size = self.TILE_SIZE
+        tiles_x = [tile_x for tile_x, _ in self._tiles]
+        tiles_y = [tile_y for _, tile_y in self._tiles]
+        return min(tiles_x) * size, min(tiles_y) * size, (max(tiles_x) + 1) * size - 1, (max(tiles_y) + 1) * size - 1
+
+    def to_numpy(self, field: str = "visits"):
+        """
+        :param field: one of "visits", "cleaned", "uv" and "last_cleaned"
+        :return: the (x, y) origin and the dense grid[x, y] of the field over the allocated tiles
+        """
+        import numpy as np
+        if field not in FIELDS:
+            raise ValueError(f"unknown field: {field}")
+        dtype = np.float64 if field == "last_cleaned" else np.uint32
+        bounds = self.bounds()
+        if bounds is None:
+            return (0, 0), np.zeros((0, 0), dtype=dtype)
+        min_x, min_y, max_x, max_y = bounds
+        size = self.TILE_SIZE
+        grid = np.zeros((max_x - min_x + 1, max_y - min_y + 1), dtype=dtype)
+        for (tile_x, tile_y), tile in self._tiles.items():
+            x, y = tile_x * size - min_x, tile_y * size - min_y
+            # The tiles are stored row by row, i.e., [y, x]
+            grid[x:x + size, y:y + size] = np.frombuffer(getattr(tile, field), dtype=dtype).reshape(size, size).T
+        return (min_x, min_y), grid
+
+    def merge(self, other: "CoverageHeatmap") -> None:
+        """
+        Add the coverage of another heatmap (e.g., of another robot or run) to this one:
+        the counts are summed and the most recent cleaning time is kept
+        """
+        import numpy as np
+        if other.TILE_SIZE != self.TILE_SIZE:
+            raise ValueError("heatmaps with different tile sizes cannot be merged")
+        for key, theirs in other._tiles.items():
+            mine = self._tiles.get(key)
+            if mine is None:
+                self._tiles[key] = theirs.copy()
+                self.covered_cells += int(np.count_nonzero(np.frombuffer(theirs.visits, dtype=np.uint32)))
+                continue
+            visits = np.frombuffer(mine.visits, dtype=np.uint32)
+            covered = np.count_nonzero(visits)
+            for field in ("visits", "cleaned", "uv"):
+                np.add(np.frombuffer(getattr(mine, field), dtype=np.uint32),
+                       np.frombuffer(getattr(theirs, field), dtype=np.uint32),
+                       out=np.frombuffer(getattr(mine, field), dtype=np.uint32))
+            last_cleaned = np.frombuffer(mine.last_cleaned, dtype=np.float64)
+            np.maximum(last_cleaned, np.frombuffer(theirs.last_cleaned, dtype=np.float64), out=last_cleaned)
+            self.covered_cells += int(np.count_nonzero(visits) - covered)
+        self.moves += other.moves
+
+    def _value(self, cell: tuple[int, int], field: str):
+        size = self.TILE_SIZE
+        tile_x, x = divmod(cell[0], size)
+        tile_y, y = divmod(cell[1], size)
+        tile = self._tiles.get((tile_x, tile_y))
+        return 0 if tile is None else getattr(tile, field)[y * size + x]
+
+
+def merge_heatmaps(heatmaps: Iterable[CoverageHeatmap]) -> CoverageHeatmap:
+    """
+    :return: a new heatmap with the coverage of all the given ones
+    """
+    merged = CoverageHeatmap()
+    for heatmap in heatmaps:
+        merged.merge(heatmap)
+    return merged
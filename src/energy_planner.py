@@ -0,0 +1,383 @@
+import heapq
+from typing import Iterable, Iterator
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+_DX, _DY = CleaningRobot._DX, CleaningRobot._DY
+# Heading reached by turning left or right from each heading
+_LEFT = CleaningRobot._ROTATIONS[CleaningRobot.LEFT]
+_RIGHT = CleaningRobot._ROTATIONS[CleaningRobot.RIGHT]
+# Commands of the paths to the dock, as indexes of the (forward, left, right) costs
+_MOVE, _TURN_LEFT, _TURN_RIGHT = 0, 1, 2
+
+
+class EnergyModel:
+    """
+    Charge percentage consumed by each command (a forward move also pays for the UV exposure of the cell it
+    reaches). The costs are calibrated from IBS readings: every observation is the number of commands executed
+    in a window with the charge they consumed, and the costs are refitted by least squares, regularized towards
+    the initial costs so that the fit stays defined when some commands always occur together (e.g., moves and
+    UV exposures).
+    """
+
+    COMMANDS = (CleaningRobot.FORWARD, CleaningRobot.LEFT, CleaningRobot.RIGHT, "uv")
+
+    def __init__(self, forward: float = 0.05, left: float = 0.02, right: float = 0.02, uv_exposure: float = 0.03,
+                 prior_weight: float = 1.0):
+        """
+        :param prior_weight: weight of the initial costs against the observations
+        """
+        self.costs = dict(zip(self.COMMANDS, (forward, left, right, uv_exposure)))
+        self.prior_weight = prior_weight
+        self.observations = 0
+        self._prior = [self.costs[command] for command in self.COMMANDS]
+        size = len(self.COMMANDS)
+        self._normal = [[0.0] * size for _ in range(size)]
+        self._moments = [0.0] * size
+
+    def cost(self, command: str) -> float:
+        if command == CleaningRobot.FORWARD:
+            return self.costs[CleaningRobot.FORWARD] + self.costs["uv"]
+        return self.costs[command]
+
+    def observe(self, counts: dict[str, int], charge_used: float) -> None:
+        """
+        :param counts: number of executed commands (and UV exposures, under "uv") by command
+        :param charge_used: charge drop measured by the IBS over the same commands
+        """
+        row = [counts.get(command, 0) for command in self.COMMANDS]
+        if not any(row):
+            return
+        for i, value in enumerate(row):
+            self._moments[i] += value * charge_used
+            for j, other in enumerate(row):
+                self._normal[i][j] += value * other
+        self.observations += 1
+        self._fit()
+
+    def _fit(self) -> None:
+        size = len(self.COMMANDS)
+        matrix = [[self._normal[i][j] + (self.prior_weight if i == j else 0.0) for j in range(size)]
+                  + [self._moments[i] + self.prior_weight * self._prior[i]] for i in range(size)]
+        for column in range(size):  # Gauss-Jordan elimination, the matrix is symmetric positive definite
+            pivot = matrix[column][column]
+            for row in range(size):
+                if row != column:
+                    factor = matrix[row][column] / pivot
+                    for index in range(column, size + 1):
+                        matrix[row][index] -= factor * matrix[column][index]
+        for index, command in enumerate(self.COMMANDS):
+            self.costs[command] = max(0.0, matrix[index][size] / matrix[index][index])
+
+
+class EnergyAwareScheduler:
+    """
+    Executes routes so that the robot always keeps enough charge to drive back to its dock: before every window
+    of commands, the route is trimmed to the commands after which the charge left, minus the cost of the cheapest
+    path back to the dock, stays above the low-charge threshold plus a reserve. A trimmed route is followed by
+    the path back to the dock, instead of leaving the robot stranded at the threshold.
+    The cheapest path back to the dock from every (x, y, heading) state is computed once by a reverse Dijkstra
+    search from the dock over the room and the known obstacles; each state keeps the number of moves and rotations
+    of its path, so that the cost of going back is re-evaluated with the calibrated costs without searching again.
+    A new obstacle only repairs the paths which cross it. The whole search is repeated only when a cost has drifted
+    by more than FIELD_DRIFT times the highest cost since the last search (then the paths may no longer be
+    the cheapest ones), and the calibration has at least doubled its observations since then: the costs are
+    noisy while the model is calibrated, and going back along a path which is not the cheapest one is still safe.
+    """
+
+    FIELD_DRIFT = 0.25
+
+    def __init__(self, robot: CleaningRobot, dock: tuple[int, int], width: int, height: int,
+                 model: EnergyModel | None = None, reserve: float = 1.0, threshold: float = 10, window: int = 10):
+        """
+        :param reserve: charge kept on top of the threshold, to absorb the error of the model
+        :param window: commands executed between two charge readings (and calibrations of the model)
+        """
+        if not (0 <= dock[0] < width and 0 <= dock[1] < height) or window < 1:
+            raise CleaningRobotError
+        self.robot = robot
+        self.dock = dock
+        self.width = width
+        self.height = height
+        self.model = model if model is not None else EnergyModel()
+        self.reserve = reserve
+        self.threshold = threshold
+        self.window = window
+        self.trimmed = 0
+        self._field = None
+        self._field_obstacles = None
+        self._field_cells = None
+        self._field_costs = None
+        self._field_observations = 0
+        self._blocked = None
+        self._next = None
+        self._moves = self._lefts = self._rights = None
+
+    def return_cost(self, state: tuple[int, int, str] | None = None) -> float:
+        """
+        :return: the charge needed to reach the dock from a state (the robot's one by default),
+        infinite if the dock cannot be reached
+        """
+        robot = self.robot
+        x, y, heading = state if state is not None else (robot.pos_x, robot.pos_y, robot.heading)
+        if not self._inside(x, y):
+            return float("inf")
+        costs = self._update_paths()
+        return self._path_cost(self._index(x, y, CleaningRobot.HEADINGS.index(heading)), costs)
+
+    def affordable_prefix(self, route: str, charge: float) -> int:
+        """
+        :return: the number of leading commands of the route which can be executed keeping the dock in reach
+        """
+        costs = self._update_paths()
+        room_map = self.robot.room_map
+        x, y, heading = self.robot.pos_x, self.robot.pos_y, CleaningRobot.HEADINGS.index(self.robot.heading)
+        floor = self.threshold + self.reserve
+        for index, command in enumerate(route):
+            if command == CleaningRobot.FORWARD:
+                target_x, target_y = x + _DX[heading], y + _DY[heading]
+                if self._inside(target_x, target_y) and not room_map.is_blocked((target_x, target_y)):
+                    charge -= self.model.cost(command)
+                    x, y = target_x, target_y
+            else:
+                charge -= self.model.cost(command)
+                heading = CleaningRobot._ROTATIONS[command][heading]
+            if charge - self._path_cost(self._index(x, y, heading), costs) < floor:
+                return index
+        return len(route)
+
+    def path_to_dock(self) -> str | None:
+        """
+        :return: the cheapest commands from the robot's state to the dock, or None if it cannot be reached
+        """
+        self._update_paths()
+        robot = self.robot
+        x, y, heading = robot.pos_x, robot.pos_y, CleaningRobot.HEADINGS.index(robot.heading)
+        if not self._inside(x, y):
+            return None
+        index = self._index(x, y, heading)
+        if self._field[index] == float("inf"):
+            return None
+        commands = []
+        while self._next[index] != -1:
+            following = self._next[index]
+            if following >> 2 != index >> 2:
+                commands.append(CleaningRobot.FORWARD)
+            elif _LEFT[index & 3] == following & 3:
+                commands.append(CleaningRobot.LEFT)
+            else:
+                commands.append(CleaningRobot.RIGHT)
+            index = following
+        return "".join(commands)
+
+    def execute(self, route: str) -> Iterator[str]:
+        """
+        Execute the affordable part of a route, calibrating the model along the way, then go back to the dock
+        if the route had to be trimmed. The number of commands left out is stored in trimmed.
+        :return: the statuses, as execute_commands yields them
+        """
+        robot = self.robot
+        cursor = 0
+        charge = robot._read_charge()
+        while cursor < len(route):
+            # Only the next window runs before the charge is read again
+            affordable = self.affordable_prefix(route[cursor:cursor + self.window], charge)
+            if affordable == 0:
+                break
+            window = route[cursor:cursor + affordable]
+            counts = {}
+            for index, status in enumerate(robot.execute_commands(window, battery_check_interval=len(window))):
+                yield status
+                if status[0] == "!":
+                    self.trimmed = len(route) - cursor - robot.last_route_steps
+                    return
+                command = window[index]
+                if command != CleaningRobot.FORWARD or robot.last_obstacle is None:
+                    counts[command] = counts.get(command, 0) + 1
+                    if command == CleaningRobot.FORWARD:
+                        counts["uv"] = counts.get("uv", 0) + 1
+            cursor += robot.last_route_steps
+            current = robot._read_charge()
+            self.model.observe(counts, charge - current)
+            charge = current
+        self.trimmed = len(route) - cursor
+        if self.trimmed:
+            yield from self.return_to_dock()
+
+    def return_to_dock(self, attempts: int = 10) -> Iterator[str]:
+        """
+        Drive the robot to the dock, planning again whenever an unknown obstacle blocks the way
+        """
+        robot = self.robot
+        for _ in range(attempts):
+            if (robot.pos_x, robot.pos_y) == self.dock:
+                return
+            path = self.path_to_dock()
+            if path is None:
+                raise CleaningRobotError("dock unreachable")
+            for status in robot.execute_commands(path):
+                yield status
+                if status[0] == "!":
+                    return
+        if (robot.pos_x, robot.pos_y) != self.dock:
+            raise CleaningRobotError("dock unreachable")
+
+    def _update_paths(self) -> tuple[float, float, float]:
+        """
+        Bring the paths to the dock up to date with the known obstacles and the calibrated costs
+        :return: the current costs of a move, a left and a right rotation
+        """
+        costs = (self.model.cost(CleaningRobot.FORWARD), self.model.cost(CleaningRobot.LEFT),
+                 self.model.cost(CleaningRobot.RIGHT))
+        room_map = self.robot.room_map
+        if self._field is not None and room_map.blocked_count != self._field_obstacles:
+            obstacles = {cell for cell in room_map.blocked_cells() if self._inside(cell[0], cell[1])}
+            if obstacles >= self._field_cells:
+                # Obstacles only lengthen the paths through them: repair the states using them
+                self._repair(obstacles - self._field_cells)
+                self._field_cells = obstacles
+                self._field_obstacles = room_map.blocked_count
+            else:
+                self._field = None
+        if self._field is None or (self.model.observations >= 2 * self._field_observations and any(
+                abs(new - old) > self.FIELD_DRIFT * max(self._field_costs) for new, old in zip(costs, self._field_costs))):
+            self._search(costs)
+        return costs
+
+    def _path_cost(self, index: int, costs: tuple[float, float, float]) -> float:
+        """
+        :return: the cost of the path from a state to the dock with the given costs, infinite if there is none
+        """
+        if self._field[index] == float("inf"):
+            return float("inf")
+        return self._moves[index] * costs[0] + self._lefts[index] * costs[1] + self._rights[index] * costs[2]
+
+    def _search(self, costs: tuple[float, float, float]) -> None:
+        """
+        Reverse Dijkstra search from the dock over the (x, y, heading) states
+        """
+        room_map = self.robot.room_map
+        self._field_costs = costs
+        self._field_observations = max(1, self.model.observations)
+        self._field_obstacles = room_map.blocked_count
+        self._field_cells = {cell for cell in room_map.blocked_cells() if self._inside(cell[0], cell[1])}
+        self._blocked = bytearray(self.width * self.height)
+        for x, y in self._field_cells:
+            self._blocked[y * self.width + x] = 1
+        size = self.width * self.height * 4
+        self._field = [float("inf")] * size
+        # Next state on the path to the dock (-1 if there is none) and number of each command along the path
+        self._next = [-1] * size
+        self._moves, self._lefts, self._rights = [0] * size, [0] * size, [0] * size
+        frontier = []
+        for heading in range(4):
+            index = self._index(self.dock[0], self.dock[1], heading)
+            self._field[index] = 0.0
+            frontier.append((0.0, index))
+        self._propagate(frontier)
+
+    def _repair(self, cells: Iterable[tuple[int, int]]) -> None:
+        """
+        Update the paths after the given cells have been blocked: only the states whose path crosses them
+        are searched again, starting from the states around them
+        """
+        field, next_states = self._field, self._next
+        affected = []
+        for x, y in cells:
+            self._blocked[y * self.width + x] = 1
+            affected.extend(range(self._index(x, y, 0), self._index(x, y, 0) + 4))
+        marked = set(affected)
+        position = 0
+        while position < len(affected):
+            index = affected[position]
+            position += 1
+            for previous, _ in self._predecessors(index):
+                if next_states[previous] == index and previous not in marked:
+                    marked.add(previous)
+                    affected.append(previous)
+        for index in affected:
+            field[index] = float("inf")
+            next_states[index] = -1
+        frontier = []
+        for index in affected:
+            if self._blocked[index >> 2]:
+                continue
+            for following, command in self._successors(index):
+                if field[following] + self._field_costs[command] < field[index]:
+                    self._link(index, following, command)
+            if field[index] < float("inf"):
+                frontier.append((field[index], index))
+        heapq.heapify(frontier)
+        self._propagate(frontier)
+
+    def _propagate(self, frontier: list[tuple[float, int]]) -> None:
+        # This loop is the whole search: _predecessors and _link are inlined
+        field, next_states, moves, lefts, rights = self._field, self._next, self._moves, self._lefts, self._rights
+        blocked, width, height = self._blocked, self.width, self.height
+        forward, left, right = self._field_costs
+        steps = [4 * (_DY[heading] * width + _DX[heading]) for heading in range(4)]
+        heappop, heappush = heapq.heappop, heapq.heappush
+        while frontier:
+            distance, index = heappop(frontier)
+            if distance > field[index]:
+                continue
+            cell, heading = index >> 2, index & 3
+            # Turning right from the heading on the left of this one, and turning left from the one on its right
+            previous = index - heading + _LEFT[heading]
+            if distance + right < field[previous]:
+                field[previous] = distance + right
+                next_states[previous] = index
+                moves[previous], lefts[previous], rights[previous] = moves[index], lefts[index], rights[index] + 1
+                heappush(frontier, (distance + right, previous))
+            previous = index - heading + _RIGHT[heading]
+            if distance + left < field[previous]:
+                field[previous] = distance + left
+                next_states[previous] = index
+                moves[previous], lefts[previous], rights[previous] = moves[index], lefts[index] + 1, rights[index]
+                heappush(frontier, (distance + left, previous))
+            x, y = cell % width - _DX[heading], cell // width - _DY[heading]
+            if 0 <= x < width and 0 <= y < height and not blocked[y * width + x]:
+                previous = index - steps[heading]
+                if distance + forward < field[previous]:
+                    field[previous] = distance + forward
+                    next_states[previous] = index
+                    moves[previous], lefts[previous], rights[previous] = moves[index] + 1, lefts[index], rights[index]
+                    heappush(frontier, (distance + forward, previous))
+
+    def _link(self, index: int, following: int, command: int) -> None:
+        """
+        Make the path from a state go through the state the command leads to
+        """
+        self._field[index] = self._field[following] + self._field_costs[command]
+        self._next[index] = following
+        self._moves[index] = self._moves[following] + (command == _MOVE)
+        self._lefts[index] = self._lefts[following] + (command == _TURN_LEFT)
+        self._rights[index] = self._rights[following] + (command == _TURN_RIGHT)
+
+    def _predecessors(self, index: int) -> list[tuple[int, int]]:
+        """
+        :return: the states from which one command leads to the given one, with the command
+        """
+        cell, heading = index >> 2, index & 3
+        previous = [(cell * 4 + _LEFT[heading], _TURN_RIGHT), (cell * 4 + _RIGHT[heading], _TURN_LEFT)]
+        x, y = cell % self.width - _DX[heading], cell // self.width - _DY[heading]
+        if 0 <= x < self.width and 0 <= y < self.height and not self._blocked[y * self.width + x]:
+            previous.append((index - 4 * (_DY[heading] * self.width + _DX[heading]), _MOVE))
+        return previous
+
+    def _successors(self, index: int) -> list[tuple[int, int]]:
+        """
+        :return: the states one command leads to from the given one, with the command
+        """
+        cell, heading = index >> 2, index & 3
+        following = [(cell * 4 + _LEFT[heading], _TURN_LEFT), (cell * 4 + _RIGHT[heading], _TURN_RIGHT)]
+        x, y = cell % self.width + _DX[heading], cell // self.width + _DY[heading]
+        if 0 <= x < self.width and 0 <= y < self.height and not self._blocked[y * self.width + x]:
+            following.append((index + 4 * (_DY[heading] * self.width + _DX[heading]), _MOVE))
+        return following
+
+    def _inside(self, x: int, y: int) -> bool:
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def _index(self, x: int, y: int, heading: int) -> int:
+        return ((y * self.width) + x) * 4 + heading
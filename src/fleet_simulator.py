@@ -0,0 +1,300 @@
+import threading
+import time
+from functools import partial
+from typing import Callable, Iterable
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+
+class VirtualClock:
+    """
+    Clock advanced by the simulated sleeps instead of waiting for real time to pass.
+    Background jobs (e.g., the UV exposures) wait on their own timeline, which runs alongside the robot's one:
+    now is the time of the robot, and time() the later of the two timelines.
+    """
+
+    def __init__(self, start: float = 0.0):
+        self.now = start
+        self.background_now = start
+        # The background jobs wait from their own threads
+        self._lock = threading.Lock()
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.now += seconds
+
+    def sleep_from(self, start: float, seconds: float) -> None:
+        """
+        Wait on the background timeline, from the given time or from the end of the previous background wait
+        """
+        with self._lock:
+            self.background_now = max(self.background_now, start) + seconds
+
+    def time(self) -> float:
+        with self._lock:
+            return max(self.now, self.background_now)
+
+
+class SimulatedGPIO:
+    """
+    Per-robot stand-in for the GPIO module: it keeps the pin levels of a single robot,
+    so that many robots can live in the same process without sharing global state.
+    """
+
+    BOARD = 10
+    BCM = 11
+    IN = 1
+    OUT = 0
+    HIGH = 1
+    LOW = 0
+    BOTH = 33
+    RISING = 31
+    FALLING = 32
+
+    def __init__(self):
+        self.mode = None
+        self.directions = {}
+        self.levels = {}
+        self.input_sources = {}
+        # Edge detection of each channel: the detected edge, its callbacks, and the last level seen
+        self.event_edges = {}
+        self.event_callbacks = {}
+        self._edge_levels = {}
+
+    def setmode(self, mode) -> None:
+        self.mode = mode
+
+    def getmode(self):
+        return self.mode
+
+    def setwarnings(self, flag) -> None:
+        pass
+
+    def setup(self, channel, direction, initial=0, pull_up_down=None) -> None:
+        self.directions[channel] = direction
+        self.levels[channel] = initial
+
+    def output(self, channel, value) -> None:
+        if isinstance(channel, (list, tuple)):
+            values = value if isinstance(value, (list, tuple)) else [value] * len(channel)
+            self.levels.update(zip(channel, values))
+        else:
+            self.levels[channel] = value
+
+    def input(self, channel):
+        """
+        :return: the value of the source attached to the channel (if any), otherwise its last level
+        """
+        source = self.input_sources.get(channel)
+        if source is not None:
+            return source()
+        return self.levels.get(channel, self.LOW)
+
+    def add_event_detect(self, channel, edge, callback=None, bouncetime=None) -> None:
+        self.event_edges[channel] = edge
+        self.event_callbacks[channel] = [callback] if callback is not None else []
+        self._edge_levels[channel] = bool(self.input(channel))
+
+    def add_event_callback(self, channel, callback) -> None:
+        self.event_callbacks.setdefault(channel, []).append(callback)
+
+    def remove_event_detect(self, channel) -> None:
+        self.event_edges.pop(channel, None)
+        self.event_callbacks.pop(channel, None)
+        self._edge_levels.pop(channel, None)
+
+    def refresh_inputs(self) -> None:
+        """
+        Fire the edge callbacks of the channels whose input changed since the last refresh: the simulated inputs
+        are computed on demand, so their edges are delivered when the simulator calls this
+        """
+        for channel, edge in list(self.event_edges.items()):
+            level = bool(self.input(channel))
+            if level != self._edge_levels.get(channel):
+                self._edge_levels[channel] = level
+                if edge == self.BOTH or (edge == self.RISING) == level:
+                    for callback in list(self.event_callbacks.get(channel, ())):
+                        callback(channel)
+
+    def cleanup(self, channel=None) -> None:
+        self.levels.clear()
+
+    def PWM(self, channel, frequency) -> "SimulatedPWM":
+        return SimulatedPWM(channel, frequency)
+
+
+class SimulatedPWM:
+
+    def __init__(self, channel, frequency):
+        self.channel = channel
+        self.frequency = frequency
+        self.dutycycle = 0
+        self.running = False
+
+    def start(self, dutycycle) -> None:
+        self.dutycycle = dutycycle
+        self.running = True
+
+    def ChangeDutyCycle(self, dutycycle) -> None:
+        self.dutycycle = dutycycle
+
+    def ChangeFrequency(self, frequency) -> None:
+        self.frequency = frequency
+
+    def stop(self) -> None:
+        self.running = False
+
+
+class SimulatedIBS:
+    """
+    Per-robot stand-in for the IBS, whose charge is drained by the simulator
+    """
+
+    def __init__(self, charge: float = 100.0):
+        self.charge = charge
+        self.readings = 0
+
+    def get_charge_left(self) -> int:
+        self.readings += 1
+        return int(self.charge)
+
+    def drain(self, amount: float) -> None:
+        self.charge = max(0.0, self.charge - amount)
+
+
+class BatteryDrainModel:
+    """
+    Percentage of charge consumed by each robot activity
+    """
+
+    def __init__(self, per_move: float = 0.05, per_rotation: float = 0.02, per_uv_second: float = 0.001):
+        self.per_move = per_move
+        self.per_rotation = per_rotation
+        self.per_uv_second = per_uv_second
+
+
+class ObstacleMap:
+    """
+    Obstacles of the room; when the room size is given, the cells outside the room are blocked too
+    """
+
+    def __init__(self, obstacles: Iterable[tuple[int, int]] = (), width: int | None = None, height: int | None = None):
+        self.obstacles = frozenset(obstacles)
+        self.width = width
+        self.height = height
+
+    def is_blocked(self, cell: tuple[int, int]) -> bool:
+        x, y = cell
+        if self.width is not None and not 0 <= x < self.width:
+            return True
+        if self.height is not None and not 0 <= y < self.height:
+            return True
+        return cell in self.obstacles
+
+
+class SimulatedRobot(CleaningRobot):
+    """
+    CleaningRobot wired to its own GPIO/IBS stand-ins and to a virtual clock
+    """
+
+    def __init__(self, obstacle_map: ObstacleMap, drain_model: BatteryDrainModel,
+                 initial_charge: float = 100.0, motor_run_time: float = 1.0):
+        self.gpio = SimulatedGPIO()
+        super().__init__()
+        self.ibs = SimulatedIBS(initial_charge)
+        self.clock = VirtualClock()
+        self.drain_model = drain_model
+        self.motor_run_time = motor_run_time
+        self.gpio.input_sources[self.INFRARED_PIN] = lambda: obstacle_map.is_blocked(self._cell_ahead())
+
+    def obstacle_found(self) -> bool:
+        if self.obstacle_interrupts:
+            # The cell ahead may have changed since the last command: deliver the edge before the latch is read
+            self.gpio.refresh_inputs()
+        return super().obstacle_found()
+
+    def activate_wheel_motor(self) -> None:
+        super().activate_wheel_motor()
+        self.ibs.drain(self.drain_model.per_move)
+
+    def activate_rotation_motor(self, direction) -> None:
+        super().activate_rotation_motor(direction)
+        self.ibs.drain(self.drain_model.per_rotation)
+
+    def activate_uv_light(self) -> None:
+        start = self.clock.now
+        super().activate_uv_light()
+        self.ibs.drain(self.drain_model.per_uv_second * (self.clock.now - start))
+
+    def _wait_for_motor(self, seconds: float = 1) -> None:
+        self.clock.sleep(seconds * self.motor_run_time)
+
+    def _sleep(self, seconds: float) -> None:
+        self.clock.sleep(seconds)
+
+    def _background_sleep(self) -> Callable[[float], None]:
+        return partial(self.clock.sleep_from, self.clock.now)
+
+
+class FleetSimulator:
+    """
+    Runs many simulated robots in a single process and aggregates their statistics
+    """
+
+    def __init__(self, robot_count: int, obstacle_map: ObstacleMap | None = None,
+                 drain_model: BatteryDrainModel | None = None, initial_charge: float = 100.0,
+                 start: tuple[int, int, str] = (0, 0, CleaningRobot.N)):
+        if robot_count < 1:
+            raise CleaningRobotError
+        self.obstacle_map = obstacle_map if obstacle_map is not None else ObstacleMap()
+        self.drain_model = drain_model if drain_model is not None else BatteryDrainModel()
+        self.robots = []
+        for _ in range(robot_count):
+            robot = SimulatedRobot(self.obstacle_map, self.drain_model, initial_charge)
+            robot.pos_x, robot.pos_y, robot.heading = start
+            self.robots.append(robot)
+
+    def run(self, routes: str | list[str], timer: Callable[[], float] = time.perf_counter) -> dict:
+        """
+        Execute a route on every robot. A robot keeps going after an obstacle (the command is wasted)
+        and stops at its first low-charge status.
+        :param routes: the same route for all the robots, or one route per robot
+        :return: aggregate throughput and battery statistics of the fleet
+        """
+        if isinstance(routes, str):
+            routes = [routes] * len(self.robots)
+        if len(routes) != len(self.robots):
+            raise CleaningRobotError
+
+        commands = moves = rotations = obstacles = stranded = 0
+        start = timer()
+        for robot, route in zip(self.robots, routes):
+            for command in route:
+                status = robot.execute_command(command)
+                if status[0] == "!":
+                    stranded += 1
+                    break
+                commands += 1
+                if command != CleaningRobot.FORWARD:
+                    rotations += 1
+                elif status == robot.robot_status():
+                    moves += 1
+                else:
+                    obstacles += 1
+        wall_time = timer() - start
+
+        charges = [robot.ibs.charge for robot in self.robots]
+        return {
+            "robots": len(self.robots),
+            "commands": commands,
+            "moves": moves,
+            "rotations": rotations,
+            "obstacles": obstacles,
+            "stranded": stranded,
+            "wall_time": wall_time,
+            "commands_per_second": commands / wall_time if wall_time > 0 else float("inf"),
+            "virtual_time": max(robot.clock.time() for robot in self.robots),
+            "min_charge": min(charges),
+            "mean_charge": sum(charges) / len(charges),
+            "max_charge": max(charges),
+        }
@@ -0,0 +1,246 @@
+import inspect
+from time import perf_counter_ns
+
+
+class LatencyHistogram:
+    """
+    HDR-style histogram of durations in nanoseconds: values below 2**precision_bits are counted exactly,
+    larger ones in log-linear buckets (2**(precision_bits - 1) buckets per power of two), so that
+    the relative error stays below 2**(1 - precision_bits) over the whole range with a bounded number of buckets.
+    """
+
+    __slots__ = ("precision_bits", "counts", "count", "total", "min", "max")
+
+    def __init__(self, precision_bits: int = 5):
+        self.precision_bits = precision_bits
+        self.counts = {}
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = None
+
+    def record(self, value: int) -> None:
+        value = max(0, int(value))
+        index = self._bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def merge(self, other: "LatencyHistogram") -> None:
+        if other.precision_bits != self.precision_bits:
+            raise ValueError("histograms with different precision cannot be merged")
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        for value in (other.min, other.max):
+            if value is not None:
+                self.min = value if self.min is None else min(self.min, value)
+                self.max = value if self.max is None else max(self.max, value)
+
+    def percentile(self, fraction: float) -> int | None:
+        """
+        :return: the highest value equivalent to the one at the given fraction (0 to 1) of the recorded values
+        """
+        if not self.count:
+            return None
+        rank = max(1, round(fraction * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return min(self._bucket_upper_bound(index), self.max)
+        return self.max
+
+    def buckets(self) -> list[tuple[int, int]]:
+        """
+        :return: the (upper bound, count) pairs of the non-empty buckets, in increasing order
+        """
+        return [(self._bucket_upper_bound(index), self.counts[index]) for index in sorted(self.counts)]
+
+    def _bucket_index(self, value: int) -> int:
+        exponent = value.bit_length() - self.precision_bits
+        if exponent <= 0:
+            return value
+        return (exponent << (self.precision_bits - 1)) + (value >> exponent)
+
+    def _bucket_upper_bound(self, index: int) -> int:
+        if index < 1 << self.precision_bits:
+            return index
+        half = 1 << (self.precision_bits - 1)
+        exponent, mantissa = divmod(index, half)
+        exponent -= 1
+        return ((half + mantissa + 1) << exponent) - 1
+
+
+class Instrumentation:
+    """
+    Per-stage latency histograms and hardware call counters of a robot, see CleaningRobot.enable_instrumentation
+    """
+
+    def __init__(self, precision_bits: int = 5):
+        self.precision_bits = precision_bits
+        self.stages = {}
+        self.gpio_calls = {}
+        self.i2c_transactions = 0
+
+    def record(self, stage: str, nanoseconds: int) -> None:
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram(self.precision_bits)
+        histogram.record(nanoseconds)
+
+    def count_gpio_call(self, call: str) -> None:
+        self.gpio_calls[call] = self.gpio_calls.get(call, 0) + 1
+
+    def reset(self) -> None:
+        self.stages.clear()
+        self.gpio_calls.clear()
+        self.i2c_transactions = 0
+
+    def snapshot(self) -> dict:
+        """
+        :return: count, sum, min, max, mean and percentiles (in seconds) of every stage, and the call counters
+        """
+        stages = {}
+        for stage, histogram in self.stages.items():
+            stages[stage] = {
+                "count": histogram.count,
+                "sum": histogram.total / 1e9,
+                "min": histogram.min / 1e9,
+                "max": histogram.max / 1e9,
+                "mean": histogram.total / histogram.count / 1e9,
+                "p50": histogram.percentile(0.50) / 1e9,
+                "p90": histogram.percentile(0.90) / 1e9,
+                "p99": histogram.percentile(0.99) / 1e9,
+            }
+        return {"stages": stages, "gpio_calls": dict(self.gpio_calls), "i2c_transactions": self.i2c_transactions}
+
+    def prometheus(self, prefix: str = "cleaning_robot") -> str:
+        """
+        :return: the metrics in the Prometheus text exposition format
+        """
+        lines = [f"# HELP {prefix}_stage_seconds Time spent in each stage of the command execution",
+                 f"# TYPE {prefix}_stage_seconds histogram"]
+        for stage in sorted(self.stages):
+            histogram = self.stages[stage]
+            cumulative = 0
+            for upper_bound, count in histogram.buckets():
+                cumulative += count
+                lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="{upper_bound / 1e9:.9g}"}} {cumulative}')
+            lines.append(f'{prefix}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {histogram.count}')
+            lines.append(f'{prefix}_stage_seconds_sum{{stage="{stage}"}} {histogram.total / 1e9:.9g}')
+            lines.append(f'{prefix}_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        lines.append(f"# HELP {prefix}_gpio_calls_total GPIO calls by function")
+        lines.append(f"# TYPE {prefix}_gpio_calls_total counter")
+        for call in sorted(self.gpio_calls):
+            lines.append(f'{prefix}_gpio_calls_total{{call="{call}"}} {self.gpio_calls[call]}')
+        lines.append(f"# HELP {prefix}_i2c_transactions_total IBS readings over I2C")
+        lines.append(f"# TYPE {prefix}_i2c_transactions_total counter")
+        lines.append(f"{prefix}_i2c_transactions_total {self.i2c_transactions}")
+        return "\n".join(lines) + "\n"
+
+
+class InstrumentedGPIO:
+    """
+    Proxy of a GPIO backend counting the calls which reach the pins
+    """
+
+    def __init__(self, gpio, instrumentation: Instrumentation):
+        self.wrapped = gpio
+        self.instrumentation = instrumentation
+
+    def setup(self, *args, **kwargs):
+        self.instrumentation.count_gpio_call("setup")
+        return self.wrapped.setup(*args, **kwargs)
+
+    def output(self, channel, value):
+        self.instrumentation.count_gpio_call("output")
+        return self.wrapped.output(channel, value)
+
+    def input(self, channel):
+        self.instrumentation.count_gpio_call("input")
+        return self.wrapped.input(channel)
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+class InstrumentedIBS:
+    """
+    Proxy of an IBS timing and counting its I2C transactions (the ibs.get_charge_left stage)
+    """
+
+    def __init__(self, ibs, instrumentation: Instrumentation):
+        self.wrapped = ibs
+        self.instrumentation = instrumentation
+
+    def get_charge_left(self) -> int:
+        start = perf_counter_ns()
+        try:
+            return self.wrapped.get_charge_left()
+        finally:
+            self.instrumentation.i2c_transactions += 1
+            self.instrumentation.record("ibs.get_charge_left", perf_counter_ns() - start)
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+# Robot methods timed as stages, and the stage names they are recorded under
+STAGE_METHODS = {
+    "execute_command": "execute_command",
+    "_manage_charge": "manage_cleaning_system",
+    "obstacle_found": "obstacle_found",
+    "activate_wheel_motor": "activate_wheel_motor",
+    "activate_rotation_motor": "activate_rotation_motor",
+    "activate_uv_light": "activate_uv_light",
+    # AsyncCleaningRobot counterparts, recorded under the same stages
+    "execute_command_async": "execute_command",
+    "_manage_charge_async": "manage_cleaning_system",
+    "activate_wheel_motor_async": "activate_wheel_motor",
+    "activate_rotation_motor_async": "activate_rotation_motor",
+    "activate_uv_light_async": "activate_uv_light",
+}
+
+_instrumented_classes = {}
+
+
+def instrumented_class(cls: type) -> type:
+    """
+    :return: the subclass of a robot class whose stage methods are timed. A robot is instrumented by switching
+    its class to this one, so that robots without instrumentation do not pay anything for it.
+    """
+    subclass = _instrumented_classes.get(cls)
+    if subclass is None:
+        namespace = {"__module__": cls.__module__}
+        for name, stage in STAGE_METHODS.items():
+            method = getattr(cls, name, None)
+            if method is not None:
+                namespace[name] = _timed(cls, name, stage, inspect.iscoroutinefunction(method))
+        subclass = _instrumented_classes[cls] = type(f"Instrumented{cls.__name__}", (cls,), namespace)
+    return subclass
+
+
+def _timed(cls: type, name: str, stage: str, asynchronous: bool):
+    # The method is looked up at call time, so that patching the original class is still effective
+    if asynchronous:
+        async def wrapper(self, *args):
+            start = perf_counter_ns()
+            try:
+                return await getattr(cls, name)(self, *args)
+            finally:
+                self.instrumentation.record(stage, perf_counter_ns() - start)
+    else:
+        def wrapper(self, *args):
+            start = perf_counter_ns()
+            try:
+                return getattr(cls, name)(self, *args)
+            finally:
+                self.instrumentation.record(stage, perf_counter_ns() - start)
+    wrapper.__name__ = wrapper.__qualname__ = name
+    return wrapper
@@ -0,0 +1,293 @@
+import struct
+import threading
+import time
+from types import SimpleNamespace
+from typing import Callable
+
+from src import backends, uv_scheduler
+from src.backends import Backend
+from src.cleaning_robot import CleaningRobotError
+
+# A trace is a header (magic, deployment flag of the recorded backend) followed by fixed-size events:
+# stream, kind, channel and value (the pin level, the charge read or the seconds slept)
+MAGIC = b"CRT2"
+HEADER = struct.Struct("<4sB")
+EVENT = struct.Struct("<BBBf")
+
+# The events of the UV scheduler workers are interleaved with the robot's ones depending on the thread
+# scheduling, so they are kept in their own stream, replayed independently of the robot's one
+ROBOT_STREAM = 0
+UV_STREAM = 1
+
+INPUT = 1
+OUTPUT = 2
+CHARGE = 3
+SLEEP = 4
+
+KIND_NAMES = {INPUT: "input", OUTPUT: "output", CHARGE: "charge", SLEEP: "sleep"}
+
+
+class TraceDivergence(CleaningRobotError):
+    """
+    The replayed code did not perform the I/O of the recorded run
+    """
+
+
+def current_stream() -> int:
+    """
+    :return: the stream of the events generated by the calling thread
+    """
+    return UV_STREAM if threading.current_thread().name == uv_scheduler.WORKER_NAME else ROBOT_STREAM
+
+
+class TraceRecorder:
+    """
+    Writes the I/O events of a backend to a trace file; events may be recorded from several threads
+    """
+
+    def __init__(self, path: str, deployment: bool):
+        self.path = path
+        self.events = 0
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        self._file.write(HEADER.pack(MAGIC, deployment))
+
+    def record(self, kind: int, channel: int, value: float) -> None:
+        event = EVENT.pack(current_stream(), kind, channel, value)
+        with self._lock:
+            self._file.write(event)
+            self.events += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self) -> "TraceRecorder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class RecordingGPIO:
+    """
+    Proxy of a GPIO module recording the levels read from and written to the pins
+    """
+
+    def __init__(self, gpio, recorder: TraceRecorder):
+        self.wrapped = gpio
+        self.recorder = recorder
+
+    def input(self, channel):
+        value = self.wrapped.input(channel)
+        self.recorder.record(INPUT, channel, int(value))
+        return value
+
+    def output(self, channel, value):
+        self.wrapped.output(channel, value)
+        if isinstance(channel, (list, tuple)):
+            values = value if isinstance(value, (list, tuple)) else [value] * len(channel)
+            for pin, level in zip(channel, values):
+                self.recorder.record(OUTPUT, pin, int(level))
+        else:
+            self.recorder.record(OUTPUT, channel, int(value))
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+class _RecordingIBS:
+
+    def __init__(self, ibs, recorder: TraceRecorder):
+        self.wrapped = ibs
+        self.recorder = recorder
+
+    def get_charge_left(self) -> int:
+        charge = self.wrapped.get_charge_left()
+        self.recorder.record(CHARGE, 0, charge)
+        return charge
+
+    def __getattr__(self, name: str):
+        return getattr(self.wrapped, name)
+
+
+def recording_backend(path: str, backend: Backend | None = None) -> tuple[Backend, TraceRecorder]:
+    """
+    :param backend: the backend to record (the current one by default)
+    :return: a backend recording every input read, output write, IBS reading and sleep of the robots using it,
+    and the recorder to close at the end of the run
+    """
+    backend = backend if backend is not None else backends.get_backend()
+    recorder = TraceRecorder(path, backend.deployment)
+    real_sleep = backend.sleep
+
+    def sleep(seconds: float) -> None:
+        recorder.record(SLEEP, 0, seconds)
+        if real_sleep is not None:
+            real_sleep(seconds)
+        else:
+            time.sleep(seconds)
+
+    ibs = SimpleNamespace(IBS=lambda *args, **kwargs: _RecordingIBS(backend.ibs.IBS(*args, **kwargs), recorder))
+    return Backend(f"record:{backend.name}", RecordingGPIO(backend.gpio, recorder), backend.board, ibs,
+                   backend.deployment, sleep), recorder
+
+
+def load_trace(path: str) -> tuple[bool, list[tuple[int, int, int, float]]]:
+    """
+    :return: the deployment flag of the recorded backend and the (stream, kind, channel, value) events of a trace
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    magic, deployment = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise CleaningRobotError(f"not a trace: {path}")
+    body = data[HEADER.size:]
+    return bool(deployment), list(EVENT.iter_unpack(body[:len(body) - len(body) % EVENT.size]))
+
+
+class TracePlayer:
+    """
+    Feeds the events of a trace back to the code under replay: inputs and charges return the recorded values,
+    sleeps return immediately, and outputs are checked against the recorded ones. Any difference between
+    the I/O performed and the recorded one is a divergence: it raises TraceDivergence in strict mode,
+    otherwise it is collected in divergences and the replay goes on.
+    Each stream is replayed in its own order. The UV stream is checked on its exposures (sleeps) only: whether the
+    light is switched off between two exposures depends on how fast the next cell is queued, which a replay at
+    full speed does not reproduce.
+    """
+
+    def __init__(self, path: str, strict: bool = True):
+        self.deployment, self.events = load_trace(path)
+        self.strict = strict
+        self.divergences = []
+        self.slept = 0.0
+        self._streams = {ROBOT_STREAM: [], UV_STREAM: []}
+        for stream, kind, channel, value in self.events:
+            self._streams.setdefault(stream, []).append((kind, channel, value))
+        self._cursors = dict.fromkeys(self._streams, 0)
+        self._lock = threading.Lock()
+
+    @property
+    def cursor(self) -> int:
+        """
+        :return: the number of events consumed, in all the streams
+        """
+        return sum(self._cursors.values())
+
+    @property
+    def finished(self) -> bool:
+        with self._lock:
+            self._skip_uv_outputs()
+            return all(self._cursors[stream] >= len(events) for stream, events in self._streams.items())
+
+    def next_value(self, kind: int, channel: int, value: float | None = None) -> float | None:
+        """
+        Consume the next event of the calling thread's stream, which is expected to be of the given kind
+        on the given channel (and with the given value, for outputs)
+        :return: the recorded value
+        """
+        stream = current_stream()
+        with self._lock:
+            if stream == UV_STREAM:
+                if kind == OUTPUT:
+                    return value
+                self._skip_uv_outputs()
+            events, cursor = self._streams.get(stream, ()), self._cursors.get(stream, 0)
+            if cursor >= len(events):
+                message = f"unexpected {KIND_NAMES[kind]} on channel {channel} after the end of the trace"
+                recorded_value = value
+            else:
+                recorded_kind, recorded_channel, recorded_value = events[cursor]
+                self._cursors[stream] = cursor + 1
+                if recorded_kind == kind and recorded_channel == channel and (value is None or value == recorded_value):
+                    return recorded_value
+                message = (f"stream {stream} event {cursor}: expected {KIND_NAMES[recorded_kind]} "
+                           f"{recorded_channel}={recorded_value:g}, got {KIND_NAMES[kind]} {channel}"
+                           + (f"={value:g}" if value is not None else ""))
+            self.divergences.append(message)
+        if self.strict:
+            raise TraceDivergence(message)
+        return recorded_value
+
+    def _skip_uv_outputs(self) -> None:
+        events = self._streams[UV_STREAM]
+        cursor = self._cursors[UV_STREAM]
+        while cursor < len(events) and events[cursor][0] == OUTPUT:
+            cursor += 1
+        self._cursors[UV_STREAM] = cursor
+
+    def sleep(self, seconds: float) -> None:
+        slept = self.next_value(SLEEP, 0, None) or 0.0
+        with self._lock:
+            self.slept += slept
+
+
+class ReplayGPIO:
+    """
+    GPIO module replaying a trace; the configuration calls (setmode, setup, ...) are accepted and ignored
+    """
+
+    BOARD = 10
+    BCM = 11
+    IN = 1
+    OUT = 0
+    HIGH = 1
+    LOW = 0
+    BOTH = 33
+    RISING = 31
+    FALLING = 32
+
+    def __init__(self, player: TracePlayer):
+        self.player = player
+
+    def input(self, channel):
+        return int(self.player.next_value(INPUT, channel) or 0)
+
+    def output(self, channel, value) -> None:
+        if isinstance(channel, (list, tuple)):
+            values = value if isinstance(value, (list, tuple)) else [value] * len(channel)
+            for pin, level in zip(channel, values):
+                self.player.next_value(OUTPUT, pin, int(level))
+        else:
+            self.player.next_value(OUTPUT, channel, int(value))
+
+    def PWM(self, channel, frequency) -> SimpleNamespace:
+        """
+        The duty cycle changes are not traced, so the PWM objects do nothing
+        """
+        return SimpleNamespace(start=_ignore, ChangeDutyCycle=_ignore, ChangeFrequency=_ignore, stop=_ignore)
+
+    def __getattr__(self, name: str) -> Callable:
+        return _ignore
+
+
+def _ignore(*args, **kwargs) -> None:
+    pass
+
+
+class _ReplayIBS:
+
+    def __init__(self, player: TracePlayer):
+        self.player = player
+
+    def get_charge_left(self) -> int:
+        return int(self.player.next_value(CHARGE, 0) or 0)
+
+
+def replay_backend(path: str, strict: bool = True) -> tuple[Backend, TracePlayer]:
+    """
+    :return: a backend replaying a trace at full speed, and the player to check for divergences
+    """
+    player = TracePlayer(path, strict)
+    board = SimpleNamespace(I2C=lambda: None)
+    ibs = SimpleNamespace(IBS=lambda *args, **kwargs: _ReplayIBS(player))
+    return Backend("replay", ReplayGPIO(player), board, ibs, player.deployment, player.sleep), player
+
+
+def use_backend(backend: Backend) -> None:
+    """
+    Make a backend built at run time (e.g., recording or replaying a trace) the current one
+    """
+    backends.register_backend(backend.name, lambda: backend)
+    backends.select_backend(backend.name)
@@ -0,0 +1,91 @@
+from typing import Iterator
+
+
+class RoomMap:
+    """
+    Map of the room learnt by the robot: one byte of flags per cell, stored in square tiles which are
+    allocated only where the robot has been. The tiles are indexed by their coordinates, so that checking
+    a cell is O(1) and area queries only look at the tiles overlapping the area.
+    """
+
+    TILE_SIZE = 64
+
+    BLOCKED = 1
+    VISITED = 2
+
+    __slots__ = ("_tiles", "blocked_count", "visited_count")
+
+    def __init__(self):
+        self._tiles = {}
+        self.blocked_count = 0
+        self.visited_count = 0
+
+    def is_blocked(self, cell: tuple[int, int]) -> bool:
+        return bool(self._flags(cell) & self.BLOCKED)
+
+    def is_visited(self, cell: tuple[int, int]) -> bool:
+        return bool(self._flags(cell) & self.VISITED)
+
+    def mark_blocked(self, cell: tuple[int, int]) -> None:
+        if self._set_flag(cell, self.BLOCKED):
+            self.blocked_count += 1
+
+    def mark_visited(self, cell: tuple[int, int]) -> None:
+        if self._set_flag(cell, self.VISITED):
+            self.visited_count += 1
+
+    def forget_obstacle(self, cell: tuple[int, int]) -> None:
+        """
+        Remove an obstacle which is known to have been moved away
+        """
+        tile, offset = self._locate(cell, create=False)
+        if tile is not None and tile[offset] & self.BLOCKED:
+            tile[offset] &= ~self.BLOCKED
+            self.blocked_count -= 1
+
+    def blocked_cells(self, area: tuple[int, int, int, int] | None = None) -> Iterator[tuple[int, int]]:
+        """
+        :param area: optional (min_x, min_y, max_x, max_y) bounds, inclusive
+        :return: the known obstacles, restricted to the given area
+        """
+        return self._cells_with(self.BLOCKED, area)
+
+    def visited_cells(self, area: tuple[int, int, int, int] | None = None) -> Iterator[tuple[int, int]]:
+        return self._cells_with(self.VISITED, area)
+
+    def _cells_with(self, flag: int, area: tuple[int, int, int, int] | None) -> Iterator[tuple[int, int]]:
+        size = self.TILE_SIZE
+        for (tile_x, tile_y), tile in self._tiles.items():
+            base_x, base_y = tile_x * size, tile_y * size
+            if area is not None:
+                min_x, min_y, max_x, max_y = area
+                if base_x > max_x or base_y > max_y or base_x + size <= min_x or base_y + size <= min_y:
+                    continue
+            for offset, flags in enumerate(tile):
+                if flags & flag:
+                    cell = (base_x + offset % size, base_y + offset // size)
+                    if area is None or (min_x <= cell[0] <= max_x and min_y <= cell[1] <= max_y):
+                        yield cell
+
+    def _flags(self, cell: tuple[int, int]) -> int:
+        tile, offset = self._locate(cell, create=False)
+        return 0 if tile is None else tile[offset]
+
+    def _set_flag(self, cell: tuple[int, int], flag: int) -> bool:
+        """
+        :return: True if the flag was not set before
+        """
+        tile, offset = self._locate(cell, create=True)
+        if tile[offset] & flag:
+            return False
+        tile[offset] |= flag
+        return True
+
+    def _locate(self, cell: tuple[int, int], create: bool) -> tuple[bytearray | None, int]:
+        size = self.TILE_SIZE
+        tile_x, x = divmod(cell[0], size)
+        tile_y, y = divmod(cell[1], size)
+        tile = self._tiles.get((tile_x, tile_y))
+        if tile is None and create:
+            tile = self._tiles[(tile_x, tile_y)] = bytearray(size * size)
+        return tile, y * size + x
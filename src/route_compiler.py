@@ -0,0 +1,96 @@
+from typing import Iterable, Iterator
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+
+class RoutePlan:
+    """
+    Compiled route: a sequence of (command, count) steps where every forward step is a run of counted moves
+    and every rotation step is the net rotation of a sequence of rotations.
+    Iterating over a plan yields its single commands, so it can be passed to CleaningRobot.execute_commands,
+    which fuses each forward run in a single wheel motor activation when the robot uses PWM with background UV
+    (see CleaningRobot.fuses_forward_moves).
+    """
+
+    __slots__ = ("steps", "source_length")
+
+    def __init__(self, steps: list[tuple[str, int]], source_length: int):
+        self.steps = steps
+        self.source_length = source_length
+
+    def __iter__(self) -> Iterator[str]:
+        for command, count in self.steps:
+            for _ in range(count):
+                yield command
+
+    def __len__(self) -> int:
+        return sum(count for _, count in self.steps)
+
+    def __str__(self) -> str:
+        return "".join(command * count for command, count in self.steps)
+
+    def stats(self, robot: CleaningRobot | None = None) -> dict:
+        """
+        :param robot: the robot executing the plan; forward runs are fused only if it fuses forward moves
+        (see CleaningRobot.fuses_forward_moves), and never without a robot
+        :return: the size of the route before and after compilation, and the motor activations saved:
+        one per cancelled rotation, plus one per forward move merged into a longer run
+        """
+        moves = sum(count for command, count in self.steps if command == CleaningRobot.FORWARD)
+        runs = sum(1 for command, _ in self.steps if command == CleaningRobot.FORWARD)
+        rotations_saved = self.source_length - len(self)
+        moves_fused = moves - runs if robot is not None and robot.fuses_forward_moves else 0
+        return {
+            "commands": self.source_length,
+            "compiled_commands": len(self),
+            "rotations_saved": rotations_saved,
+            "forward_runs": runs,
+            "moves_fused": moves_fused,
+            "motor_activations_saved": rotations_saved + moves_fused,
+        }
+
+
+# Rotation commands for a net clockwise rotation of 0 to 3 quarter turns
+_NET_ROTATIONS = {
+    CleaningRobot.RIGHT: ("", CleaningRobot.RIGHT, CleaningRobot.RIGHT * 2, CleaningRobot.LEFT),
+    CleaningRobot.LEFT: ("", CleaningRobot.RIGHT, CleaningRobot.LEFT * 2, CleaningRobot.LEFT),
+}
+
+
+def compile_route(route: str | Iterable[str]) -> RoutePlan:
+    """
+    Validate a route and simplify it: a sequence of rotations is replaced by its net rotation (e.g., "lr" and
+    "llll" disappear, "rrr" becomes "l"), and consecutive forward moves are grouped in counted runs.
+    :raise CleaningRobotError: if the route contains an invalid command, before anything is executed
+    """
+    steps = []
+    source_length = 0
+    quarter_turns = 0
+    first_rotation = None
+
+    def flush_rotations():
+        if first_rotation is not None:
+            for command in _NET_ROTATIONS[first_rotation][quarter_turns % 4]:
+                _append(steps, command)
+
+    for command in route:
+        source_length += 1
+        if command == CleaningRobot.FORWARD:
+            flush_rotations()
+            quarter_turns, first_rotation = 0, None
+            _append(steps, command)
+        elif command == CleaningRobot.RIGHT or command == CleaningRobot.LEFT:
+            quarter_turns += 1 if command == CleaningRobot.RIGHT else -1
+            if first_rotation is None:
+                first_rotation = command
+        else:
+            raise CleaningRobotError
+    flush_rotations()
+    return RoutePlan(steps, source_length)
+
+
+def _append(steps: list[tuple[str, int]], command: str) -> None:
+    if steps and steps[-1][0] == command:
+        steps[-1] = (command, steps[-1][1] + 1)
+    else:
+        steps.append((command, 1))
@@ -0,0 +1,117 @@
+from typing import Sequence
+
+import numpy as np
+
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+# Command codes of an encoded route; PAD fills the routes shorter than the longest one
+PAD = 0
+FORWARD = 1
+LEFT = 2
+RIGHT = 3
+
+_CODES = {CleaningRobot.FORWARD: FORWARD, CleaningRobot.LEFT: LEFT, CleaningRobot.RIGHT: RIGHT}
+
+# Headings are encoded clockwise, so that turning right adds 1 and turning left subtracts 1
+HEADINGS = (CleaningRobot.N, CleaningRobot.E, CleaningRobot.S, CleaningRobot.W)
+_DX = np.array([0, 1, 0, -1], dtype=np.int64)
+_DY = np.array([1, 0, -1, 0], dtype=np.int64)
+
+
+def encode_routes(routes: Sequence[str]) -> np.ndarray:
+    """
+    Encode command strings into a (routes, steps) array of command codes, padded with PAD
+    """
+    steps = max((len(route) for route in routes), default=0)
+    commands = np.zeros((len(routes), steps), dtype=np.uint8)
+    for index, route in enumerate(routes):
+        try:
+            commands[index, :len(route)] = [_CODES[command] for command in route]
+        except KeyError:
+            raise CleaningRobotError
+    return commands
+
+
+class RouteReplay:
+    """
+    Trajectories of many routes replayed at once. Every array has shape (routes, steps):
+    x, y and heading hold the state after each step, obstacle_hit flags the forward moves which
+    were blocked, and obstacle_x, obstacle_y hold the blocked cell of those moves.
+    """
+
+    def __init__(self, commands, x, y, heading, obstacle_hit, obstacle_x, obstacle_y):
+        self.commands = commands
+        self.x = x
+        self.y = y
+        self.heading = heading
+        self.obstacle_hit = obstacle_hit
+        self.obstacle_x = obstacle_x
+        self.obstacle_y = obstacle_y
+
+    def status(self, route: int, step: int) -> str:
+        """
+        :return: the status CleaningRobot.execute_command returns for the given step of a route
+        """
+        status = f"({self.x[route, step]},{self.y[route, step]},{HEADINGS[self.heading[route, step]]})"
+        if self.obstacle_hit[route, step]:
+            status += f"({self.obstacle_x[route, step]},{self.obstacle_y[route, step]})"
+        return status
+
+    def statuses(self, route: int) -> list[str]:
+        steps = int(np.count_nonzero(self.commands[route]))
+        return [self.status(route, step) for step in range(steps)]
+
+    def obstacle_positions(self) -> np.ndarray:
+        """
+        :return: a (hits, 3) array of route index, obstacle x and obstacle y of every obstacle hit
+        """
+        routes, steps = np.nonzero(self.obstacle_hit)
+        return np.column_stack((routes, self.obstacle_x[routes, steps], self.obstacle_y[routes, steps]))
+
+
+def replay_routes(commands: np.ndarray, grid: np.ndarray, start: tuple[int, int, str] = (0, 0, CleaningRobot.N)) -> RouteReplay:
+    """
+    Replay many encoded routes over an occupancy grid. Headings are computed with a cumulative sum over
+    the whole array; positions are advanced one step at a time, vectorized across the routes, because a
+    blocked move depends on where the robot is. As with CleaningRobot, a blocked forward move leaves the
+    robot in place and the route goes on.
+    :param commands: (routes, steps) array of command codes, see encode_routes
+    :param grid: boolean occupancy grid indexed as grid[x, y]; the cells outside the grid are blocked
+    :param start: initial position and heading of every route
+    """
+    commands = np.asarray(commands, dtype=np.uint8)
+    grid = np.asarray(grid, dtype=bool)
+    if commands.ndim != 2 or grid.ndim != 2 or commands.max(initial=PAD) > RIGHT:
+        raise CleaningRobotError
+    route_count, steps = commands.shape
+    width, height = grid.shape
+
+    turns = np.where(commands == RIGHT, 1, np.where(commands == LEFT, -1, 0))
+    heading = (HEADINGS.index(start[2]) + np.cumsum(turns, axis=1)) % 4
+
+    x = np.empty((route_count, steps), dtype=np.int64)
+    y = np.empty((route_count, steps), dtype=np.int64)
+    obstacle_hit = np.zeros((route_count, steps), dtype=bool)
+    obstacle_x = np.zeros((route_count, steps), dtype=np.int64)
+    obstacle_y = np.zeros((route_count, steps), dtype=np.int64)
+
+    current_x = np.full(route_count, start[0], dtype=np.int64)
+    current_y = np.full(route_count, start[1], dtype=np.int64)
+    for step in range(steps):
+        forward = commands[:, step] == FORWARD
+        target_x = current_x + _DX[heading[:, step]]
+        target_y = current_y + _DY[heading[:, step]]
+        inside = (target_x >= 0) & (target_x < width) & (target_y >= 0) & (target_y < height)
+        occupied = grid[np.clip(target_x, 0, width - 1), np.clip(target_y, 0, height - 1)]
+        blocked = forward & (~inside | occupied)
+        moved = forward & ~blocked
+
+        current_x = np.where(moved, target_x, current_x)
+        current_y = np.where(moved, target_y, current_y)
+        x[:, step] = current_x
+        y[:, step] = current_y
+        obstacle_hit[:, step] = blocked
+        obstacle_x[:, step] = target_x
+        obstacle_y[:, step] = target_y
+
+    return RouteReplay(commands, x, y, heading, obstacle_hit, obstacle_x, obstacle_y)
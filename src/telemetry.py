@@ -0,0 +1,96 @@
+import os
+import struct
+import time
+from typing import Callable, Iterator
+
+from src.cleaning_robot import CleaningRobot
+
+# One state transition: timestamp, x, y, heading, flags, charge, obstacle x, obstacle y (little-endian, no padding)
+RECORD = struct.Struct("<diiBBhii")
+
+HEADINGS = (CleaningRobot.N, CleaningRobot.E, CleaningRobot.S, CleaningRobot.W)
+
+# Flags of a record
+OBSTACLE = 1
+CLEANING_SYSTEM_ON = 2
+RECHARGE_LED_ON = 4
+
+
+def record_dtype():
+    """
+    :return: the NumPy structured dtype matching RECORD
+    """
+    import numpy as np
+    return np.dtype([("timestamp", "<f8"), ("x", "<i4"), ("y", "<i4"), ("heading", "u1"), ("flags", "u1"),
+                     ("charge", "<i2"), ("obstacle_x", "<i4"), ("obstacle_y", "<i4")])
+
+
+class TelemetryWriter:
+    """
+    Appends the state transitions of a robot to a file of fixed-size records
+    """
+
+    def __init__(self, path: str, clock: Callable[[], float] = time.time, buffering: int = 64 * RECORD.size):
+        self.path = path
+        self.clock = clock
+        self._file = open(path, "ab", buffering=buffering)
+        self.records = 0
+
+    def record(self, robot: CleaningRobot, charge: int, obstacle: tuple[int, int] | None = None) -> None:
+        flags = 0
+        if obstacle is not None:
+            flags |= OBSTACLE
+        else:
+            obstacle = (0, 0)
+        if robot.cleaning_system_on:
+            flags |= CLEANING_SYSTEM_ON
+        if robot.recharge_led_on:
+            flags |= RECHARGE_LED_ON
+        self._file.write(RECORD.pack(self.clock(), robot.pos_x, robot.pos_y, HEADINGS.index(robot.heading), flags,
+                                     int(charge), obstacle[0], obstacle[1]))
+        self.records += 1
+
+    def flush(self) -> None:
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "TelemetryWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def iter_records(path: str) -> Iterator[tuple]:
+    """
+    Read the records of a telemetry file without NumPy
+    """
+    with open(path, "rb") as file:
+        data = file.read()
+    return RECORD.iter_unpack(data[:len(data) - len(data) % RECORD.size])
+
+
+def load_telemetry(path: str):
+    """
+    Map a telemetry file into a NumPy structured array, without copying it into memory
+    """
+    import numpy as np
+    dtype = record_dtype()
+    if os.path.getsize(path) < dtype.itemsize:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(path, dtype=dtype, mode="r", shape=(os.path.getsize(path) // dtype.itemsize,))
+
+
+def status_view(record) -> str:
+    """
+    :return: the status string CleaningRobot.execute_command returned for the transition of a record
+    """
+    _, x, y, heading, flags, _, obstacle_x, obstacle_y = tuple(record)
+    status = f"({x},{y},{HEADINGS[heading]})"
+    if flags & RECHARGE_LED_ON:
+        return "!" + status
+    if flags & OBSTACLE:
+        status += f"({obstacle_x},{obstacle_y})"
+    return status
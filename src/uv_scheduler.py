@@ -0,0 +1,154 @@
+import threading
+import time
+from collections import deque
+from typing import Callable
+
+from src import backends, cleaning_robot
+
+# Name of the background exposure threads (e.g., to tell their hardware access apart in a trace)
+WORKER_NAME = "uv-scheduler"
+
+
+class UVScheduler:
+    """
+    Runs the UV sterilization of each cell as a background job, so that the robot can execute
+    the next command while the previous cell is still being exposed.
+    Consecutive exposures are batched: the UV light is switched on once and kept on until the queue is empty.
+    Once attached to a robot (robot.uv_scheduler = scheduler), the light is driven through the robot's GPIO
+    and the exposures wait with the robot's background sleep (on a simulated robot, a timeline of their own
+    running alongside the robot's moves), so that per-robot stand-ins, instrumentation and trace backends
+    see them like the blocking exposures; completed exposures are counted in the robot's coverage.
+    """
+
+    PENDING = "pending"
+    EXPOSING = "exposing"
+    DONE = "done"
+
+    def __init__(self, exposure_time: float = 30, dedupe_cells: bool = True,
+                 sleep: Callable[[float], None] | None = None, gpio=None):
+        """
+        :param exposure_time: seconds of UV exposure for each cell
+        :param dedupe_cells: if True, a cell which is pending, exposing, or already done is not exposed again
+        :param sleep: function used to wait for the exposure to complete (by default, the background sleep
+        of the robot the scheduler is attached to, otherwise the sleep of the current backend)
+        :param gpio: GPIO module driving the UV light (by default, the one of the robot the scheduler is attached to,
+        otherwise the one of the current backend)
+        """
+        if exposure_time < 0:
+            raise cleaning_robot.CleaningRobotError
+        self.exposure_time = exposure_time
+        self.dedupe_cells = dedupe_cells
+        self.sleep = sleep
+        self.gpio = gpio
+        self.robot = None
+        self.light_on = False
+
+        self._cells = {}
+        self._queue = deque()
+        self._condition = threading.Condition()
+        self._worker = None
+        self._stopped = False
+
+    def bind(self, robot: "cleaning_robot.CleaningRobot") -> None:
+        """
+        Drive the UV light of the given robot (called when the scheduler is attached to it)
+        """
+        self.robot = robot
+
+    def schedule(self, cell: tuple[int, int]) -> bool:
+        """
+        Queue the exposure of a cell without blocking the caller
+        :param cell: the (x, y) cell to expose
+        :return: True if a new exposure has been queued, False if it has been merged with an existing one
+        """
+        with self._condition:
+            if self._stopped:
+                raise cleaning_robot.CleaningRobotError
+            if self.dedupe_cells and cell in self._cells:
+                return False
+            self._cells[cell] = self.PENDING
+            # The wait is resolved here, so that a simulated exposure starts when the cell is reached
+            self._queue.append((cell, self._sleep_function()))
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name=WORKER_NAME, daemon=True)
+                self._worker.start()
+            self._condition.notify_all()
+            return True
+
+    def exposure_status(self, cell: tuple[int, int]) -> str | None:
+        """
+        :return: PENDING, EXPOSING, DONE, or None if the cell has never been scheduled
+        """
+        with self._condition:
+            return self._cells.get(cell)
+
+    def pending_count(self) -> int:
+        with self._condition:
+            return len(self._queue) + sum(1 for status in self._cells.values() if status == self.EXPOSING)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Block until every queued exposure is done
+        :return: False if the timeout expired first
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: not self._queue and not self.light_on, timeout)
+
+    def shutdown(self) -> None:
+        """
+        Complete the queued exposures and stop the background worker
+        """
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._queue or self._stopped)
+                if not self._queue:
+                    return
+                cell, sleep = self._queue.popleft()
+                self._cells[cell] = self.EXPOSING
+                if not self.light_on:
+                    self._output(True)
+                    self.light_on = True
+
+            sleep(self.exposure_time)
+
+            with self._condition:
+                self._cells[cell] = self.DONE
+                if self.robot is not None and self.robot.coverage is not None:
+                    self.robot.coverage.record_uv(cell)
+                if not self._queue:
+                    self._output(False)
+                    self.light_on = False
+                self._condition.notify_all()
+
+    def _output(self, value: bool) -> None:
+        if self.gpio is not None:
+            gpio = self.gpio
+        elif self.robot is not None:
+            gpio = self.robot.gpio
+        else:
+            gpio = backends.get_backend().gpio
+        gpio.output(cleaning_robot.CleaningRobot.UV_LIGHT_PIN, value)
+
+    def _sleep_function(self) -> Callable[[float], None]:
+        if self.sleep is not None:
+            return self.sleep
+        if self.robot is not None:
+            return self.robot._background_sleep()
+        return backends.get_backend().sleep or time.sleep
+
+
+class NoOpUVScheduler:
+    """
+    UV scheduler which skips the exposures, so that forward moves do not wait for the UV light
+    (e.g., to measure or test the control loop alone)
+    """
+
+    def schedule(self, cell: tuple[int, int]) -> bool:
+        return True
@@ -0,0 +1,133 @@
+import asyncio
+import time
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO, board, ibs
+from mock.ibs import IBS
+from src import backends
+from src.async_cleaning_robot import AsyncCleaningRobot
+from src.backends import Backend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError, MotorProfile
+
+
+class TestAsyncCleaningRobot(IsolatedAsyncioTestCase):
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    async def test_execute_command_move_forward(self, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        mock_infrared_sensor.return_value = False
+        system = AsyncCleaningRobot()
+        system.uv_exposure_time = 0
+        system.pos_x = 1
+        system.pos_y = 1
+        system.heading = "E"
+
+        status = await system.execute_command_async("f")
+
+        self.assertEqual(status, "(2,1,E)")
+
+    @patch.object(IBS, "get_charge_left")
+    async def test_execute_command_turn_left_and_right(self, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        system = AsyncCleaningRobot()
+        system.initialize_robot()
+
+        self.assertEqual(await system.execute_command_async("l"), "(0,0,W)")
+        self.assertEqual(await system.execute_command_async("r"), "(0,0,N)")
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    async def test_execute_command_forward_when_obstacle_found(self, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        mock_infrared_sensor.return_value = True
+        system = AsyncCleaningRobot()
+        system.pos_x = 1
+        system.pos_y = 1
+        system.heading = "N"
+
+        self.assertEqual(await system.execute_command_async("f"), "(1,1,N)(1,2)")
+
+    @patch.object(IBS, "get_charge_left")
+    async def test_execute_command_if_battery_is_low(self, mock_ibs: Mock):
+        mock_ibs.return_value = 10
+        system = AsyncCleaningRobot()
+        system.initialize_robot()
+
+        self.assertEqual(await system.execute_command_async("f"), "!(0,0,N)")
+        self.assertTrue(system.recharge_led_on)
+
+    @patch.object(IBS, "get_charge_left")
+    async def test_execute_command_invalid_input(self, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        system = AsyncCleaningRobot()
+        system.initialize_robot()
+
+        with self.assertRaises(CleaningRobotError):
+            await system.execute_command_async("x")
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    async def test_execute_commands_streams_statuses(self, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        mock_infrared_sensor.side_effect = [False, True]
+        system = AsyncCleaningRobot()
+        system.uv_exposure_time = 0
+        system.initialize_robot()
+
+        statuses = [status async for status in system.execute_commands_async("frff")]
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,E)", "(0,1,E)(1,1)"])
+        self.assertEqual(system.last_route_steps, 3)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    async def test_many_robots_run_concurrently(self, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        mock_infrared_sensor.return_value = False
+        robots = [AsyncCleaningRobot() for _ in range(20)]
+        for robot in robots:
+            robot.uv_exposure_time = 0.05
+            robot.initialize_robot()
+
+        start = time.perf_counter()
+        statuses = await asyncio.gather(*(robot.execute_command_async("f") for robot in robots))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(statuses, ["(0,1,N)"] * 20)
+        self.assertLess(elapsed, 0.05 * 20 / 2)
+
+    @patch.object(IBS, "get_charge_left")
+    async def test_synchronous_api_still_works(self, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        system = AsyncCleaningRobot()
+        system.initialize_robot()
+
+        self.assertEqual(system.execute_command("r"), "(0,0,E)")
+        self.assertEqual(list(system.execute_commands("l")), ["(0,0,N)"])
+
+    async def test_pwm_profile_and_backend_sleep_are_used(self):
+        GPIO.reset()
+        ibs.reset()
+        self.addCleanup(GPIO.reset)
+        self.addCleanup(backends.reset_backend)
+        slept = []
+        backends.register_backend("sleep-recording", lambda: Backend("sleep-recording", GPIO, board, ibs,
+                                                                      deployment=True, sleep=slept.append))
+        self.addCleanup(backends._loaders.pop, "sleep-recording")
+        backends.select_backend("sleep-recording")
+        profile = MotorProfile(ramp_steps=2, ramp_time=0.2, cell_time=0.5, rotation_time=0.6)
+
+        for robot_class in (CleaningRobot, AsyncCleaningRobot):
+            system = robot_class()
+            system.enable_pwm(profile)
+            system.uv_scheduler = Mock()
+            system.initialize_robot()
+            if robot_class is AsyncCleaningRobot:
+                self.assertEqual(await system.execute_command_async("f"), "(0,1,N)")
+            else:
+                self.assertEqual(system.execute_command("f"), "(0,1,N)")
+
+        self.assertEqual(slept, [0.1, 0.1, 0.5, 0.1, 0.1] * 2)
+        self.assertEqual(system.wheel_pwm.dutycycle, 0)
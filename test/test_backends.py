@@ -0,0 +1,82 @@
+import os
+import subprocess
+import sys
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+import mock.GPIO
+from src import backends
+from src.backends import Backend
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Budget for a cold import of src.cleaning_robot in a fresh interpreter
+IMPORT_TIME_BUDGET = 0.25
+
+
+class TestBackends(TestCase):
+
+    def tearDown(self):
+        backends.reset_backend()
+
+    def test_get_backend_falls_back_to_mock(self):
+        backends.reset_backend()
+        with patch.dict(os.environ, {backends.BACKEND_ENV_VAR: ""}):
+            backend = backends.get_backend()
+        self.assertEqual(backend.name, "mock")
+        self.assertIs(backend.gpio, mock.GPIO)
+        self.assertFalse(backend.deployment)
+
+    def test_get_backend_is_cached(self):
+        self.assertIs(backends.get_backend(), backends.get_backend())
+
+    def test_select_registered_backend(self):
+        gpio = Mock()
+        backends.register_backend("test", lambda: Backend("test", gpio, Mock(), Mock(), deployment=False))
+        try:
+            with self.assertLogs(backends.logger, "INFO"):
+                backends.select_backend("test")
+            system = CleaningRobot()
+        finally:
+            del backends._loaders["test"]
+
+        self.assertIs(system.gpio, gpio)
+        gpio.setup.assert_any_call(CleaningRobot.INFRARED_PIN, gpio.IN)
+
+    def test_backend_forced_by_environment(self):
+        backends.reset_backend()
+        with patch.dict(os.environ, {backends.BACKEND_ENV_VAR: "mock"}):
+            self.assertEqual(backends.get_backend().name, "mock")
+
+    def test_get_backend_skips_backend_failing_off_the_hardware(self):
+        backends.reset_backend()
+
+        def load_off_pi():
+            raise RuntimeError("This module can only be run on a Raspberry Pi!")
+
+        with patch.dict(backends._loaders, {"rpi": load_off_pi}), patch.dict(os.environ, {backends.BACKEND_ENV_VAR: ""}):
+            self.assertEqual(backends.get_backend().name, "mock")
+
+    def test_forced_backend_errors_are_raised(self):
+        backends.reset_backend()
+
+        def load_off_pi():
+            raise RuntimeError("This module can only be run on a Raspberry Pi!")
+
+        with patch.dict(backends._loaders, {"rpi": load_off_pi}), patch.dict(os.environ, {backends.BACKEND_ENV_VAR: "rpi"}):
+            self.assertRaises(RuntimeError, backends.get_backend)
+
+    def test_select_unknown_backend_raises(self):
+        self.assertRaises(CleaningRobotError, backends.select_backend, "unknown")
+
+    def test_import_time_within_budget(self):
+        code = ("import sys, time\n"
+                "start = time.perf_counter()\n"
+                "import src.cleaning_robot\n"
+                "print(time.perf_counter() - start, 'sympy' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+        elapsed, sympy_loaded = output.split()
+
+        self.assertEqual(sympy_loaded, "False")
+        self.assertLess(float(elapsed), IMPORT_TIME_BUDGET)
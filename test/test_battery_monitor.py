@@ -0,0 +1,88 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from src.battery_monitor import BatteryMonitor
+from src.cleaning_robot import CleaningRobot
+from src.fleet_simulator import VirtualClock
+
+
+class TestBatteryMonitor(TestCase):
+
+    def setUp(self):
+        self.clock = VirtualClock()
+        self.ibs = Mock()
+
+    def test_charge_left_is_cached_for_ttl(self):
+        self.ibs.get_charge_left.side_effect = [80, 70]
+        monitor = BatteryMonitor(self.ibs, ttl=5, clock=self.clock.time)
+
+        first = monitor.charge_left()
+        self.clock.sleep(4)
+        second = monitor.charge_left()
+        self.clock.sleep(1)
+        third = monitor.charge_left()
+
+        self.assertEqual((first, second, third), (80, 80, 70))
+        self.assertEqual(self.ibs.get_charge_left.call_count, 2)
+
+    def test_invalidate_forces_reading(self):
+        self.ibs.get_charge_left.side_effect = [20, 100]
+        monitor = BatteryMonitor(self.ibs, ttl=5, clock=self.clock.time)
+
+        monitor.charge_left()
+        monitor.invalidate()
+
+        self.assertEqual(monitor.charge_left(), 100)
+
+    def test_drain_rate_and_time_to_threshold(self):
+        self.ibs.get_charge_left.side_effect = [50, 48, 46]
+        monitor = BatteryMonitor(self.ibs, ttl=0, clock=self.clock.time)
+        for _ in range(3):
+            monitor.charge_left()
+            self.clock.sleep(10)
+
+        self.assertAlmostEqual(monitor.drain_rate(), 0.2)
+        self.assertAlmostEqual(monitor.time_to_threshold(10), 36 / 0.2 - 10)
+        self.assertAlmostEqual(monitor.predict_charge(20), 46 - 0.2 * 30)
+
+    def test_no_prediction_without_drain(self):
+        self.ibs.get_charge_left.return_value = 50
+        monitor = BatteryMonitor(self.ibs, ttl=0, clock=self.clock.time)
+
+        self.assertIsNone(monitor.drain_rate())
+        monitor.charge_left()
+        self.clock.sleep(1)
+        monitor.charge_left()
+
+        self.assertEqual(monitor.drain_rate(), 0)
+        self.assertIsNone(monitor.time_to_threshold())
+
+    def test_affordable_route_is_shortened(self):
+        self.ibs.get_charge_left.side_effect = [13, 12]
+        monitor = BatteryMonitor(self.ibs, ttl=0, clock=self.clock.time)
+        monitor.charge_left()
+        self.clock.sleep(1)
+        monitor.charge_left()
+        system = CleaningRobot()
+        system.battery_monitor = monitor
+
+        self.assertEqual(system.affordable_route("rlrlr"), "rl")
+        self.assertEqual(system.affordable_route("f"), "")
+
+    def test_affordable_route_without_monitor_is_unchanged(self):
+        self.assertEqual(CleaningRobot().affordable_route("ffr"), "ffr")
+
+    @patch.object(GPIO, "output")
+    def test_manage_cleaning_system_skips_unchanged_pins(self, mock_output: Mock):
+        system = CleaningRobot()
+        system.battery_monitor = Mock()
+        system.battery_monitor.charge_left.return_value = 50
+
+        system.manage_cleaning_system()
+        system.manage_cleaning_system()
+
+        self.assertEqual(mock_output.call_count, 2)
+        system.battery_monitor.charge_left.return_value = 5
+        system.manage_cleaning_system()
+        self.assertEqual(mock_output.call_count, 4)
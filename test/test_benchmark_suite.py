@@ -0,0 +1,64 @@
+import io
+import json
+import os
+import tempfile
+from contextlib import redirect_stdout
+from unittest import TestCase
+from unittest.mock import patch
+
+from benchmarks import suite
+
+
+def results(**values) -> dict:
+    return {"python": "3", "machine": "x86_64", "unit": "us", "results": values}
+
+
+class TestBenchmarkSuite(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.baseline_path = os.path.join(directory.name, "baseline.json")
+        with open(self.baseline_path, "w") as file:
+            json.dump(results(route=10.0, construction=2.0), file)
+
+    def run_main(self, current: dict, *args: str) -> tuple[int, str]:
+        output = io.StringIO()
+        with patch.object(suite, "run_benchmarks", return_value=current), redirect_stdout(output):
+            status = suite.main(["--compare", self.baseline_path, *args])
+        return status, output.getvalue()
+
+    def test_compare_reports_slowdowns_beyond_the_tolerance(self):
+        baseline = results(route=10.0, construction=2.0, import_=4.0)
+        current = results(route=11.5, construction=2.2, import_=3.0)
+
+        regressions = suite.compare(baseline, current, tolerance=0.10)
+
+        self.assertEqual([name for name, _, _, _ in regressions], ["route"])
+        name, previous, value, ratio = regressions[0]
+        self.assertEqual((previous, value), (10.0, 11.5))
+        self.assertAlmostEqual(ratio, 1.15)
+
+    def test_compare_tolerance(self):
+        baseline, current = results(route=10.0), results(route=11.5)
+
+        self.assertEqual(suite.compare(baseline, current, tolerance=0.2), [])
+        self.assertEqual(len(suite.compare(baseline, current, tolerance=0.1)), 1)
+
+    def test_compare_ignores_benchmarks_missing_from_the_baseline(self):
+        baseline = results(route=0.0)
+        current = results(route=5.0, construction=1.0)
+
+        self.assertEqual(suite.compare(baseline, current), [])
+
+    def test_main_exit_status(self):
+        status, output = self.run_main(results(route=10.5, construction=1.9))
+        self.assertEqual(status, 0)
+        self.assertNotIn("regression", output)
+
+        status, output = self.run_main(results(route=13.0, construction=1.9))
+        self.assertEqual(status, 1)
+        self.assertIn("regression: route 10.00 us -> 13.00 us (1.30x)", output)
+
+        status, _ = self.run_main(results(route=13.0, construction=1.9), "--tolerance", "0.5")
+        self.assertEqual(status, 0)
@@ -0,0 +1,139 @@
+import os
+import tempfile
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.checkpoint import Checkpoint, RouteCheckpointer, load_checkpoint, save_checkpoint
+from src.cleaning_robot import CleaningRobotError
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class TestCheckpoint(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "robot.checkpoint")
+        self.obstacle_map = ObstacleMap([(2, 2)])
+
+    def make_robot(self, charge: float = 100) -> SimulatedRobot:
+        robot = SimulatedRobot(self.obstacle_map, BatteryDrainModel(per_move=30, per_rotation=0, per_uv_second=0),
+                               initial_charge=charge)
+        robot.initialize_robot()
+        return robot
+
+    def test_save_and_load_round_trip(self):
+        save_checkpoint(self.path, Checkpoint(1, 2, "E", "ffr", 2, {(3, 4), (0, -1)}))
+
+        checkpoint = load_checkpoint(self.path)
+
+        self.assertEqual((checkpoint.x, checkpoint.y, checkpoint.heading), (1, 2, "E"))
+        self.assertEqual((checkpoint.route, checkpoint.cursor), ("ffr", 2))
+        self.assertEqual(checkpoint.obstacles, {(3, 4), (0, -1)})
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_load_missing_and_invalid_checkpoint(self):
+        self.assertIsNone(load_checkpoint(self.path))
+        with open(self.path, "w") as file:
+            file.write('{"x": 1')
+        self.assertRaises(CleaningRobotError, load_checkpoint, self.path)
+
+    def test_failed_write_keeps_previous_checkpoint(self):
+        save_checkpoint(self.path, Checkpoint(0, 0, "N", "f", 0, set()), fsync=False)
+
+        with patch("os.replace", side_effect=OSError):
+            self.assertRaises(OSError, save_checkpoint, self.path, Checkpoint(0, 1, "N", "f", 1, set()))
+
+        self.assertEqual(load_checkpoint(self.path).cursor, 0)
+
+    def test_resume_after_low_charge_stop(self):
+        robot = self.make_robot(charge=100)
+        statuses = list(RouteCheckpointer(robot, self.path, fsync=False, battery_check_interval=1).run("frfflf"))
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,E)", "(1,1,E)", "(2,1,E)", "!(2,1,E)"])
+
+        # The process restarts with a recharged battery
+        restarted = self.make_robot(charge=100)
+        checkpointer = RouteCheckpointer(restarted, self.path, fsync=False, battery_check_interval=1)
+        statuses = list(checkpointer.resume())
+
+        self.assertEqual(statuses, ["(2,1,N)", "(2,1,N)(2,2)"])
+        self.assertEqual(checkpointer.cursor, 6)
+        self.assertTrue(checkpointer.done)
+        self.assertEqual(load_checkpoint(self.path).obstacles, {(2, 2)})
+
+    def test_resume_restores_known_obstacles(self):
+        robot = self.make_robot()
+        robot.heading = "E"
+        robot.pos_x, robot.pos_y = 1, 2
+        checkpointer = RouteCheckpointer(robot, self.path, fsync=False)
+        self.assertEqual(list(checkpointer.run("flf")), ["(1,2,E)(2,2)"])
+
+        restarted = self.make_robot()
+        resumed = RouteCheckpointer(restarted, self.path, fsync=False)
+        statuses = list(resumed.resume())
+
+        self.assertTrue(restarted.room_map.is_blocked((2, 2)))
+        self.assertEqual(statuses, ["(1,2,N)", "(1,3,N)"])
+
+    def crash_during_second_move(self) -> None:
+        robot = self.make_robot()
+        statuses = RouteCheckpointer(robot, self.path, fsync=False).run("ffr")
+        self.assertEqual(next(statuses), "(0,1,N)")
+        with patch.object(robot, "activate_wheel_motor", side_effect=KeyboardInterrupt):
+            self.assertRaises(KeyboardInterrupt, next, statuses)
+        self.assertEqual(load_checkpoint(self.path).pending, 1)
+
+    def test_resume_after_crash_during_a_command_needs_the_position(self):
+        self.crash_during_second_move()
+        checkpointer = RouteCheckpointer(self.make_robot(), self.path, fsync=False)
+
+        self.assertRaises(CleaningRobotError, checkpointer.resume)
+        self.assertRaises(CleaningRobotError, checkpointer.resume, (1, 1, "N"))
+
+    def test_resume_after_crash_skips_the_command_the_robot_completed(self):
+        self.crash_during_second_move()
+
+        statuses = list(RouteCheckpointer(self.make_robot(), self.path, fsync=False).resume((0, 2, "N")))
+
+        self.assertEqual(statuses, ["(0,2,E)"])
+
+    def test_resume_after_crash_repeats_the_command_the_robot_did_not_start(self):
+        self.crash_during_second_move()
+
+        statuses = list(RouteCheckpointer(self.make_robot(), self.path, fsync=False).resume((0, 1, "N")))
+
+        self.assertEqual(statuses, ["(0,2,N)", "(0,2,E)"])
+        self.assertIsNone(load_checkpoint(self.path).pending)
+
+    def test_commands_append_records_without_rewriting_the_route(self):
+        robot = self.make_robot()
+        route = "rl" * 50
+        checkpointer = RouteCheckpointer(robot, self.path, fsync=False)
+
+        with patch("src.checkpoint.save_checkpoint", wraps=save_checkpoint) as save:
+            list(checkpointer.run(route))
+
+        save.assert_called_once()
+        with open(self.path) as file:
+            lines = file.read().splitlines()
+        self.assertEqual(len(lines), 1 + 2 * len(route))
+        self.assertNotIn(route, "".join(lines[1:]))
+        self.assertEqual(load_checkpoint(self.path).cursor, len(route))
+
+    def test_interrupted_record_is_ignored(self):
+        save_checkpoint(self.path, Checkpoint(0, 0, "N", "ff", 0, set()), fsync=False)
+        with open(self.path, "a") as file:
+            file.write('{"intent":0}\n{"cursor":1,"x":0,')
+
+        checkpoint = load_checkpoint(self.path)
+
+        self.assertEqual((checkpoint.cursor, checkpoint.pending), (0, 0))
+
+    def test_resume_without_checkpoint_raises(self):
+        self.assertRaises(CleaningRobotError, RouteCheckpointer(self.make_robot(), self.path).resume)
+
+    def test_invalid_route_raises_before_moving(self):
+        robot = self.make_robot()
+        self.assertRaises(CleaningRobotError, RouteCheckpointer(robot, self.path).run, "ffx")
+        self.assertEqual(robot.robot_status(), "(0,0,N)")
+        self.assertIsNone(load_checkpoint(self.path))
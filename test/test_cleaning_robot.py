@@ -1,9 +1,10 @@
 from unittest import TestCase
 from unittest.mock import Mock, patch, call
 
-from mock import GPIO
+from mock import GPIO, ibs
 from mock.ibs import IBS
 from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.uv_scheduler import UVScheduler
 
 
 class TestCleaningRobot(TestCase):
@@ -181,3 +182,129 @@ class TestCleaningRobot(TestCase):
         self.assertEqual(system.pos_x, 1)
         self.assertEqual(system.pos_y, 2)
         self.assertEqual(system.heading, "N")
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_uv_light")
+    @patch.object(GPIO, "input")
+    def test_execute_commands_runs_whole_route(self, mock_infrared_sensor: Mock, mock_activate_uv_light: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        mock_infrared_sensor.return_value = False
+        system = CleaningRobot()
+        system.initialize_robot()
+
+        statuses = list(system.execute_commands("ffrf"))
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,2,N)", "(0,2,E)", "(1,2,E)"])
+        self.assertEqual(system.last_route_steps, 4)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_uv_light")
+    @patch.object(GPIO, "input")
+    def test_execute_commands_reads_battery_once_per_interval(self, mock_infrared_sensor: Mock, mock_activate_uv_light: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        mock_infrared_sensor.return_value = False
+        system = CleaningRobot()
+        system.initialize_robot()
+
+        list(system.execute_commands("rrrrrrrrrr", battery_check_interval=5))
+
+        self.assertEqual(mock_ibs.call_count, 2)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_uv_light")
+    @patch.object(GPIO, "input")
+    def test_execute_commands_stops_at_obstacle(self, mock_infrared_sensor: Mock, mock_activate_uv_light: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 50
+        mock_infrared_sensor.side_effect = [False, True]
+        system = CleaningRobot()
+        system.initialize_robot()
+
+        statuses = list(system.execute_commands("ffff"))
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,N)(0,2)"])
+        self.assertEqual(system.last_route_steps, 2)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_rotation_motor")
+    def test_execute_commands_stops_when_battery_is_low(self, mock_activate_rotation_motor: Mock, mock_ibs: Mock):
+        mock_ibs.side_effect = [50, 10]
+        system = CleaningRobot()
+        system.initialize_robot()
+
+        statuses = list(system.execute_commands("rrrr", battery_check_interval=2))
+
+        self.assertEqual(statuses, ["(0,0,E)", "(0,0,S)", "!(0,0,S)"])
+        self.assertEqual(system.last_route_steps, 2)
+        self.assertTrue(system.recharge_led_on)
+
+
+class TestCleaningRobotScenarios(TestCase):
+    """
+    Scenarios scripted through the stateful mock hardware, without patching
+    """
+
+    def setUp(self):
+        GPIO.reset()
+        ibs.reset()
+        self.system = CleaningRobot()
+        self.system.uv_scheduler = UVScheduler(exposure_time=0)
+        self.system.initialize_robot()
+
+    def tearDown(self):
+        self.system.uv_scheduler.shutdown()
+        GPIO.reset()
+        ibs.reset()
+
+    def test_route_with_obstacle(self):
+        GPIO.set_input_sequence(self.system.INFRARED_PIN, [0, 0, 1, 0])
+
+        statuses = [self.system.execute_command(command) for command in "ffflf"]
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,2,N)", "(0,2,N)(0,3)", "(0,2,W)", "(-1,2,W)"])
+        self.assertEqual(GPIO.get_level(self.system.CLEANING_SYSTEM_PIN), GPIO.HIGH)
+        self.assertEqual(GPIO.get_level(self.system.PWMA), GPIO.LOW)
+
+    def test_route_until_battery_is_low(self):
+        ibs.set_charge_curve([30, 20, 10])
+
+        statuses = [self.system.execute_command("r") for _ in range(3)]
+
+        self.assertEqual(statuses, ["(0,0,E)", "(0,0,S)", "!(0,0,S)"])
+        self.assertEqual(GPIO.get_level(self.system.RECHARGE_LED_PIN), GPIO.HIGH)
+        self.assertEqual(GPIO.get_level(self.system.CLEANING_SYSTEM_PIN), GPIO.LOW)
+
+    def test_wheel_motor_pins_written_in_two_calls(self):
+        GPIO.enable_trace()
+        self.addCleanup(GPIO.disable_trace)
+
+        with patch.object(GPIO, "output", wraps=GPIO.output) as mock_output:
+            self.system.activate_wheel_motor()
+
+        self.assertEqual(mock_output.call_count, 2)
+        pins = [self.system.AIN1, self.system.AIN2, self.system.PWMA, self.system.STBY]
+        self.assertEqual([(pin, value) for pin, value, _ in GPIO.dump_trace()],
+                         list(zip(pins, [1, 0, 1, 1])) + list(zip(pins, [0, 0, 0, 0])))
+
+    def test_rotation_motor_pins_written_in_two_calls(self):
+        with patch.object(GPIO, "output", wraps=GPIO.output) as mock_output:
+            self.system.activate_rotation_motor("r")
+
+        mock_output.assert_any_call([self.system.BIN1, self.system.BIN2, self.system.PWMB, self.system.STBY], [0, 1, 1, 1])
+        self.assertEqual(mock_output.call_count, 2)
+        self.assertEqual(GPIO.get_level(self.system.PWMB), GPIO.LOW)
+
+    def test_rotation_motor_invalid_direction_raises(self):
+        self.assertRaises(CleaningRobotError, self.system.activate_rotation_motor, "x")
+
+    def test_commands_on_uninitialized_robot_raise(self):
+        system = CleaningRobot()
+        with patch.object(system, "activate_rotation_motor") as mock_rotation:
+            for command in "flr":
+                self.assertRaises(CleaningRobotError, system.execute_command, command)
+        mock_rotation.assert_not_called()
+
+    def test_state_is_slotted(self):
+        self.assertFalse(hasattr(self.system._state, "__dict__"))
+        self.system.pos_x, self.system.pos_y, self.system.heading = 4, -1, "W"
+        self.assertEqual((self.system._state.x, self.system._state.y, self.system._state.heading), (4, -1, 3))
+        self.assertEqual(self.system.robot_status(), "(4,-1,W)")
@@ -0,0 +1,143 @@
+import asyncio
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+
+from src.async_cleaning_robot import AsyncCleaningRobot
+from src.cleaning_robot import CleaningRobotError
+from src.command_client import CommandClient, run_load
+from src.command_server import FRAME_LIMIT, CommandServer
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class TestCommandServer(IsolatedAsyncioTestCase):
+
+    async def asyncSetUp(self):
+        self.robot = SimulatedRobot(ObstacleMap([(1, 2)]), BatteryDrainModel(0, 0, 0))
+        self.robot.initialize_robot()
+        self.server = CommandServer(self.robot, max_batch=8, offload=False)
+        self.address = await self.server.start_tcp()
+        self.addAsyncCleanup(self.server.close)
+
+    async def connect(self) -> CommandClient:
+        client = await CommandClient.connect_tcp(*self.address)
+        self.addAsyncCleanup(client.close)
+        return client
+
+    async def test_command_frames(self):
+        client = await self.connect()
+
+        self.assertEqual(await client.command("f"), "(0,1,N)")
+        self.assertEqual(await client.command("r"), "(0,1,E)")
+        self.assertEqual(await client.status(), "(0,1,E)")
+        self.assertEqual(await client.initialize(), "(0,0,N)")
+
+    async def test_batch_frame_stops_at_obstacle(self):
+        client = await self.connect()
+
+        statuses = await client.batch("frfff")
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,E)", "(1,1,E)", "(2,1,E)", "(3,1,E)"])
+        self.assertEqual((self.robot.pos_x, self.robot.pos_y), (3, 1))
+
+        self.robot.pos_x = 1
+        self.robot.heading = "N"
+        self.assertEqual(await client.batch("ff"), ["(1,1,N)(1,2)"])
+
+    async def test_invalid_batch_is_rejected_before_moving(self):
+        client = await self.connect()
+
+        with self.assertRaises(CleaningRobotError):
+            await client.batch("ffx")
+
+        self.assertEqual(await client.status(), "(0,0,N)")
+
+    async def test_errors_keep_connection_open(self):
+        client = await self.connect()
+
+        with self.assertRaises(CleaningRobotError):
+            await client.command("x")
+        with self.assertRaises(CleaningRobotError):
+            await client.batch("f" * 9)
+        with self.assertRaises(CleaningRobotError):
+            await client.send("Z")
+            await client.receive()
+        self.assertEqual(await client.command("f"), "(0,1,N)")
+
+    async def test_frames_before_initialization_are_errors(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        path = os.path.join(tempfile.mkdtemp(), "robot.sock")
+        server = CommandServer(robot, offload=False)
+        await server.start_unix(path)
+        self.addAsyncCleanup(server.close)
+        client = await CommandClient.connect_unix(path)
+        self.addAsyncCleanup(client.close)
+
+        for frame_type, body in (("S", ""), ("C", "l"), ("B", "rf")):
+            with self.assertRaisesRegex(CleaningRobotError, "not initialized"):
+                await client.send(frame_type, body)
+                await client.receive()
+        self.assertEqual(await client.initialize(), "(0,0,N)")
+        self.assertEqual(await client.status(), "(0,0,N)")
+
+    async def test_unexpected_robot_failure_is_an_error_frame(self):
+        client = await self.connect()
+
+        def fail(command):
+            raise TypeError
+
+        self.robot.execute_command = fail
+        with self.assertLogs("src.command_server", "ERROR"), self.assertRaisesRegex(CleaningRobotError, "internal error"):
+            await client.command("f")
+        del self.robot.execute_command
+        self.assertEqual(await client.command("f"), "(0,1,N)")
+
+    async def test_too_long_frame_closes_connection(self):
+        client = await self.connect()
+
+        await client.send("B", "f" * FRAME_LIMIT)
+
+        with self.assertRaises(CleaningRobotError):
+            await client.receive()
+        with self.assertRaises(CleaningRobotError):
+            await client.receive()
+
+    async def test_pipelined_frames_are_answered_in_order(self):
+        client = await self.connect()
+
+        for command in "ffrfl":
+            await client.send("C", command)
+        statuses = [(await client.receive())[1] for _ in range(5)]
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,2,N)", "(0,2,E)", "(0,2,E)(1,2)", "(0,2,N)"])
+
+    async def test_load_generator_reports_throughput_and_latency(self):
+        stats = await run_load(lambda: CommandClient.connect_tcp(*self.address), "rrrr" * 25, connections=2, depth=8)
+
+        self.assertEqual(stats["frames"], 200)
+        self.assertEqual(stats["commands"], 200)
+        self.assertGreater(stats["commands_per_second"], 0)
+        self.assertLessEqual(stats["p50_latency"], stats["p99_latency"])
+
+        stats = await run_load(lambda: CommandClient.connect_tcp(*self.address), "rrrr" * 25, batch_size=8)
+        self.assertEqual(stats["frames"], 13)
+        self.assertEqual(stats["commands"], 100)
+
+    async def test_load_generator_raises_on_error_frame(self):
+        load = run_load(lambda: CommandClient.connect_tcp(*self.address), "ffxff", depth=1)
+
+        with self.assertRaises(CleaningRobotError):
+            await asyncio.wait_for(load, 5)
+
+    async def test_unix_socket_with_async_robot(self):
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        path = os.path.join(tempfile.mkdtemp(), "robot.sock")
+        server = CommandServer(robot)
+        await server.start_unix(path)
+        self.addAsyncCleanup(server.close)
+        client = await CommandClient.connect_unix(path)
+        self.addAsyncCleanup(client.close)
+
+        self.assertEqual(await client.batch("lr"), ["(0,0,W)", "(0,0,N)"])
+        self.assertEqual(server.connections, 1)
@@ -0,0 +1,106 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest import TestCase
+
+from src.cleaning_robot import CleaningRobotError
+from src.coordinator import Coordinator, ReservationTable
+from src.fleet_simulator import BatteryDrainModel
+
+
+class TestCoordinator(TestCase):
+
+    def test_reservation_table_grants_cell_to_first_robot(self):
+        table = ReservationTable()
+        self.assertTrue(table.reserve((1, 1), 3, robot=0))
+        self.assertTrue(table.reserve((1, 1), 3, robot=0))
+        self.assertFalse(table.reserve((1, 1), 3, robot=1))
+        self.assertTrue(table.reserve((1, 1), 4, robot=1))
+        self.assertEqual(table.holder((1, 1), 3), 0)
+
+        table.release_before(4)
+        self.assertIsNone(table.holder((1, 1), 3))
+        self.assertEqual(len(table), 1)
+
+    def test_partition_splits_longer_side(self):
+        coordinator = Coordinator(3, 10, 4)
+        self.assertEqual(coordinator.regions, [(0, 0, 3, 3), (4, 0, 6, 3), (7, 0, 9, 3)])
+        self.assertEqual(Coordinator(2, 3, 5).regions, [(0, 0, 2, 2), (0, 3, 2, 4)])
+
+    def test_partition_rejects_more_robots_than_lanes(self):
+        self.assertRaises(CleaningRobotError, Coordinator, 5, 4, 2)
+
+    def test_schedule_makes_crossing_robot_wait(self):
+        coordinator = Coordinator(2, 3, 3)
+        schedule = coordinator.schedule([((0, 1, "E"), "ff"), ((1, 0, "N"), "ff")])
+
+        self.assertEqual(schedule.ticks, [[0, 1], [2, 3]])
+        self.assertEqual(schedule.waits, 2)
+        first, second = schedule.timeline(0), schedule.timeline(1)
+        self.assertEqual(first, [(0, 1), (1, 1), (2, 1), (2, 1), (2, 1)])
+        self.assertEqual(second, [(1, 0), (1, 0), (1, 0), (1, 1), (1, 2)])
+
+    def test_schedule_detects_deadlock(self):
+        coordinator = Coordinator(2, 3, 1)
+        self.assertRaises(CleaningRobotError, coordinator.schedule, [((0, 0, "E"), "ff"), ((2, 0, "W"), "ff")],
+                          max_wait=5)
+
+    def test_planned_schedule_never_puts_two_robots_in_same_cell(self):
+        coordinator = Coordinator(3, 9, 5, obstacles=[(1, 2), (4, 4), (7, 1)])
+        schedule = coordinator.schedule(coordinator.plan())
+
+        timelines = [schedule.timeline(robot) for robot in range(3)]
+        for tick in range(schedule.length + 1):
+            cells = [timeline[tick] for timeline in timelines]
+            self.assertEqual(len(set(cells)), len(cells))
+
+    def test_run_covers_room_with_threads(self):
+        coordinator = Coordinator(2, 6, 4, obstacles=[(2, 2)],
+                                  drain_model=BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+        stats = coordinator.run(pool="thread")
+
+        self.assertEqual(stats["robots"], 2)
+        self.assertEqual(stats["cells_cleaned"], 6 * 4 - 1)
+        self.assertEqual(stats["obstacles"], 0)
+        self.assertEqual(stats["stranded"], 0)
+        self.assertGreater(stats["cells_per_second"], 0)
+        visited = [set(robot.room_map.visited_cells()) for robot in coordinator.robots]
+        self.assertFalse(visited[0] & visited[1])
+
+    def test_run_with_processes_updates_robots(self):
+        coordinator = Coordinator(2, 4, 2, drain_model=BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+        stats = coordinator.run(workers=2, pool="process")
+
+        self.assertEqual(stats["cells_cleaned"], 8)
+        self.assertEqual(sum(robot.room_map.visited_count for robot in coordinator.robots), 8)
+        self.assertGreater(coordinator.robots[0].clock.now, 0)
+
+    def test_streams_are_executed_at_their_scheduled_ticks(self):
+        coordinator = Coordinator(2, 3, 3, drain_model=BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+        schedule = coordinator.schedule([((0, 1, "E"), "ff"), ((1, 0, "N"), "ff")])
+
+        # Cells of both robots once they have both completed a tick
+        fleet_timeline = []
+        barrier = Barrier(2, action=lambda: fleet_timeline.append(
+            [(robot.pos_x, robot.pos_y) for robot in coordinator.robots]))
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            results = coordinator._execute(executor, schedule, "thread", barrier)
+
+        self.assertEqual([result["timeline"] for result in results], [schedule.timeline(0), schedule.timeline(1)])
+        self.assertEqual(fleet_timeline, [list(cells) for cells in zip(schedule.timeline(0), schedule.timeline(1))][1:])
+
+    def test_cells_reachable_only_through_another_strip_are_reported(self):
+        # (2, 2) is in the second strip, but only its left neighbour (1, 2) in the first strip is free
+        coordinator = Coordinator(2, 4, 3, obstacles=[(2, 1), (3, 2)],
+                                  drain_model=BatteryDrainModel(per_move=0, per_rotation=0, per_uv_second=0))
+        stats = coordinator.run(pool="thread")
+
+        self.assertEqual(coordinator.unreached_cells, [(2, 2)])
+        self.assertEqual(stats["unreached_cells"], 1)
+        self.assertEqual(stats["cells_cleaned"], 4 * 3 - 2 - 1)
+
+    def test_run_needs_a_worker_per_robot(self):
+        self.assertRaises(CleaningRobotError, Coordinator(2, 4, 2).run, workers=1, pool="thread")
+
+    def test_run_rejects_unknown_pool(self):
+        self.assertRaises(CleaningRobotError, Coordinator(1, 2, 2).run, pool="fiber")
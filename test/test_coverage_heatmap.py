@@ -0,0 +1,125 @@
+import threading
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.coverage_heatmap import CoverageHeatmap, merge_heatmaps
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+from src.uv_scheduler import UVScheduler
+
+
+class TestCoverageHeatmap(TestCase):
+
+    def test_record_move_counts_visits_and_timestamps(self):
+        heatmap = CoverageHeatmap(clock=lambda: 12.5)
+        heatmap.record_move((3, 4))
+        heatmap.record_move((3, 4), cleaned=False, uv=False)
+        heatmap.record_move((5, 4), timestamp=3.0)
+
+        self.assertEqual(heatmap.visits((3, 4)), 2)
+        self.assertEqual(heatmap.cleaned((3, 4)), 1)
+        self.assertEqual(heatmap.uv_exposures((3, 4)), 1)
+        self.assertEqual(heatmap.last_cleaned((3, 4)), 12.5)
+        self.assertEqual(heatmap.last_cleaned((5, 4)), 3.0)
+        self.assertIsNone(heatmap.last_cleaned((0, 0)))
+        self.assertEqual(heatmap.visits((1000, -1000)), 0)
+        self.assertEqual((heatmap.moves, heatmap.covered_cells), (3, 2))
+
+    def test_tiles_are_allocated_only_where_the_robot_went(self):
+        heatmap = CoverageHeatmap()
+        self.assertIsNone(heatmap.bounds())
+
+        heatmap.record_move((0, 0))
+        heatmap.record_move((63, 63))
+        heatmap.record_move((10000, -1))
+
+        self.assertEqual(heatmap.tile_count, 2)
+        self.assertEqual(heatmap.bounds(), (0, -64, 10047, 63))
+
+    def test_robot_records_forward_moves(self):
+        robot = SimulatedRobot(ObstacleMap([(0, 3)], 5, 5), BatteryDrainModel(per_uv_second=0))
+        robot.coverage = CoverageHeatmap(clock=lambda: 1.0)
+        robot.initialize_robot()
+
+        list(robot.execute_commands("ffffrf"))
+
+        self.assertEqual(robot.coverage.moves, 2)
+        self.assertEqual(robot.coverage.visits((0, 1)), 1)
+        self.assertEqual(robot.coverage.cleaned((0, 2)), 1)
+        self.assertEqual(robot.coverage.visits((0, 3)), 0)
+
+    def test_robot_records_uv_exposures(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(per_uv_second=0))
+        robot.coverage = CoverageHeatmap()
+        robot.initialize_robot()
+
+        list(robot.execute_commands("frrfrrf"))
+
+        self.assertEqual(robot.coverage.visits((0, 1)), 2)
+        self.assertEqual(robot.coverage.uv_exposures((0, 1)), 2)
+
+    def test_scheduled_exposures_are_recorded_once_done(self):
+        exposing = threading.Event()
+        release = threading.Event()
+
+        def sleep(_):
+            exposing.set()
+            release.wait(5)
+
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(per_uv_second=0))
+        robot.coverage = CoverageHeatmap()
+        robot.uv_scheduler = scheduler = UVScheduler(exposure_time=1, sleep=sleep)
+        self.addCleanup(scheduler.shutdown)
+        self.addCleanup(release.set)
+        robot.initialize_robot()
+
+        list(robot.execute_commands("frrfrrf"))
+        exposing.wait(5)
+        self.assertEqual(robot.coverage.uv_exposures((0, 1)), 0)
+
+        release.set()
+        scheduler.wait(5)
+        # The second visit is deduped by the scheduler: the cell is exposed only once
+        self.assertEqual(robot.coverage.visits((0, 1)), 2)
+        self.assertEqual(robot.coverage.uv_exposures((0, 1)), 1)
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_to_numpy_is_indexed_by_x_and_y(self):
+        heatmap = CoverageHeatmap()
+        heatmap.record_move((1, 2))
+        heatmap.record_move((-1, 70), timestamp=4.0)
+
+        origin, grid = heatmap.to_numpy()
+        _, last_cleaned = heatmap.to_numpy("last_cleaned")
+
+        self.assertEqual(origin, (-64, 0))
+        self.assertEqual(grid.shape, (128, 128))
+        self.assertEqual(grid[1 + 64, 2], 1)
+        self.assertEqual(grid[-1 + 64, 70], 1)
+        self.assertEqual(int(grid.sum()), 2)
+        self.assertEqual(last_cleaned[-1 + 64, 70], 4.0)
+        self.assertRaises(ValueError, heatmap.to_numpy, "dirt")
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_merge_sums_counts_and_keeps_latest_cleaning(self):
+        first, second = CoverageHeatmap(), CoverageHeatmap()
+        first.record_move((0, 0), timestamp=5.0)
+        first.record_move((1, 0), timestamp=1.0)
+        second.record_move((1, 0), timestamp=2.0)
+        second.record_move((1, 0), uv=False, timestamp=3.0)
+        second.record_move((200, 0), timestamp=4.0)
+
+        merged = merge_heatmaps([first, second])
+
+        self.assertEqual(merged.visits((1, 0)), 3)
+        self.assertEqual(merged.uv_exposures((1, 0)), 2)
+        self.assertEqual(merged.last_cleaned((1, 0)), 3.0)
+        self.assertEqual(merged.last_cleaned((0, 0)), 5.0)
+        self.assertEqual(merged.visits((200, 0)), 1)
+        self.assertEqual((merged.moves, merged.covered_cells), (5, 3))
+        # The merged tiles are copies, the sources are left untouched
+        merged.record_move((200, 0))
+        self.assertEqual(second.visits((200, 0)), 1)
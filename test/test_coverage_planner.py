@@ -0,0 +1,87 @@
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.cleaning_robot import CleaningRobotError
+from src.coverage_planner import CoveragePlanner
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class TestCoveragePlanner(TestCase):
+
+    def execute(self, route: str, obstacles, width: int, height: int, start=(0, 0, "N")) -> SimulatedRobot:
+        robot = SimulatedRobot(ObstacleMap(obstacles, width, height), BatteryDrainModel(0, 0, 0))
+        robot.pos_x, robot.pos_y, robot.heading = start
+        robot.room_map.mark_visited((robot.pos_x, robot.pos_y))
+        for command in route:
+            status = robot.execute_command(command)
+            self.assertEqual(status, robot.robot_status(), "the planned route hits an obstacle")
+        return robot
+
+    def test_plan_empty_room_turns_twice_per_lane(self):
+        route = CoveragePlanner(4, 3).plan()
+
+        self.assertEqual(route, "rffflflfffrfrfff")
+        robot = self.execute(route, (), 4, 3)
+        self.assertEqual(robot.room_map.visited_count, 12)
+
+    def test_plan_sweeps_along_longer_side(self):
+        route = CoveragePlanner(2, 10).plan()
+
+        self.assertEqual(route.count("l") + route.count("r"), 2)
+        self.assertEqual(self.execute(route, (), 2, 10).room_map.visited_count, 20)
+
+    def test_plan_covers_every_reachable_cell_around_obstacles(self):
+        rng = random.Random(3)
+        width, height = 12, 9
+        obstacles = {(rng.randrange(width), rng.randrange(height)) for _ in range(20)} - {(0, 0)}
+        planner = CoveragePlanner(width, height, obstacles)
+
+        robot = self.execute(planner.plan(), obstacles, width, height)
+
+        reachable = planner._reachable(0, 0)
+        self.assertEqual(robot.room_map.visited_count, reachable.count(1))
+
+    def test_plan_from_blocked_start_raises(self):
+        self.assertRaises(CleaningRobotError, CoveragePlanner(3, 3, [(0, 0)]).plan)
+
+    def test_replan_after_new_obstacle(self):
+        width, height = 5, 4
+        planner = CoveragePlanner(width, height)
+        robot = SimulatedRobot(ObstacleMap([(3, 2)], width, height), BatteryDrainModel(0, 0, 0))
+        robot.initialize_robot()
+        for command in planner.plan():
+            if robot.execute_command(command) != robot.robot_status():
+                break
+
+        for command in planner.replan(robot):
+            self.assertEqual(robot.execute_command(command), robot.robot_status())
+
+        self.assertTrue(planner.is_blocked((3, 2)))
+        self.assertEqual(robot.room_map.visited_count, width * height - 1)
+
+    def test_replan_searches_again_only_the_blocked_paths(self):
+        rng = random.Random(3)
+        width, height = 12, 9
+        obstacles = {(rng.randrange(width), rng.randrange(height)) for _ in range(20)} - {(0, 0)}
+        planner = CoveragePlanner(width, height, obstacles)
+        robot = SimulatedRobot(ObstacleMap(obstacles | {(5, 1)}, width, height), BatteryDrainModel(0, 0, 0))
+        robot.initialize_robot()
+        for command in planner.plan():
+            if robot.execute_command(command) != robot.robot_status():
+                break
+        from_scratch = CoveragePlanner(width, height, obstacles | {(5, 1)})
+
+        with patch.object(planner, "_shortest_path", wraps=planner._shortest_path) as replan_searches, \
+                patch.object(from_scratch, "_shortest_path", wraps=from_scratch._shortest_path) as plan_searches:
+            route = planner.replan(robot)
+            from_scratch.plan((robot.pos_x, robot.pos_y, robot.heading), robot.room_map.visited_cells())
+
+        self.assertLess(replan_searches.call_count, plan_searches.call_count)
+        for command in route:
+            self.assertEqual(robot.execute_command(command), robot.robot_status())
+        self.assertEqual(robot.room_map.visited_count, from_scratch._reachable(0, 0).count(1))
+
+    def test_replan_uninitialized_robot_raises(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        self.assertRaises(CleaningRobotError, CoveragePlanner(3, 3).replan, robot)
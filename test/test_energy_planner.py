@@ -0,0 +1,147 @@
+import random
+from unittest import TestCase
+from unittest.mock import patch
+
+from src.cleaning_robot import CleaningRobotError
+from src.energy_planner import EnergyAwareScheduler, EnergyModel
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class TestEnergyModel(TestCase):
+
+    def test_forward_cost_includes_uv_exposure(self):
+        model = EnergyModel(forward=0.5, left=0.2, right=0.3, uv_exposure=0.25)
+        self.assertEqual(model.cost("f"), 0.75)
+        self.assertEqual(model.cost("l"), 0.2)
+        self.assertEqual(model.cost("r"), 0.3)
+
+    def test_calibration_converges_to_observed_costs(self):
+        model = EnergyModel(forward=0.1, left=0.1, right=0.1, uv_exposure=0.1)
+        for window in range(50):
+            moves, lefts, rights = 5 + window % 3, window % 4, 2
+            model.observe({"f": moves, "uv": moves, "l": lefts, "r": rights}, moves * 1.0 + lefts * 0.5 + rights * 0.25)
+
+        self.assertEqual(model.observations, 50)
+        self.assertAlmostEqual(model.cost("f"), 1.0, places=1)
+        self.assertAlmostEqual(model.cost("l"), 0.5, places=1)
+        self.assertAlmostEqual(model.cost("r"), 0.25, places=1)
+
+    def test_empty_observation_is_ignored(self):
+        model = EnergyModel()
+        model.observe({}, 3)
+        self.assertEqual(model.observations, 0)
+
+
+class TestEnergyAwareScheduler(TestCase):
+
+    def make_robot(self, charge: float, obstacles=()) -> SimulatedRobot:
+        robot = SimulatedRobot(ObstacleMap(obstacles, 5, 50), BatteryDrainModel(per_move=1, per_rotation=0.5,
+                                                                                per_uv_second=0), initial_charge=charge)
+        robot.initialize_robot()
+        return robot
+
+    def test_return_cost_from_known_state(self):
+        robot = self.make_robot(100)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0))
+
+        self.assertEqual(scheduler.return_cost((0, 0, "E")), 0)
+        self.assertEqual(scheduler.return_cost((0, 3, "S")), 3)
+        self.assertEqual(scheduler.return_cost((0, 3, "N")), 4)
+        self.assertEqual(scheduler.return_cost((2, 3, "N")), 6)
+        self.assertEqual(scheduler.return_cost((9, 0, "N")), float("inf"))
+
+    def test_known_obstacles_lengthen_return(self):
+        robot = self.make_robot(100)
+        robot.room_map.mark_blocked((0, 1))
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0))
+
+        self.assertEqual(scheduler.return_cost((0, 2, "S")), 5.5)
+
+    def test_trims_route_and_returns_to_dock(self):
+        robot = self.make_robot(40)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0),
+                                         reserve=1, window=5)
+
+        statuses = list(scheduler.execute("f" * 40))
+
+        self.assertTrue(all(status[0] != "!" for status in statuses))
+        self.assertEqual(robot.robot_status()[:6], "(0,0,S")
+        self.assertEqual(scheduler.trimmed, 26)
+        self.assertGreater(robot.ibs.charge, 10)
+
+    def test_whole_route_when_charge_is_enough(self):
+        robot = self.make_robot(100)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50)
+
+        statuses = list(scheduler.execute("ffrff"))
+
+        self.assertEqual(statuses[-1], "(2,2,E)")
+        self.assertEqual(scheduler.trimmed, 0)
+
+    def test_return_replans_around_unknown_obstacle(self):
+        robot = self.make_robot(100, obstacles=[(0, 1)])
+        robot.pos_x, robot.pos_y, robot.heading = 0, 3, "S"
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0))
+
+        list(scheduler.return_to_dock())
+
+        self.assertEqual((robot.pos_x, robot.pos_y), (0, 0))
+        self.assertTrue(robot.room_map.is_blocked((0, 1)))
+
+    def test_new_obstacles_repair_the_return_costs(self):
+        robot = self.make_robot(100)
+        model = EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, model)
+        scheduler.return_cost()
+        rng = random.Random(5)
+        for _ in range(40):
+            robot.room_map.mark_blocked((rng.randrange(5), rng.randrange(1, 50)))
+
+        with patch.object(scheduler, "_search", wraps=scheduler._search) as search:
+            repaired = [scheduler.return_cost((x, y, heading)) for x in range(5) for y in range(50) for heading in "NESW"]
+        fresh = EnergyAwareScheduler(robot, (0, 0), 5, 50, model)
+        searched = [fresh.return_cost((x, y, heading)) for x in range(5) for y in range(50) for heading in "NESW"]
+
+        search.assert_not_called()
+        self.assertEqual(repaired, searched)
+
+    def test_calibration_rarely_searches_again(self):
+        robot = self.make_robot(100)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=1, right=1, uv_exposure=0),
+                                         window=2)
+
+        with patch.object(scheduler, "_search", wraps=scheduler._search) as search, \
+                patch.object(scheduler, "affordable_prefix", wraps=scheduler.affordable_prefix) as prefix:
+            list(scheduler.execute("ffffrflfrflf" * 6))
+
+        self.assertGreater(scheduler.model.observations, 30)
+        self.assertLessEqual(search.call_count, 1 + scheduler.model.observations.bit_length())
+        # Only the next window is checked before each reading
+        self.assertTrue(all(len(call.args[0]) <= 2 for call in prefix.call_args_list))
+
+    def test_path_to_dock_follows_the_cheapest_path(self):
+        robot = self.make_robot(100)
+        robot.pos_x, robot.pos_y, robot.heading = 2, 3, "N"
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, EnergyModel(forward=1, left=0.5, right=0.5, uv_exposure=0))
+
+        self.assertEqual(scheduler.path_to_dock(), "lfflfff")
+        self.assertEqual(scheduler.return_cost(), 6)
+
+    def test_low_charge_inside_a_window_counts_the_commands_run(self):
+        robot = self.make_robot(100)
+        scheduler = EnergyAwareScheduler(robot, (0, 0), 5, 50, window=5)
+
+        def stop_after_two_moves(window, battery_check_interval):
+            robot.last_route_steps = 0
+            for _ in window[:2]:
+                robot.last_route_steps += 1
+                yield robot.robot_status()
+            yield f"!{robot.robot_status()}"
+
+        with patch.object(robot, "execute_commands", side_effect=stop_after_two_moves):
+            list(scheduler.execute("f" * 10))
+
+        self.assertEqual(scheduler.trimmed, 8)
+
+    def test_dock_outside_room_raises(self):
+        self.assertRaises(CleaningRobotError, EnergyAwareScheduler, self.make_robot(100), (5, 0), 5, 50)
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from mock import GPIO
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.fleet_simulator import BatteryDrainModel, FleetSimulator, ObstacleMap, SimulatedRobot, VirtualClock
+
+
+class TestFleetSimulator(TestCase):
+
+    def test_virtual_clock_sleep_advances_time(self):
+        clock = VirtualClock()
+        clock.sleep(30)
+        clock.sleep(1.5)
+        self.assertEqual(clock.time(), 31.5)
+
+    def test_virtual_clock_background_timeline_runs_alongside(self):
+        clock = VirtualClock()
+        clock.sleep_from(0, 30)
+        clock.sleep(1)
+        clock.sleep_from(1, 30)
+        clock.sleep_from(70, 5)
+
+        self.assertEqual((clock.now, clock.background_now), (1, 75))
+        self.assertEqual(clock.time(), 75)
+        clock.sleep(80)
+        self.assertEqual(clock.time(), 81)
+
+    def test_obstacle_map_blocks_cells_outside_room(self):
+        obstacle_map = ObstacleMap([(1, 1)], width=3, height=3)
+        self.assertTrue(obstacle_map.is_blocked((1, 1)))
+        self.assertTrue(obstacle_map.is_blocked((-1, 0)))
+        self.assertTrue(obstacle_map.is_blocked((0, 3)))
+        self.assertFalse(obstacle_map.is_blocked((2, 2)))
+
+    def test_simulated_robot_uses_virtual_time_and_own_pins(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(per_move=1, per_rotation=0, per_uv_second=0))
+        robot.initialize_robot()
+
+        status = robot.execute_command("f")
+
+        self.assertEqual(status, "(0,1,N)")
+        self.assertEqual(robot.clock.now, 31)
+        self.assertEqual(robot.ibs.charge, 99)
+        self.assertEqual(robot.gpio.levels[CleaningRobot.CLEANING_SYSTEM_PIN], True)
+        self.assertIs(CleaningRobot().gpio, GPIO)
+
+    def test_simulated_robot_supports_obstacle_interrupts(self):
+        robot = SimulatedRobot(ObstacleMap([(0, 2), (1, 0)]), BatteryDrainModel())
+        robot.initialize_robot()
+        robot.enable_obstacle_interrupts()
+
+        statuses = [robot.execute_command(command) for command in "ffrflf"]
+
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "(1,1,E)", "(1,1,N)", "(1,2,N)"])
+        robot.disable_obstacle_interrupts()
+        self.assertEqual(robot.gpio.event_edges, {})
+
+    def test_simulated_robot_reports_obstacle_from_map(self):
+        robot = SimulatedRobot(ObstacleMap([(0, 1)]), BatteryDrainModel())
+        robot.initialize_robot()
+
+        self.assertEqual(robot.execute_command("f"), "(0,0,N)(0,1)")
+
+    def test_run_aggregates_fleet_statistics(self):
+        simulator = FleetSimulator(3, ObstacleMap([(2, 2)]), BatteryDrainModel(per_move=1, per_rotation=0.5, per_uv_second=0))
+
+        stats = simulator.run("ffrff")
+
+        self.assertEqual(stats["robots"], 3)
+        self.assertEqual(stats["commands"], 15)
+        self.assertEqual(stats["moves"], 9)
+        self.assertEqual(stats["rotations"], 3)
+        self.assertEqual(stats["obstacles"], 3)
+        self.assertEqual(stats["mean_charge"], 96.5)
+        self.assertEqual([robot.robot_status() for robot in simulator.robots], ["(1,2,E)"] * 3)
+
+    def test_run_stops_stranded_robots(self):
+        simulator = FleetSimulator(2, drain_model=BatteryDrainModel(per_move=5, per_rotation=0, per_uv_second=0), initial_charge=20)
+
+        stats = simulator.run(["ffff", "rr"])
+
+        self.assertEqual(stats["stranded"], 1)
+        self.assertEqual(stats["commands"], 4)
+        self.assertEqual(simulator.robots[0].robot_status(), "(0,2,N)")
+
+    def test_run_with_wrong_number_of_routes_raises(self):
+        simulator = FleetSimulator(2)
+        self.assertRaises(CleaningRobotError, simulator.run, ["f"])
@@ -0,0 +1,139 @@
+from unittest import IsolatedAsyncioTestCase, TestCase
+
+from src.async_cleaning_robot import AsyncCleaningRobot
+from src.cleaning_robot import CleaningRobot
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+from src.instrumentation import Instrumentation, LatencyHistogram
+
+
+class TestLatencyHistogram(TestCase):
+
+    def test_small_values_are_exact(self):
+        histogram = LatencyHistogram(precision_bits=5)
+        for value in range(32):
+            histogram.record(value)
+
+        self.assertEqual(histogram.count, 32)
+        self.assertEqual(histogram.percentile(0.5), 15)
+        self.assertEqual(histogram.percentile(1.0), 31)
+        self.assertEqual(histogram.min, 0)
+
+    def test_large_values_keep_relative_precision(self):
+        histogram = LatencyHistogram(precision_bits=5)
+        for value in (1000, 123456, 98765432):
+            histogram.record(value)
+            bound = histogram.percentile(1.0)
+            self.assertGreaterEqual(bound, value)
+            self.assertLessEqual(bound, value * (1 + 2 ** -4))
+            histogram = LatencyHistogram(precision_bits=5)
+
+    def test_buckets_cover_each_value_once(self):
+        histogram = LatencyHistogram(precision_bits=3)
+        values = list(range(0, 5000, 7))
+        for value in values:
+            histogram.record(value)
+
+        bounds = [bound for bound, _ in histogram.buckets()]
+        self.assertEqual(bounds, sorted(set(bounds)))
+        self.assertEqual(sum(count for _, count in histogram.buckets()), len(values))
+        for value in values:
+            upper = next(bound for bound in bounds if bound >= value)
+            self.assertLessEqual(upper, value * 1.25 + 1)
+
+    def test_merge(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        first.record(10)
+        second.record(2000)
+        second.record(5)
+
+        first.merge(second)
+
+        self.assertEqual((first.count, first.total, first.min, first.max), (3, 2015, 5, 2000))
+        self.assertRaises(ValueError, first.merge, LatencyHistogram(precision_bits=3))
+
+
+class TestInstrumentation(TestCase):
+
+    def setUp(self):
+        self.robot = SimulatedRobot(ObstacleMap([(0, 2)]), BatteryDrainModel())
+        self.robot.initialize_robot()
+
+    def test_disabled_by_default(self):
+        self.assertIsNone(self.robot.instrumentation)
+        self.assertIs(type(self.robot), SimulatedRobot)
+
+    def test_records_stages_and_hardware_calls(self):
+        instrumentation = self.robot.enable_instrumentation()
+
+        self.robot.execute_command("f")
+        self.robot.execute_command("f")
+        self.robot.execute_command("r")
+
+        stages = instrumentation.snapshot()["stages"]
+        self.assertEqual(stages["execute_command"]["count"], 3)
+        self.assertEqual(stages["manage_cleaning_system"]["count"], 3)
+        self.assertEqual(stages["ibs.get_charge_left"]["count"], 3)
+        self.assertEqual(stages["obstacle_found"]["count"], 2)
+        self.assertEqual(stages["activate_wheel_motor"]["count"], 1)
+        self.assertEqual(stages["activate_uv_light"]["count"], 1)
+        self.assertEqual(stages["activate_rotation_motor"]["count"], 1)
+        self.assertLessEqual(stages["execute_command"]["p50"], stages["execute_command"]["max"])
+        self.assertEqual(instrumentation.i2c_transactions, 3)
+        # Cleaning system and LED on the first command, UV light on and off, motors on and off
+        self.assertEqual(instrumentation.gpio_calls, {"output": 8, "input": 2})
+
+    def test_disable_restores_robot(self):
+        gpio, ibs = self.robot.gpio, self.robot.ibs
+        instrumentation = self.robot.enable_instrumentation()
+        self.robot.disable_instrumentation()
+
+        self.robot.execute_command("r")
+
+        self.assertIs(type(self.robot), SimulatedRobot)
+        self.assertIs(self.robot.gpio, gpio)
+        self.assertIs(self.robot.wheel_motor_pins.gpio, gpio)
+        self.assertIs(self.robot.ibs, ibs)
+        self.assertEqual(instrumentation.stages, {})
+
+    def test_enable_twice_does_not_nest_proxies(self):
+        gpio = self.robot.gpio
+        self.robot.enable_instrumentation()
+        instrumentation = self.robot.enable_instrumentation(Instrumentation(precision_bits=3))
+
+        self.assertIs(self.robot.gpio.wrapped, gpio)
+        self.assertIs(self.robot.instrumentation, instrumentation)
+        self.assertIs(type(self.robot).__bases__[0], SimulatedRobot)
+
+    def test_prometheus_export(self):
+        instrumentation = self.robot.enable_instrumentation()
+        self.robot.execute_command("l")
+
+        text = instrumentation.prometheus()
+
+        self.assertIn("# TYPE cleaning_robot_stage_seconds histogram", text)
+        self.assertIn('cleaning_robot_stage_seconds_bucket{stage="activate_rotation_motor",le="+Inf"} 1', text)
+        self.assertIn('cleaning_robot_stage_seconds_count{stage="execute_command"} 1', text)
+        self.assertIn("cleaning_robot_i2c_transactions_total 1", text)
+        self.assertIn('cleaning_robot_gpio_calls_total{call="output"} 4', text)
+        self.assertTrue(text.endswith("\n"))
+
+    def test_instrumented_robot_is_still_a_robot(self):
+        robot = CleaningRobot()
+        robot.enable_instrumentation()
+        self.assertIsInstance(robot, CleaningRobot)
+        self.assertEqual(type(robot).__name__, "InstrumentedCleaningRobot")
+
+
+class TestAsyncInstrumentation(IsolatedAsyncioTestCase):
+
+    async def test_records_async_stages(self):
+        robot = AsyncCleaningRobot()
+        robot.initialize_robot()
+        instrumentation = robot.enable_instrumentation()
+
+        await robot.execute_command_async("l")
+
+        stages = instrumentation.snapshot()["stages"]
+        self.assertEqual(stages["execute_command"]["count"], 1)
+        self.assertEqual(stages["manage_cleaning_system"]["count"], 1)
+        self.assertEqual(stages["activate_rotation_motor"]["count"], 1)
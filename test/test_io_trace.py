@@ -0,0 +1,109 @@
+import os
+import tempfile
+import time
+from unittest import TestCase
+
+from mock import GPIO, board, ibs
+from src import backends
+from src.backends import Backend
+from src.cleaning_robot import CleaningRobot
+from src.io_trace import (CHARGE, INPUT, OUTPUT, ROBOT_STREAM, SLEEP, UV_STREAM, TraceDivergence, load_trace,
+                          recording_backend, replay_backend, use_backend)
+from src.uv_scheduler import UVScheduler
+
+
+class TestIOTrace(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "run.trace")
+        GPIO.reset()
+        ibs.reset()
+        self.addCleanup(GPIO.reset)
+        self.addCleanup(ibs.reset)
+        self.addCleanup(backends.reset_backend)
+        # Mock hardware whose UV exposure does not actually wait
+        self.slept = []
+        self.mock_backend = Backend("mock", GPIO, board, ibs, deployment=False, sleep=self.slept.append)
+
+    def record_run(self, route: str, scheduler: UVScheduler | None = None, charges=(80, 50, 12, 9)) -> list[str]:
+        backend, recorder = recording_backend(self.path, self.mock_backend)
+        use_backend(backend)
+        with recorder:
+            robot = CleaningRobot()
+            robot.uv_scheduler = scheduler
+            robot.initialize_robot()
+            GPIO.set_input_sequence(CleaningRobot.INFRARED_PIN, [0, 1, 0])
+            ibs.set_charge_curve(list(charges))
+            statuses = [robot.execute_command(command) for command in route]
+            if scheduler is not None:
+                scheduler.shutdown()
+            return statuses
+
+    def replay_run(self, route: str, strict: bool = True, scheduler: UVScheduler | None = None):
+        backend, player = replay_backend(self.path, strict)
+        use_backend(backend)
+        robot = CleaningRobot()
+        robot.uv_scheduler = scheduler
+        robot.initialize_robot()
+        statuses = [robot.execute_command(command) for command in route]
+        if scheduler is not None:
+            scheduler.shutdown()
+        return statuses, player
+
+    def test_recording_captures_inputs_outputs_charges_and_sleeps(self):
+        self.record_run("ff")
+
+        deployment, events = load_trace(self.path)
+
+        self.assertFalse(deployment)
+        kinds = [kind for _, kind, _, _ in events]
+        self.assertEqual(kinds.count(CHARGE), 2)
+        self.assertEqual(kinds.count(INPUT), 2)
+        self.assertEqual(kinds.count(SLEEP), 1)
+        self.assertIn((ROBOT_STREAM, OUTPUT, CleaningRobot.UV_LIGHT_PIN, 1.0), events)
+        self.assertIn((ROBOT_STREAM, SLEEP, 0, 30.0), events)
+        self.assertEqual(self.slept, [30])
+
+    def test_replay_reproduces_statuses_without_sleeping(self):
+        recorded = self.record_run("fffrf")
+
+        start = time.perf_counter()
+        replayed, player = self.replay_run("fffrf")
+
+        self.assertLess(time.perf_counter() - start, 1)
+        self.assertEqual(replayed, recorded)
+        self.assertEqual(replayed, ["(0,1,N)", "(0,1,N)(0,2)", "(0,1,N)(0,2)", "!(0,1,N)", "!(0,1,N)"])
+        self.assertTrue(player.finished)
+        self.assertEqual(player.divergences, [])
+        self.assertEqual(player.slept, 30)
+
+    def test_replay_detects_divergence(self):
+        self.record_run("ff")
+
+        self.assertRaises(TraceDivergence, self.replay_run, "rf")
+
+    def test_lenient_replay_collects_divergences(self):
+        self.record_run("f")
+
+        _, player = self.replay_run("rf", strict=False)
+
+        self.assertGreater(len(player.divergences), 0)
+        self.assertIn("expected", player.divergences[0])
+
+    def test_scheduler_exposures_are_recorded_and_replayed(self):
+        for _ in range(5):  # The worker thread interleaves differently from run to run
+            recorded = self.record_run("ffrff", UVScheduler(exposure_time=30), charges=[90])
+            _, events = load_trace(self.path)
+
+            replayed, player = self.replay_run("ffrff", scheduler=UVScheduler(exposure_time=30))
+
+            self.assertEqual(replayed, recorded)
+            self.assertEqual(replayed, ["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "(1,1,E)", "(2,1,E)"])
+            self.assertIn((UV_STREAM, OUTPUT, CleaningRobot.UV_LIGHT_PIN, 1.0), events)
+            self.assertEqual([value for stream, kind, _, value in events if kind == SLEEP], [30.0] * 3)
+            self.assertTrue(all(stream == UV_STREAM for stream, kind, _, _ in events if kind == SLEEP))
+            self.assertEqual(player.divergences, [])
+            self.assertTrue(player.finished)
+            self.assertEqual(player.slept, 90)
@@ -0,0 +1,118 @@
+import logging
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+
+
+class TestMockGPIO(TestCase):
+
+    def tearDown(self):
+        GPIO.disable_trace()
+
+    def set_log_level(self, level: int):
+        self.addCleanup(GPIO.logger.setLevel, GPIO.logger.level)
+        GPIO.logger.setLevel(level)
+
+    @patch.object(GPIO.logger, "info")
+    def test_output_skips_logging_when_disabled(self, mock_info: Mock):
+        self.set_log_level(logging.ERROR)
+
+        GPIO.output(12, GPIO.HIGH)
+        GPIO.input(15)
+        GPIO.setup(12, GPIO.OUT)
+
+        mock_info.assert_not_called()
+
+    def test_output_logs_when_enabled(self):
+        self.set_log_level(logging.INFO)
+        with self.assertLogs(GPIO.logger, "INFO") as logs:
+            GPIO.output(12, GPIO.HIGH)
+        self.assertIn("Output channel : 12 with value : 1", logs.output[0])
+
+    def test_trace_records_pin_writes(self):
+        GPIO.enable_trace(8)
+
+        GPIO.output(12, True)
+        GPIO.output(13, GPIO.LOW)
+
+        trace = GPIO.dump_trace()
+        self.assertEqual([(pin, value) for pin, value, _ in trace], [(12, 1), (13, 0)])
+        self.assertLessEqual(trace[0][2], trace[1][2])
+
+    def test_trace_keeps_last_writes_when_full(self):
+        GPIO.enable_trace(3)
+
+        for pin in range(5):
+            GPIO.output(pin, GPIO.HIGH)
+
+        self.assertEqual([pin for pin, _, _ in GPIO.dump_trace()], [2, 3, 4])
+
+    def test_dump_trace_when_disabled_is_empty(self):
+        GPIO.output(12, True)
+        self.assertEqual(GPIO.dump_trace(), [])
+
+    def test_output_sets_pin_level(self):
+        self.addCleanup(GPIO.reset)
+
+        GPIO.output(12, GPIO.HIGH)
+
+        self.assertEqual(GPIO.get_level(12), GPIO.HIGH)
+        self.assertEqual(GPIO.get_level(13), GPIO.LOW)
+
+    def test_input_returns_set_level(self):
+        self.addCleanup(GPIO.reset)
+        GPIO.set_input(15, True)
+
+        self.assertEqual(GPIO.input(15), GPIO.HIGH)
+
+    def test_input_follows_scripted_sequence(self):
+        self.addCleanup(GPIO.reset)
+        GPIO.setup(15, GPIO.IN)
+        GPIO.set_input_sequence(15, [0, 1, 0])
+
+        readings = [GPIO.input(15) for _ in range(5)]
+
+        self.assertEqual(readings, [0, 1, 0, 0, 0])
+
+    def test_any_channel_number_is_accepted(self):
+        self.addCleanup(GPIO.reset)
+        self.assertEqual(GPIO.get_level(1000), GPIO.LOW)
+
+        GPIO.output(1000, GPIO.HIGH)
+        GPIO.set_input(64, GPIO.HIGH)
+
+        self.assertEqual(GPIO.get_level(1000), GPIO.HIGH)
+        self.assertEqual(GPIO.input(64), GPIO.HIGH)
+
+    def test_reset_clears_levels(self):
+        GPIO.output(12, GPIO.HIGH)
+        GPIO.set_input_sequence(15, [1])
+
+        GPIO.reset()
+
+        self.assertEqual(GPIO.get_level(12), GPIO.LOW)
+        self.assertEqual(GPIO.input(15), GPIO.LOW)
+
+    def test_set_input_fires_edge_callbacks(self):
+        self.addCleanup(GPIO.reset)
+        callback = Mock()
+        GPIO.add_event_detect(15, GPIO.RISING, callback=callback)
+
+        GPIO.set_input(15, GPIO.HIGH)
+        GPIO.set_input(15, GPIO.LOW)
+
+        callback.assert_called_once_with(15)
+        self.assertTrue(GPIO.event_detected(15))
+        self.assertFalse(GPIO.event_detected(15))
+
+    def test_remove_event_detect(self):
+        self.addCleanup(GPIO.reset)
+        callback = Mock()
+        GPIO.add_event_detect(15, GPIO.BOTH)
+        GPIO.add_event_callback(15, callback)
+
+        GPIO.remove_event_detect(15)
+        GPIO.set_input(15, GPIO.HIGH)
+
+        callback.assert_not_called()
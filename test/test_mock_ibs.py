@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from mock import ibs
+from mock.board import I2C
+from mock.ibs import IBS
+
+
+class TestMockIBS(TestCase):
+
+    def tearDown(self):
+        ibs.reset()
+
+    def test_default_charge_is_full(self):
+        self.assertEqual(IBS(I2C()).get_charge_left(), 100)
+
+    def test_charge_curve_sequence_repeats_last_reading(self):
+        ibs.set_charge_curve([50, 20])
+        sensor = IBS(I2C())
+
+        self.assertEqual([sensor.get_charge_left() for _ in range(3)], [50, 20, 20])
+
+    def test_charge_curve_function_of_reading_number(self):
+        ibs.set_charge_curve(lambda reading: 100 - 5 * reading)
+        sensor = IBS(I2C())
+
+        self.assertEqual([sensor.get_charge_left() for _ in range(3)], [100, 95, 90])
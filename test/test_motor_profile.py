@@ -0,0 +1,84 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.cleaning_robot import CleaningRobotError, MotorProfile
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+
+class TestMotorProfile(TestCase):
+
+    def make_robot(self, obstacles=()) -> SimulatedRobot:
+        robot = SimulatedRobot(ObstacleMap(obstacles), BatteryDrainModel(0, 0, 0))
+        robot.enable_pwm(MotorProfile(duty_cycle=100, ramp_steps=4, ramp_time=0.2, cell_time=0.5, rotation_time=0.6))
+        robot.uv_scheduler = Mock()
+        robot.initialize_robot()
+        return robot
+
+    def test_ramps(self):
+        profile = MotorProfile(duty_cycle=80, ramp_steps=4)
+        self.assertEqual(profile.ramp_up(), [20, 40, 60, 80])
+        self.assertEqual(profile.ramp_down(), [60, 40, 20, 0])
+
+    def test_invalid_duty_cycle_raises(self):
+        self.assertRaises(CleaningRobotError, MotorProfile, 0)
+        self.assertRaises(CleaningRobotError, MotorProfile, 120)
+
+    def test_cruise_time_scales_with_duty_cycle(self):
+        self.assertEqual(MotorProfile(duty_cycle=50).cruise_time(0.5), 1.0)
+
+    def test_single_move_ramps_up_and_down(self):
+        robot = self.make_robot()
+
+        self.assertEqual(robot.execute_command("f"), "(0,1,N)")
+
+        self.assertAlmostEqual(robot.clock.now, 0.2 + 0.5 + 0.2)
+        self.assertFalse(robot.wheel_pwm.running)
+        self.assertEqual(robot.wheel_pwm.dutycycle, 0)
+        self.assertEqual(robot.gpio.levels[robot.STBY], robot.gpio.LOW)
+
+    def test_corridor_moves_are_fused_in_one_run(self):
+        robot = self.make_robot()
+        robot.wheel_pwm.start = Mock(wraps=robot.wheel_pwm.start)
+
+        statuses = list(robot.execute_commands("ffffffffff"))
+
+        self.assertEqual(statuses[-1], "(0,10,N)")
+        robot.wheel_pwm.start.assert_called_once()
+        self.assertAlmostEqual(robot.clock.now, 0.2 + 10 * 0.5 + 0.2)
+        self.assertLess(robot.clock.now / 10, 1)
+        self.assertFalse(robot.wheel_pwm.running)
+
+    def test_lazy_route_is_read_ahead_only_to_fuse_moves(self):
+        plain_robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        plain_robot.initialize_robot()
+        for robot, read_after_move in ((self.make_robot(), ["r", "f", "f"]), (plain_robot, ["r", "f"])):
+            read = []
+
+            def route():
+                for command in "rff":
+                    read.append(command)
+                    yield command
+
+            statuses = robot.execute_commands(route())
+            self.assertEqual(next(statuses), "(0,0,E)")
+            self.assertEqual(read, ["r"])
+            self.assertEqual(next(statuses), "(1,0,E)")
+            self.assertEqual(read, read_after_move)
+            self.assertEqual(list(statuses), ["(2,0,E)"])
+
+    def test_fused_run_stops_at_obstacle(self):
+        robot = self.make_robot(obstacles=[(0, 3)])
+
+        statuses = list(robot.execute_commands("fffff"))
+
+        self.assertEqual(statuses[-1], "(0,2,N)(0,3)")
+        self.assertFalse(robot.wheel_pwm.running)
+        self.assertEqual(robot.gpio.levels[robot.AIN1], robot.gpio.LOW)
+
+    def test_rotation_uses_pwm(self):
+        robot = self.make_robot()
+
+        self.assertEqual(robot.execute_command("r"), "(0,0,E)")
+
+        self.assertAlmostEqual(robot.clock.now, 0.2 + 0.6 + 0.2)
+        self.assertFalse(robot.rotation_pwm.running)
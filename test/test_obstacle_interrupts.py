@@ -0,0 +1,92 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO, ibs
+from src.cleaning_robot import CleaningRobot, MotorProfile
+
+
+class TestObstacleInterrupts(TestCase):
+
+    def setUp(self):
+        GPIO.reset()
+        ibs.reset()
+        self.system = CleaningRobot()
+        self.system.uv_scheduler = Mock()
+        self.system.initialize_robot()
+        self.system.enable_obstacle_interrupts()
+
+    def tearDown(self):
+        GPIO.reset()
+
+    def test_obstacle_state_is_latched_without_reading(self):
+        GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+
+        with patch.object(GPIO, "input") as mock_input:
+            self.assertTrue(self.system.obstacle_found())
+            mock_input.assert_not_called()
+
+        GPIO.set_input(self.system.INFRARED_PIN, GPIO.LOW)
+        self.assertFalse(self.system.obstacle_found())
+
+    def test_execute_command_reports_latched_obstacle(self):
+        GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+
+        self.assertEqual(self.system.execute_command("f"), "(0,0,N)(0,1)")
+
+    def test_rising_edge_during_move_stops_wheel_motor(self):
+        def obstacle_appears(seconds: float = 1):
+            GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+            self.assertEqual(GPIO.get_level(self.system.PWMA), GPIO.LOW)
+
+        self.system._wait_for_motor = obstacle_appears
+
+        status = self.system.execute_command("f")
+
+        self.assertEqual(status, "(0,0,N)(0,1)")
+        self.assertTrue(self.system.room_map.is_blocked((0, 1)))
+        self.system.uv_scheduler.schedule.assert_not_called()
+
+    def test_rising_edge_during_pwm_run_stops_wheel_motor(self):
+        self.system.enable_pwm(MotorProfile())
+        cruise_time = self.system.motor_profile.cruise_time(self.system.motor_profile.cell_time)
+
+        def obstacle_appears(seconds: float = 1):
+            if seconds == cruise_time:
+                GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+
+        self.system._wait_for_motor = obstacle_appears
+
+        self.assertEqual(self.system.execute_command("f"), "(0,0,N)(0,1)")
+        self.assertEqual(GPIO.get_level(self.system.AIN1), GPIO.LOW)
+
+    def test_edge_callback_waits_for_motor_start(self):
+        GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+        with self.system._motor_lock:
+            callback = threading.Thread(target=self.system._on_infrared_edge, args=(self.system.INFRARED_PIN,))
+            callback.start()
+            callback.join(0.05)
+            self.assertTrue(callback.is_alive())
+        callback.join(1)
+
+        self.assertFalse(callback.is_alive())
+        self.assertTrue(self.system.obstacle_found())
+
+    def test_obstacle_latched_before_motor_start_interrupts_move(self):
+        def edge_before_start():
+            # The edge arrives after the obstacle check, right before the motor is started
+            GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+            return False
+
+        self.system.obstacle_found = edge_before_start
+
+        self.assertEqual(self.system.execute_command("f"), "(0,0,N)(0,1)")
+        self.assertEqual(GPIO.get_level(self.system.PWMA), GPIO.LOW)
+
+    def test_disable_obstacle_interrupts_goes_back_to_polling(self):
+        self.system.disable_obstacle_interrupts()
+        GPIO.set_input(self.system.INFRARED_PIN, GPIO.HIGH)
+
+        with patch.object(GPIO, "input", return_value=False) as mock_input:
+            self.assertFalse(self.system.obstacle_found())
+            mock_input.assert_called_once()
@@ -0,0 +1,78 @@
+from unittest import TestCase
+from unittest.mock import Mock, patch
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.cleaning_robot import CleaningRobot
+from src.room_map import RoomMap
+
+
+class TestRoomMap(TestCase):
+
+    def test_mark_blocked_and_visited(self):
+        room_map = RoomMap()
+
+        room_map.mark_blocked((3, 4))
+        room_map.mark_visited((-1, -70))
+
+        self.assertTrue(room_map.is_blocked((3, 4)))
+        self.assertFalse(room_map.is_visited((3, 4)))
+        self.assertTrue(room_map.is_visited((-1, -70)))
+        self.assertFalse(room_map.is_blocked((100, 100)))
+
+    def test_counts_ignore_duplicate_marks(self):
+        room_map = RoomMap()
+
+        room_map.mark_blocked((1, 1))
+        room_map.mark_blocked((1, 1))
+        room_map.mark_visited((0, 0))
+
+        self.assertEqual(room_map.blocked_count, 1)
+        self.assertEqual(room_map.visited_count, 1)
+
+    def test_forget_obstacle(self):
+        room_map = RoomMap()
+        room_map.mark_blocked((2, 2))
+
+        room_map.forget_obstacle((2, 2))
+        room_map.forget_obstacle((500, 500))
+
+        self.assertFalse(room_map.is_blocked((2, 2)))
+        self.assertEqual(room_map.blocked_count, 0)
+
+    def test_blocked_cells_in_area(self):
+        room_map = RoomMap()
+        for cell in [(0, 0), (5, 5), (200, 3), (-10, 4)]:
+            room_map.mark_blocked(cell)
+
+        self.assertEqual(set(room_map.blocked_cells()), {(0, 0), (5, 5), (200, 3), (-10, 4)})
+        self.assertEqual(set(room_map.blocked_cells((-10, 0, 5, 4))), {(0, 0), (-10, 4)})
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(CleaningRobot, "activate_uv_light")
+    @patch.object(GPIO, "input")
+    def test_execute_command_updates_room_map(self, mock_infrared_sensor: Mock, mock_activate_uv_light: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        mock_infrared_sensor.side_effect = [False, True]
+        system = CleaningRobot()
+        system.initialize_robot()
+
+        system.execute_command("f")
+        system.execute_command("f")
+
+        self.assertTrue(system.room_map.is_visited((0, 0)))
+        self.assertTrue(system.room_map.is_visited((0, 1)))
+        self.assertTrue(system.room_map.is_blocked((0, 2)))
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    def test_execute_command_skips_infrared_for_known_obstacle(self, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        system = CleaningRobot()
+        system.initialize_robot()
+        system.room_map.mark_blocked((0, 1))
+
+        status = system.execute_command("f")
+
+        self.assertEqual(status, "(0,0,N)(0,1)")
+        mock_infrared_sensor.assert_not_called()
@@ -0,0 +1,74 @@
+from unittest import TestCase
+from unittest.mock import Mock
+
+from src.cleaning_robot import CleaningRobotError, MotorProfile
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+from src.route_compiler import RoutePlan, compile_route
+
+
+class TestRouteCompiler(TestCase):
+
+    def test_cancels_and_normalizes_rotations(self):
+        self.assertEqual(str(compile_route("flrf")), "ff")
+        self.assertEqual(str(compile_route("rlf")), "f")
+        self.assertEqual(str(compile_route("llllf")), "f")
+        self.assertEqual(str(compile_route("rrrf")), "lf")
+        self.assertEqual(str(compile_route("flllf")), "frf")
+        self.assertEqual(str(compile_route("llrll")), "r")
+        self.assertEqual(str(compile_route("fllf")), "fllf")
+        self.assertEqual(str(compile_route("frrf")), "frrf")
+
+    def test_fuses_forward_runs(self):
+        plan = compile_route("fffrffl")
+        self.assertEqual(plan.steps, [("f", 3), ("r", 1), ("f", 2), ("l", 1)])
+        self.assertEqual(list(plan), list("fffrffl"))
+        self.assertEqual(len(plan), 7)
+
+    def test_stats(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        robot.enable_pwm(MotorProfile())
+        robot.uv_scheduler = Mock()
+
+        stats = compile_route("ffflrfrrrff").stats(robot)
+
+        self.assertEqual(stats, {
+            "commands": 11,
+            "compiled_commands": 7,
+            "rotations_saved": 4,
+            "forward_runs": 2,
+            "moves_fused": 4,
+            "motor_activations_saved": 8,
+        })
+
+    def test_stats_count_fused_moves_only_if_the_robot_fuses_them(self):
+        plan = compile_route("ffflrfrrrff")
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        robot.enable_pwm(MotorProfile())
+
+        for stats in (plan.stats(), plan.stats(robot)):
+            self.assertEqual(stats["moves_fused"], 0)
+            self.assertEqual(stats["motor_activations_saved"], 4)
+
+    def test_invalid_command_raises_before_execution(self):
+        self.assertRaises(CleaningRobotError, compile_route, "ffrfx")
+        self.assertRaises(CleaningRobotError, compile_route, ["f", "ff"])
+
+    def test_empty_route(self):
+        plan = compile_route("")
+        self.assertEqual(plan.steps, [])
+        self.assertEqual(plan.stats()["motor_activations_saved"], 0)
+        self.assertIsInstance(plan, RoutePlan)
+
+    def test_plan_is_executed_with_fewer_motor_activations(self):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel(0, 0, 0))
+        robot.enable_pwm(MotorProfile(duty_cycle=100, ramp_steps=4, ramp_time=0.2, cell_time=0.5, rotation_time=0.6))
+        robot.uv_scheduler = Mock()
+        robot.initialize_robot()
+        robot.wheel_pwm.start = Mock(wraps=robot.wheel_pwm.start)
+        robot.rotation_pwm.start = Mock(wraps=robot.rotation_pwm.start)
+
+        statuses = list(robot.execute_commands(compile_route("fflrffrrrf")))
+
+        self.assertEqual(statuses[-1], "(-1,4,W)")
+        self.assertEqual(robot.wheel_pwm.start.call_count, 2)
+        self.assertEqual(robot.rotation_pwm.start.call_count, 1)
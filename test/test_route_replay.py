@@ -0,0 +1,50 @@
+import random
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from src.cleaning_robot import CleaningRobotError
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+
+if np is not None:
+    from src.route_replay import encode_routes, replay_routes
+
+
+@skipIf(np is None, "numpy is not installed")
+class TestRouteReplay(TestCase):
+
+    def test_encode_routes_pads_shorter_routes(self):
+        commands = encode_routes(["flr", "f"])
+        self.assertEqual(commands.tolist(), [[1, 2, 3], [1, 0, 0]])
+
+    def test_encode_routes_invalid_command_raises(self):
+        self.assertRaises(CleaningRobotError, encode_routes, ["fx"])
+
+    def test_replay_routes_reports_obstacle(self):
+        grid = np.zeros((3, 3), dtype=bool)
+        grid[0, 2] = True
+
+        replay = replay_routes(encode_routes(["ffrf"]), grid)
+
+        self.assertEqual(replay.statuses(0), ["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "(1,1,E)"])
+        self.assertEqual(replay.obstacle_positions().tolist(), [[0, 0, 2]])
+
+    def test_replay_routes_matches_cleaning_robot(self):
+        rng = random.Random(7)
+        width, height = 6, 5
+        obstacles = {(rng.randrange(width), rng.randrange(height)) for _ in range(6)} - {(0, 0)}
+        grid = np.zeros((width, height), dtype=bool)
+        for x, y in obstacles:
+            grid[x, y] = True
+        routes = ["".join(rng.choice("fffflr") for _ in range(rng.randrange(1, 40))) for _ in range(30)]
+
+        replay = replay_routes(encode_routes(routes), grid)
+
+        for index, route in enumerate(routes):
+            robot = SimulatedRobot(ObstacleMap(obstacles, width, height), BatteryDrainModel(0, 0, 0))
+            robot.initialize_robot()
+            expected = [robot.execute_command(command) for command in route]
+            self.assertEqual(replay.statuses(index), expected)
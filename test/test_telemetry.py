@@ -0,0 +1,72 @@
+import os
+import tempfile
+from unittest import TestCase, skipIf
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from mock import GPIO, ibs
+from src.cleaning_robot import CleaningRobot
+from src.telemetry import RECORD, TelemetryWriter, iter_records, load_telemetry, status_view
+from src.uv_scheduler import NoOpUVScheduler
+
+
+class TestTelemetry(TestCase):
+
+    def setUp(self):
+        GPIO.reset()
+        ibs.reset()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, "telemetry.bin")
+        self.system = CleaningRobot()
+        self.system.uv_scheduler = NoOpUVScheduler()
+        self.system.initialize_robot()
+
+    def tearDown(self):
+        GPIO.reset()
+        ibs.reset()
+
+    def run_route(self) -> list[str]:
+        GPIO.set_input_sequence(self.system.INFRARED_PIN, [0, 1])
+        ibs.set_charge_curve([50, 40, 30, 5])
+        with TelemetryWriter(self.path, clock=lambda: 12.5) as writer:
+            self.system.telemetry = writer
+            return [self.system.execute_command(command) for command in "ffrf"]
+
+    def test_records_have_fixed_size(self):
+        self.run_route()
+        self.assertEqual(os.path.getsize(self.path), 4 * RECORD.size)
+
+    def test_status_view_matches_execute_command(self):
+        statuses = self.run_route()
+
+        self.assertEqual([status_view(record) for record in iter_records(self.path)], statuses)
+        self.assertEqual(statuses, ["(0,1,N)", "(0,1,N)(0,2)", "(0,1,E)", "!(0,1,E)"])
+
+    def test_record_fields(self):
+        self.run_route()
+
+        records = list(iter_records(self.path))
+
+        self.assertEqual(records[0], (12.5, 0, 1, 0, 2, 50, 0, 0))
+        self.assertEqual(records[1][-2:], (0, 2))
+        self.assertEqual(records[3][4:6], (4, 5))
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_load_telemetry_as_numpy_arrays(self):
+        self.run_route()
+
+        records = load_telemetry(self.path)
+
+        self.assertEqual(records["x"].tolist(), [0, 0, 0, 0])
+        self.assertEqual(records["y"].tolist(), [1, 1, 1, 1])
+        self.assertEqual(records["charge"].tolist(), [50, 40, 30, 5])
+        self.assertEqual(status_view(records[1]), "(0,1,N)(0,2)")
+
+    @skipIf(np is None, "numpy is not installed")
+    def test_load_empty_telemetry(self):
+        open(self.path, "wb").close()
+        self.assertEqual(len(load_telemetry(self.path)), 0)
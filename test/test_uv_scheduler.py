@@ -0,0 +1,115 @@
+import threading
+from unittest import TestCase
+from unittest.mock import Mock, patch, call
+
+from mock import GPIO
+from mock.ibs import IBS
+from src.cleaning_robot import CleaningRobot, CleaningRobotError
+from src.fleet_simulator import BatteryDrainModel, ObstacleMap, SimulatedRobot
+from src.uv_scheduler import UVScheduler
+
+
+class TestUVScheduler(TestCase):
+
+    @patch.object(GPIO, "output")
+    def test_schedule_exposes_cell_in_background(self, mock_uv_light: Mock):
+        sleep = Mock()
+        scheduler = UVScheduler(exposure_time=30, sleep=sleep)
+
+        self.assertTrue(scheduler.schedule((1, 2)))
+        self.assertTrue(scheduler.wait(timeout=1))
+
+        sleep.assert_called_once_with(30)
+        mock_uv_light.assert_has_calls([call(CleaningRobot.UV_LIGHT_PIN, True), call(CleaningRobot.UV_LIGHT_PIN, False)])
+        self.assertEqual(scheduler.exposure_status((1, 2)), UVScheduler.DONE)
+        self.assertIsNone(scheduler.exposure_status((0, 0)))
+        scheduler.shutdown()
+
+    @patch.object(GPIO, "output")
+    def test_schedule_dedupes_same_cell(self, mock_uv_light: Mock):
+        sleep = Mock()
+        scheduler = UVScheduler(sleep=sleep)
+
+        scheduler.schedule((1, 1))
+        self.assertFalse(scheduler.schedule((1, 1)))
+        scheduler.wait(timeout=1)
+
+        self.assertEqual(sleep.call_count, 1)
+        scheduler.shutdown()
+
+    @patch.object(GPIO, "output")
+    def test_schedule_without_dedupe_exposes_again(self, mock_uv_light: Mock):
+        sleep = Mock()
+        scheduler = UVScheduler(dedupe_cells=False, sleep=sleep)
+
+        scheduler.schedule((1, 1))
+        scheduler.wait(timeout=1)
+        self.assertTrue(scheduler.schedule((1, 1)))
+        scheduler.wait(timeout=1)
+
+        self.assertEqual(sleep.call_count, 2)
+        scheduler.shutdown()
+
+    @patch.object(GPIO, "output")
+    def test_queued_exposures_keep_light_on(self, mock_uv_light: Mock):
+        release = threading.Event()
+        scheduler = UVScheduler(sleep=lambda seconds: release.wait(1))
+
+        scheduler.schedule((0, 1))
+        scheduler.schedule((0, 2))
+        release.set()
+        scheduler.wait(timeout=1)
+
+        self.assertEqual(mock_uv_light.call_args_list, [call(CleaningRobot.UV_LIGHT_PIN, True), call(CleaningRobot.UV_LIGHT_PIN, False)])
+        scheduler.shutdown()
+
+    @patch.object(GPIO, "output")
+    def test_attached_scheduler_uses_robot_gpio_and_sleep(self, mock_global_output: Mock):
+        robot = SimulatedRobot(ObstacleMap(), BatteryDrainModel())
+        robot.initialize_robot()
+        scheduler = UVScheduler(exposure_time=30)
+        robot.uv_scheduler = scheduler
+        writes = []
+        robot.gpio.output = lambda channel, value: writes.append((channel, value))
+
+        robot.execute_command("f")
+        robot.execute_command("f")
+        scheduler.wait(timeout=1)
+        scheduler.shutdown()
+
+        self.assertIs(scheduler.robot, robot)
+        self.assertIn((CleaningRobot.UV_LIGHT_PIN, True), writes)
+        self.assertEqual(writes[-1], (CleaningRobot.UV_LIGHT_PIN, False))
+        # The exposures run while the robot moves on: (1 + 30) + (1 + 30) seconds if they blocked it
+        self.assertEqual(robot.clock.now, 2)
+        self.assertEqual(robot.clock.time(), 1 + 30 + 30)
+        mock_global_output.assert_not_called()
+
+    def test_explicit_gpio_and_sleep_take_precedence(self):
+        gpio, sleep = Mock(), Mock()
+        scheduler = UVScheduler(exposure_time=5, sleep=sleep, gpio=gpio)
+
+        scheduler.schedule((0, 1))
+        scheduler.wait(timeout=1)
+        scheduler.shutdown()
+
+        sleep.assert_called_once_with(5)
+        gpio.output.assert_has_calls([call(CleaningRobot.UV_LIGHT_PIN, True), call(CleaningRobot.UV_LIGHT_PIN, False)])
+
+    def test_negative_exposure_time_raises(self):
+        self.assertRaises(CleaningRobotError, UVScheduler, -1)
+
+    @patch.object(IBS, "get_charge_left")
+    @patch.object(GPIO, "input")
+    @patch.object(CleaningRobot, "activate_uv_light")
+    def test_execute_command_uses_scheduler_instead_of_blocking(self, mock_activate_uv_light: Mock, mock_infrared_sensor: Mock, mock_ibs: Mock):
+        mock_ibs.return_value = 11
+        mock_infrared_sensor.return_value = False
+        system = CleaningRobot()
+        system.initialize_robot()
+        system.uv_scheduler = Mock()
+
+        system.execute_command("f")
+
+        mock_activate_uv_light.assert_not_called()
+        system.uv_scheduler.schedule.assert_called_once_with((0, 1))